@@ -1,7 +1,14 @@
+from __future__ import annotations
+
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Iterable, Optional
+
+from adapters.executor import AdaptationExecutor
+from adapters.pipeline import StagedPipeline
 
-import pandas as pd
+# pandas costs hundreds of milliseconds to import and is only needed once a frame is built
+if TYPE_CHECKING:
+    import pandas as pd
 
 
 class RawDataAdapter(ABC):
@@ -9,10 +16,55 @@ class RawDataAdapter(ABC):
     Adapt raw responses inside a redis queue
     into a standard data strucutre, convert to
     json, and publish to an adapted redis stream.
+
+    CPU-bound transforms (e.g. building DataFrames) should go through
+    `run_cpu_bound` / `map_cpu_bound`. They run inline by default and
+    in the worker processes of an AdaptationExecutor when one is given,
+    keeping the event loop free for redis I/O.
     """
 
-    def __init__(self):
-        """Populate Constructor"""
+    def __init__(self, executor: Optional[AdaptationExecutor] = None):
+        """
+        Populate Constructor
+
+        :param executor: process pool for CPU-bound transforms, inline if null
+        """
+        self.executor = executor
+
+    async def run_cpu_bound(self, func: Callable, *args) -> Any:
+        """
+        Run a CPU-bound transform in the configured execution mode
+
+        :param func: picklable, module-level callable
+        :param args: picklable arguments of the callable
+        :return: the result of the callable
+        """
+        if self.executor is None:
+            return func(*args)
+        return await self.executor.run(func, *args)
+
+    async def map_cpu_bound(self, func: Callable, items: Iterable) -> list:
+        """
+        Apply a CPU-bound transform to a batch in the configured execution mode
+
+        :param func: picklable, module-level callable taking one item
+        :param items: items of the batch
+        :return: results in the order of the items
+        """
+        if self.executor is None:
+            return [func(item) for item in items]
+        return await self.executor.map(func, items)
+
+    def pipelines(self) -> list[StagedPipeline]:
+        """Return the push-driven pipelines a runner should start, none by default"""
+        return []
+
+    def periodic_tasks(self) -> dict[str, tuple[Callable[[], Awaitable], float]]:
+        """Return the coroutine functions a runner should schedule and their interval, by name"""
+        return {}
+
+    async def close(self):
+        """Release the resources of the adapter, e.g. flush the entries its stream manager still buffers"""
 
     @abstractmethod
     async def get_funding_rates(self, *args, **kwargs) -> dict[str, float]:
@@ -0,0 +1,144 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Iterable, Optional
+
+_DEFAULT_CHUNK_SIZE = 64
+
+
+def _warm_up() -> int:
+    """Force the worker to start and import its dependencies"""
+    import pandas  # noqa: F401
+
+    return os.getpid()
+
+
+def _run_timed(func: Callable, args: tuple) -> tuple[Any, float, float]:
+    started_at = time.time()
+    result = func(*args)
+    return result, started_at, time.time()
+
+
+def _run_chunk_timed(func: Callable, chunk: list) -> tuple[list, float, float]:
+    started_at = time.time()
+    results = [func(item) for item in chunk]
+    return results, started_at, time.time()
+
+
+class AdaptationExecutor:
+    """
+    Process pool running the CPU-bound transforms of raw data adapters
+
+    Building DataFrames for many tickers starves the event loop that also
+    serves redis I/O. The executor moves that work into worker processes
+    so adaptation scales across cores. Workers are started and have their
+    heavy imports done up front, so the first batch does not pay for
+    process start-up. Batches are split in chunks, one task per chunk, so
+    the pickling and IPC overhead is paid per chunk instead of per item.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        chunk_size: int = _DEFAULT_CHUNK_SIZE,
+        initializer: Optional[Callable] = None,
+        initargs: tuple = (),
+    ):
+        """
+        :param max_workers: number of worker processes, defaults to the cpu count
+        :param chunk_size: number of items of a batch sent to a worker at once
+        :param initializer: callable run once in every worker when it starts
+        :param initargs: arguments of the initializer
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=initializer,
+            initargs=initargs,
+        )
+        self._started_at = time.time()
+        self._in_flight = 0
+        self._tasks = 0
+        self._busy_time = 0.0
+        self._total_queue_wait = 0.0
+        self._max_queue_wait = 0.0
+
+    @classmethod
+    def from_config(cls, config: dict) -> Optional["AdaptationExecutor"]:
+        """
+        Build the executor of the optional "adaptation_executor" section of a config
+
+        :param config: global config, e.g. {"adaptation_executor": {"max_workers": 4, "chunk_size": 64}}
+        :return: the executor, to start before use, null to adapt inline if the section is missing
+        """
+        settings = config.get("adaptation_executor")
+        if settings is None:
+            return None
+        return cls(**settings)
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return worker utilisation and queue-wait metrics"""
+        elapsed = time.time() - self._started_at
+        return {
+            "workers": self.max_workers,
+            "in_flight": self._in_flight,
+            "tasks": self._tasks,
+            "utilisation": self._busy_time / (elapsed * self.max_workers) if elapsed else 0.0,
+            "avg_queue_wait": self._total_queue_wait / self._tasks if self._tasks else 0.0,
+            "max_queue_wait": self._max_queue_wait,
+        }
+
+    async def start(self):
+        """Spawn every worker and run its warm-up before any real work arrives"""
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self._pool, _warm_up)
+                               for _ in range(self.max_workers)))
+        self._started_at = time.time()
+
+    async def _submit(self, runner: Callable, func: Callable, payload) -> Any:
+        loop = asyncio.get_running_loop()
+        submitted_at = time.time()
+        self._in_flight += 1
+        try:
+            result, started_at, finished_at = await loop.run_in_executor(
+                self._pool, runner, func, payload)
+        finally:
+            self._in_flight -= 1
+        queue_wait = max(started_at - submitted_at, 0.0)
+        self._tasks += 1
+        self._busy_time += finished_at - started_at
+        self._total_queue_wait += queue_wait
+        self._max_queue_wait = max(self._max_queue_wait, queue_wait)
+        return result
+
+    async def run(self, func: Callable, *args) -> Any:
+        """
+        Run a single transform in a worker
+
+        :param func: picklable, module-level callable
+        :param args: picklable arguments of the callable
+        :return: the result of the callable
+        """
+        return await self._submit(_run_timed, func, args)
+
+    async def map(self, func: Callable, items: Iterable) -> list:
+        """
+        Apply a transform to every item of a batch across the workers
+
+        :param func: picklable, module-level callable taking one item
+        :param items: items of the batch
+        :return: results in the order of the items
+        """
+        items = list(items)
+        chunks = [items[i:i + self.chunk_size]
+                  for i in range(0, len(items), self.chunk_size)]
+        results = await asyncio.gather(
+            *(self._submit(_run_chunk_timed, func, chunk) for chunk in chunks))
+        return [result for chunk_results in results for result in chunk_results]
+
+    def shutdown(self, wait: bool = True):
+        """Stop the workers"""
+        self._pool.shutdown(wait=wait, cancel_futures=True)
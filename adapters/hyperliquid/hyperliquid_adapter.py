@@ -1,22 +1,47 @@
+from __future__ import annotations
+
 import asyncio
+import time
+from typing import TYPE_CHECKING, Optional
 from adapters.dex_adapter_base import RawDataAdapter
+from adapters.executor import AdaptationExecutor
+from adapters.pipeline import StagedPipeline
 from api.hyperliquid.constants import PATH_TO_HYPERLIQUID
-from caching.stream_manager import RedisStreamManager
+from caching.stream_manager import LazyStreamManager
 from caching.streams import StreamNameBuilder
-from models.enums import Blockchains, DataType, Exchanges, StreamNames
-import pandas as pd
-import json
-from utilities.common import generate_group_name
+from models.enums import Blockchains, DataType, Exchanges, StreamNames, TraceStage
+from models.orderbook import OrderBookEngine
+from models.symbols import SymbolRegistry
+from utilities.codecs import CODECS
+from utilities.common import generate_consumer_name, generate_group_name
 from utilities.logger import SetupLogger
+from utilities.metrics import METRICS, split_trace, trace_fields
+from utilities.venues import VENUES
+
+if TYPE_CHECKING:
+    import pandas as pd
 
 _PATH_TO_REDIS_CONFIG = PATH_TO_HYPERLIQUID / "redis_config.json"
-_redis_stream_manager = RedisStreamManager.from_config(_PATH_TO_REDIS_CONFIG)
+_DEFAULT_BATCH_SIZE = 100
+# longest wait of a pipeline read, the read returns as soon as a message lands
+_PIPELINE_BLOCK_MS = 1_000
+_SERVICE_NAME = "hyperliquid_adapter"
+# stages stamped by the adapter, the raw publish latency is only visible from here
+_TRACE_STAGES = (
+    TraceStage.RAW_PUBLISH,
+    TraceStage.ADAPT_START,
+    TraceStage.ADAPT_END,
+    TraceStage.ADAPTED_PUBLISH,
+)
+# built on first use, importing the module neither reads the config nor opens a pool
+_redis_stream_manager = LazyStreamManager(_PATH_TO_REDIS_CONFIG)
 
 _stream_name_builder = (
     StreamNameBuilder()
     .set("marketplace", Exchanges.HYPERLIQUID)
     .set("blockchain", Blockchains.COSMOS)
 )
+_SYMBOLS = SymbolRegistry.for_venue(Exchanges.HYPERLIQUID, Blockchains.COSMOS)
 _REDIS_STREAMS = {
     "raw": {
         stream: _stream_name_builder.set("stream", stream)
@@ -33,17 +58,46 @@ _REDIS_STREAMS = {
 }
 
 
+@VENUES.adapter(Exchanges.HYPERLIQUID, Blockchains.COSMOS)
 class HyperliquidAdapter(RawDataAdapter):
-    def __init__(self):
+    def __init__(
+        self,
+        batch_size: int = _DEFAULT_BATCH_SIZE,
+        executor: Optional[AdaptationExecutor] = None,
+    ):
+        """
+        :param batch_size: maximum number of raw entries read per call in batch mode
+        :param executor: process pool for CPU-bound transforms, inline if null
+        """
+        super().__init__(executor=executor)
+        self.batch_size = batch_size
+        self.consumer_name = generate_consumer_name(_SERVICE_NAME)
+        self.order_books = OrderBookEngine()
         self.logger_config = SetupLogger(
             'hyperliquid_adapter', 'logs/hyperliquid/hyperliquid_adapter.log')
         self.logger = self.logger_config.create_logger()
+        self.payload_logger = self.logger_config.create_payload_logger()
+
+    async def close(self):
+        """Flush the adapted entries still buffered, call it before the redis pools are closed"""
+        await _redis_stream_manager.aclose()
+
+    @staticmethod
+    def _adapt_oracle_prices(prices_data: dict) -> dict[str, float]:
+        """Convert a raw allMids entry into the standard ticker to price mapping"""
+        ticker = _SYMBOLS.ticker
+        return {ticker(coin): float(price) for coin, price in prices_data.items()}
 
-    @_redis_stream_manager.publish_result(_REDIS_STREAMS["adapted"][StreamNames.PNL])
     async def get_oracle_prices(self, *args, **kwargs):
         """
         Get oracle prices for actively traded coins.
 
+        The adapted entry is published first and the raw entry only
+        acknowledged once redis accepted it, so a failed publish leaves the
+        raw entry pending for redelivery instead of losing it. The trace
+        stamps of the raw entry are carried over to the adapted entry,
+        along with the adapt and adapted publish stamps.
+
         :return: mapping between tickers and prices for all supported tokens
 
         Example:
@@ -53,31 +107,38 @@ class HyperliquidAdapter(RawDataAdapter):
             stream_name = _REDIS_STREAMS["raw"][StreamNames.PRICES]
             self.logger.debug(
                 "Reading raw data from redis at Hyperliquid_adapter.get_oracle_prices ")
-            group_name = generate_group_name(stream_name)
-            await _redis_stream_manager.create_redis_consumer_group(
+            group_name = generate_group_name(stream_name, _SERVICE_NAME)
+            data = await _redis_stream_manager.read_group(
                 stream_name,
                 group_name,
-            )
-
-            data = await _redis_stream_manager.xreadgroup(
-                streams={stream_name: ">"},
-                consumername="adapter",
-                groupname=group_name,
+                self.consumer_name,
                 count=1,
                 block=5,
             )
 
             if data:
-                self.logger.info(
+                self.payload_logger.info(
                     "Raw data received from redis at Hyperliquid_adapter.get_oracle_prices: %s ", data)
                 # Extract prices from the data
-                prices_data = data[0][1][0][1]
+                message_id, prices_data = data[0][1][0]
+                trace = split_trace(prices_data)
+                trace[TraceStage.ADAPT_START] = time.monotonic_ns()
 
-                oracle_prices = {f"{ticker.decode()}/USD": float(price.decode())
-                                for ticker, price in prices_data.items()}
-                self.logger.info(
-                    "Publishing adapted data to redis: %s ", json.dumps(oracle_prices))
-                return json.dumps(oracle_prices)
+                oracle_prices = self._adapt_oracle_prices(prices_data)
+                trace[TraceStage.ADAPT_END] = time.monotonic_ns()
+                trace[TraceStage.ADAPTED_PUBLISH] = time.monotonic_ns()
+                METRICS.observe_trace(trace, _TRACE_STAGES)
+                oracle_prices.update(trace_fields(trace))
+                self.payload_logger.info(
+                    "Publishing adapted data to redis: %s ", oracle_prices)
+                await _redis_stream_manager.publish_many(
+                    _REDIS_STREAMS["adapted"][StreamNames.PNL],
+                    [oracle_prices],
+                    ack_stream=stream_name,
+                    ack_group=group_name,
+                    ack_ids=[message_id],
+                )
+                return oracle_prices
             else:
                 self.logger.debug(
                     "No data received yet from redis at Hyperliquid_adapter.get_oracle_prices")
@@ -87,12 +148,203 @@ class HyperliquidAdapter(RawDataAdapter):
             return None
 
 
+    async def get_oracle_prices_batch(self, *args, **kwargs) -> list[dict[str, float]]:
+        """
+        Adapt up to `batch_size` raw price entries at once
+
+        The adapted entries are published in one pipeline, then the raw
+        entries are acknowledged with one XACK once every entry was written,
+        so throughput scales with the batch size instead of the redis
+        round-trip time and a failed publish leaves the raw entries pending
+        for redelivery. Trace stamps are carried
+        over like in `get_oracle_prices`, adapt stamps are per batch.
+
+        :return: the adapted mappings, oldest first
+        """
+        try:
+            stream_name = _REDIS_STREAMS["raw"][StreamNames.PRICES]
+            group_name = generate_group_name(stream_name, _SERVICE_NAME)
+            data = await _redis_stream_manager.read_group(
+                stream_name,
+                group_name,
+                self.consumer_name,
+                count=self.batch_size,
+                block=5,
+            )
+            if not data:
+                self.logger.debug(
+                    "No data received yet from redis at Hyperliquid_adapter.get_oracle_prices_batch")
+                return []
+
+            entries = data[0][1]
+            message_ids = [message_id for message_id, _ in entries]
+            traces = [split_trace(prices_data) for _, prices_data in entries]
+            adapt_start = time.monotonic_ns()
+            oracle_prices = await self.map_cpu_bound(
+                HyperliquidAdapter._adapt_oracle_prices,
+                [prices_data for _, prices_data in entries],
+            )
+            adapt_end = time.monotonic_ns()
+            for oracle_price, trace in zip(oracle_prices, traces):
+                trace[TraceStage.ADAPT_START] = adapt_start
+                trace[TraceStage.ADAPT_END] = adapt_end
+                trace[TraceStage.ADAPTED_PUBLISH] = adapt_end
+                METRICS.observe_trace(trace, _TRACE_STAGES)
+                oracle_price.update(trace_fields(trace))
+            await _redis_stream_manager.publish_many(
+                _REDIS_STREAMS["adapted"][StreamNames.PNL],
+                oracle_prices,
+                ack_stream=stream_name,
+                ack_group=group_name,
+                ack_ids=message_ids,
+            )
+            self.logger.debug(
+                "Adapted and acknowledged a batch of %s raw price entries", len(entries))
+            return oracle_prices
+        except Exception as e:
+            self.logger.error(
+                f"An error occurred while adapting a batch of oracle prices: {e}")
+            return []
+
+    def pipelines(self) -> list[StagedPipeline]:
+        return [self.oracle_price_pipeline()]
+
+    def oracle_price_pipeline(
+        self,
+        queue_size: int = 1_000,
+        adapt_workers: Optional[int] = None,
+        publish_workers: int = 1,
+    ) -> StagedPipeline:
+        """
+        Build the push-driven pipeline adapting raw prices as soon as they land
+
+        Raw price entries are read with a blocking read of up to
+        `batch_size` entries, adapted one by one (in the executor when one
+        is configured) and published in batches, acknowledging the raw
+        entries once their batch was written. Trace stamps are carried over like
+        in `get_oracle_prices`.
+
+        :param queue_size: capacity of the queues between stages
+        :param adapt_workers: concurrent adapt workers, more than one only helps with an executor, one per
+            executor worker if null
+        :param publish_workers: concurrent publish workers
+        :return: the pipeline, to start or run
+        """
+        if adapt_workers is None:
+            adapt_workers = self.executor.max_workers if self.executor is not None else 1
+        stream_name = _REDIS_STREAMS["raw"][StreamNames.PRICES]
+        group_name = generate_group_name(stream_name, _SERVICE_NAME)
+        adapted_stream_name = _REDIS_STREAMS["adapted"][StreamNames.PNL]
+
+        async def read() -> list:
+            data = await _redis_stream_manager.read_group(
+                stream_name,
+                group_name,
+                self.consumer_name,
+                count=self.batch_size,
+                block=_PIPELINE_BLOCK_MS,
+            )
+            return data[0][1] if data else []
+
+        async def adapt(entry: tuple) -> tuple:
+            message_id, prices_data = entry
+            trace = split_trace(prices_data)
+            trace[TraceStage.ADAPT_START] = time.monotonic_ns()
+            oracle_prices = await self.run_cpu_bound(HyperliquidAdapter._adapt_oracle_prices, prices_data)
+            trace[TraceStage.ADAPT_END] = time.monotonic_ns()
+            return message_id, oracle_prices, trace
+
+        async def publish(batch: list[tuple]):
+            published = time.monotonic_ns()
+            for _, oracle_prices, trace in batch:
+                trace[TraceStage.ADAPTED_PUBLISH] = published
+                METRICS.observe_trace(trace, _TRACE_STAGES)
+                oracle_prices.update(trace_fields(trace))
+            await _redis_stream_manager.publish_many(
+                adapted_stream_name,
+                [oracle_prices for _, oracle_prices, _ in batch],
+                ack_stream=stream_name,
+                ack_group=group_name,
+                ack_ids=[message_id for message_id, _, _ in batch],
+            )
+
+        return StagedPipeline(
+            "hyperliquid_oracle_prices",
+            read,
+            adapt,
+            publish,
+            queue_size=queue_size,
+            adapt_workers=adapt_workers,
+            publish_workers=publish_workers,
+            publish_batch_size=self.batch_size,
+            logger=self.logger,
+        )
+
     async def get_funding_rates(self, *args, **kwargs) -> dict[str, float]:
         pass
 
-    @_redis_stream_manager.publish_result(_REDIS_STREAMS["adapted"][StreamNames.ORDER_BOOK])
     async def get_orderbook(self, ticker: str, *args, **kwargs) -> pd.DataFrame:
-        pass
+        """
+        Get L2-orderbook data
+
+        Applies every raw l2Book snapshot waiting in the raw stream to the
+        order book engine, publishes the refreshed books of all tickers to
+        the adapted stream in one pipeline, then acknowledges the raw entries,
+        so the snapshots are only released once the books are written.
+
+        :param ticker: ticker whose market we are returning
+        :return: dataframe of the first 50 bids and asks, None if the ticker was never seen
+        """
+        try:
+            stream_name = _REDIS_STREAMS["raw"][StreamNames.ORDER_BOOK]
+            group_name = generate_group_name(stream_name, _SERVICE_NAME)
+            data = await _redis_stream_manager.read_group(
+                stream_name,
+                group_name,
+                self.consumer_name,
+                count=self.batch_size,
+                block=5,
+            )
+
+            if data:
+                entries = data[0][1]
+                updated = set()
+                for _, fields in entries:
+                    book = CODECS.decode(fields[b"frame"])["data"]
+                    symbol = _SYMBOLS.ticker(book["coin"])
+                    bids, asks = book["levels"]
+                    self.order_books.apply_snapshot(
+                        symbol,
+                        [(float(level["px"]), float(level["sz"])) for level in bids],
+                        [(float(level["px"]), float(level["sz"])) for level in asks],
+                        timestamp=book["time"] / 1000,
+                    )
+                    updated.add(symbol)
+
+                await _redis_stream_manager.publish_many(
+                    _REDIS_STREAMS["adapted"][StreamNames.ORDER_BOOK],
+                    [self._serialize_orderbook(symbol) for symbol in updated],
+                    ack_stream=stream_name,
+                    ack_group=group_name,
+                    ack_ids=[message_id for message_id, _ in entries],
+                )
+
+            return self.order_books.to_frame(ticker)
+        except Exception as e:
+            self.logger.error(
+                f"An error occurred while fetching the orderbook of {ticker}: {e}")
+            return None
+
+    def _serialize_orderbook(self, ticker: str) -> dict[str, str]:
+        """Return the flat adapted entry of a ticker's book"""
+        book = self.order_books.book(ticker)
+        top = book.top()
+        return {
+            "ticker": ticker,
+            "timestamp": str(book.timestamp),
+            "bids": CODECS.encode(list(zip(*(side.tolist() for side in top["bid"])))),
+            "asks": CODECS.encode(list(zip(*(side.tolist() for side in top["ask"])))),
+        }
 
     async def get_liquidation_prices(self, *args, **kwargs) -> dict[str, float]:
         pass
@@ -114,22 +366,22 @@ class HyperliquidAdapter(RawDataAdapter):
             "Pooling the data with get_oracle_prices currently with stream name %s ", stream_name)
         while True:
             try:
-                group_name = generate_group_name(stream_name)
-                await _redis_stream_manager.create_redis_consumer_group(
+                group_name = generate_group_name(stream_name, _SERVICE_NAME)
+                data = await _redis_stream_manager.read_group(
                     stream_name,
                     group_name,
-                )
-
-                data = await _redis_stream_manager.xreadgroup(
-                    streams={stream_name: ">"},
-                    consumername="adapter",
-                    groupname=group_name,
-                    count=1,
+                    self.consumer_name,
+                    count=self.batch_size,
                     block=5,
                 )
 
                 yield data
 
+                # the caller has processed the batch, release its pending entries
+                if data:
+                    await _redis_stream_manager.xack(
+                        stream_name, group_name, *[message_id for message_id, _ in data[0][1]])
+
             except Exception as e:
                 self.logger.debug(
                     f"An error occurred while pool for data: {e}")
@@ -0,0 +1,194 @@
+import asyncio
+import inspect
+import logging
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from utilities.metrics import METRICS, MetricsRegistry
+
+PIPELINE_ITEMS = "dex_pipeline_items_total"
+PIPELINE_BACKPRESSURE = "dex_pipeline_backpressure_total"
+PIPELINE_ERRORS = "dex_pipeline_errors_total"
+_DEFAULT_QUEUE_SIZE = 1_000
+_DEFAULT_PUBLISH_BATCH_SIZE = 100
+_DEFAULT_GRACE_PERIOD = 10.0
+_ERROR_BACKOFF = 1.0
+_STAGES = ("ingest", "adapt", "publish")
+
+
+class StagedPipeline:
+    """
+    Push-driven ingest -> adapt -> publish pipeline over bounded queues
+
+    The ingest stage loops on a long-blocking read, so every message is
+    handed to the adapt workers as soon as it lands. Stages are linked by
+    bounded asyncio queues: when publishing falls behind, the queues fill
+    up, the adapt workers and then the ingest stage wait on them, and no
+    more messages are read until there is room again. Unread messages stay
+    in redis instead of piling up in memory.
+
+    Every stage runs a tunable number of workers. Publish workers drain
+    the queue into batches, so one round trip publishes everything adapted
+    in the meantime. With more than one adapt or publish worker, adapted
+    messages may be published out of their reading order.
+
+    Items processed, backpressure waits and errors are counted per stage
+    in the metrics registry.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        read: Callable[[], Awaitable[list]],
+        adapt: Callable[[Any], Any],
+        publish: Callable[[list], Awaitable[Any]],
+        queue_size: int = _DEFAULT_QUEUE_SIZE,
+        adapt_workers: int = 1,
+        publish_workers: int = 1,
+        publish_batch_size: int = _DEFAULT_PUBLISH_BATCH_SIZE,
+        logger: Optional[logging.Logger] = None,
+        metrics: MetricsRegistry = METRICS,
+    ):
+        """
+        :param name: name of the pipeline, used as metric label
+        :param read: coroutine function returning the next messages, blocking until some arrive
+        :param adapt: function or coroutine function adapting one message, results that are None are dropped
+        :param publish: coroutine function publishing a batch of adapted messages
+        :param queue_size: capacity of each queue between two stages
+        :param adapt_workers: number of concurrent adapt workers
+        :param publish_workers: number of concurrent publish workers
+        :param publish_batch_size: largest number of messages published at once
+        :param logger: logger of the owning adapter
+        :param metrics: registry receiving the stage counters
+        """
+        self.name = name
+        self._read = read
+        self._adapt = adapt
+        self._adapt_is_async = inspect.iscoroutinefunction(adapt)
+        self._publish = publish
+        self.adapt_workers = adapt_workers
+        self.publish_workers = publish_workers
+        self.publish_batch_size = publish_batch_size
+        self._adapt_queue: asyncio.Queue = asyncio.Queue(queue_size)
+        self._publish_queue: asyncio.Queue = asyncio.Queue(queue_size)
+        self._logger = logger or logging.getLogger(__name__)
+        self._items = {stage: metrics.counter(PIPELINE_ITEMS, pipeline=name, stage=stage) for stage in _STAGES}
+        self._backpressure = {
+            stage: metrics.counter(PIPELINE_BACKPRESSURE, pipeline=name, stage=stage) for stage in _STAGES[:2]}
+        self._errors = {stage: metrics.counter(PIPELINE_ERRORS, pipeline=name, stage=stage) for stage in _STAGES}
+        self._ingest_task: Optional[asyncio.Task] = None
+        self._workers: list[asyncio.Task] = []
+        self._started_at: Optional[float] = None
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return the items, throughput, backpressure waits and errors of every stage, and the queue depths"""
+        elapsed = time.monotonic() - self._started_at if self._started_at else 0.0
+        return {
+            "adapt_queue": self._adapt_queue.qsize(),
+            "publish_queue": self._publish_queue.qsize(),
+            **{
+                stage: {
+                    "items": self._items[stage].value,
+                    "throughput": self._items[stage].value / elapsed if elapsed else 0.0,
+                    "backpressure": self._backpressure[stage].value if stage in self._backpressure else 0,
+                    "errors": self._errors[stage].value,
+                }
+                for stage in _STAGES
+            },
+        }
+
+    def start(self):
+        """Start the ingest stage and the workers"""
+        self._started_at = time.monotonic()
+        self._workers = [asyncio.create_task(self._adapt_worker()) for _ in range(self.adapt_workers)]
+        self._workers += [asyncio.create_task(self._publish_worker()) for _ in range(self.publish_workers)]
+        self._ingest_task = asyncio.create_task(self._ingest())
+
+    async def run_forever(self):
+        """Run the pipeline until cancelled, then stop it gracefully"""
+        self.start()
+        try:
+            await asyncio.gather(self._ingest_task, *self._workers)
+        except asyncio.CancelledError:
+            await self.stop()
+            raise
+
+    async def stop(self, grace_period: float = _DEFAULT_GRACE_PERIOD):
+        """
+        Stop reading, then let the workers drain the queues
+
+        :param grace_period: seconds given to the workers to drain the queues before they are cancelled
+        """
+        if self._ingest_task is not None:
+            self._ingest_task.cancel()
+            await asyncio.gather(self._ingest_task, return_exceptions=True)
+            self._ingest_task = None
+        try:
+            await asyncio.wait_for(self._drain(), grace_period)
+        except asyncio.TimeoutError:
+            self._logger.warning(
+                "Pipeline %s stopped with %s messages left in its queues",
+                self.name, self._adapt_queue.qsize() + self._publish_queue.qsize())
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _drain(self):
+        await self._adapt_queue.join()
+        await self._publish_queue.join()
+
+    async def _put(self, queue: asyncio.Queue, item: Any, stage: str):
+        if queue.full():
+            self._backpressure[stage].inc()
+        await queue.put(item)
+
+    async def _ingest(self):
+        while True:
+            try:
+                messages = await self._read()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self._errors["ingest"].inc()
+                self._logger.error("Pipeline %s failed to read", self.name, exc_info=True)
+                await asyncio.sleep(_ERROR_BACKOFF)
+                continue
+            for message in messages or []:
+                await self._put(self._adapt_queue, message, "ingest")
+            self._items["ingest"].inc(len(messages or []))
+
+    async def _adapt_worker(self):
+        while True:
+            message = await self._adapt_queue.get()
+            try:
+                adapted = await self._adapt(message) if self._adapt_is_async else self._adapt(message)
+                self._items["adapt"].inc()
+                if adapted is not None:
+                    await self._put(self._publish_queue, adapted, "adapt")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self._errors["adapt"].inc()
+                self._logger.error("Pipeline %s failed to adapt a message", self.name, exc_info=True)
+            finally:
+                self._adapt_queue.task_done()
+
+    async def _publish_worker(self):
+        while True:
+            batch = [await self._publish_queue.get()]
+            while len(batch) < self.publish_batch_size and not self._publish_queue.empty():
+                batch.append(self._publish_queue.get_nowait())
+            try:
+                await self._publish(batch)
+                self._items["publish"].inc(len(batch))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self._errors["publish"].inc()
+                self._logger.error(
+                    "Pipeline %s failed to publish %s messages", self.name, len(batch), exc_info=True)
+            finally:
+                for _ in batch:
+                    self._publish_queue.task_done()
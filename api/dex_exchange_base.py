@@ -1,11 +1,22 @@
 """DEX Exchange Base"""
 
+import json
 import logging
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Awaitable, Callable, Optional
 from urllib.parse import urljoin
 
-from requests import Session
+from requests import Response, Session
+
+from api.rate_limiter import RateLimiter
+from api.transport import (
+    _DEFAULT_CONNECT_TIMEOUT,
+    _DEFAULT_POOL_SIZE,
+    _DEFAULT_READ_TIMEOUT,
+    AsyncHttpTransport,
+)
+from models.enums import RequestPriority
+from utilities.single_flight import SingleFlight
 
 
 class DEXExchangeBase(ABC):
@@ -31,6 +42,12 @@ class DEXExchangeBase(ABC):
         api_key: Optional[str] = None,
         api_qps: Optional[int] = None,
         logger: Optional[logging.Logger] = None,
+        api_burst: Optional[int] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        pool_size: int = _DEFAULT_POOL_SIZE,
+        connect_timeout: float = _DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = _DEFAULT_READ_TIMEOUT,
+        coalesce_window: float = 0.0,
     ):
         """
         Constructor for the DEXExchange api
@@ -38,12 +55,26 @@ class DEXExchangeBase(ABC):
         :param api_key: confidential api-key for generating a session
         :param api_qps: queries-per-second parameter for spacing api requests
         :param logger: generates a new logger for this module if null
+        :param api_burst: number of requests that can be sent at once after an idle period, defaults to api_qps
+        :param rate_limiter: limiter to share with other instances, built from api_qps if null
+        :param pool_size: number of keep-alive connections shared by all requests
+        :param connect_timeout: seconds to wait for a connection to be established
+        :param read_timeout: seconds to wait for the server to send a response
+        :param coalesce_window: seconds a response of a coalesced endpoint is shared with identical requests
+            after it arrived, 0 to only share requests in flight
         :return: new instance
         """
         self._api_key = api_key
         self._api_qps = api_qps
         self._logger = logger
-        self._session = None
+        self._pool_size = pool_size
+        self._connect_timeout = connect_timeout
+        self._read_timeout = read_timeout
+        self._transport = None
+        if rate_limiter is None and api_qps:
+            rate_limiter = RateLimiter(qps=api_qps, burst=api_burst)
+        self._rate_limiter = rate_limiter
+        self._single_flight = SingleFlight(f"{type(self).__name__}.request", window=coalesce_window)
 
     @property
     def api_key(self) -> str | None:
@@ -57,6 +88,53 @@ class DEXExchangeBase(ABC):
     def logger(self) -> logging.Logger | None:
         return self._logger
 
+    @property
+    def rate_limiter(self) -> RateLimiter | None:
+        return self._rate_limiter
+
+    def ingestion_tasks(self) -> dict[str, Callable[[], Awaitable]]:
+        """
+        Return the long-running ingestion loops of the exchange, by name
+
+        Runners start each coroutine function once and restart it if it
+        fails, e.g. a websocket client's run_forever. None by default.
+        """
+        return {}
+
+    def periodic_tasks(self) -> dict[str, tuple[Callable[[], Awaitable], float]]:
+        """Return the coroutine functions a runner should schedule and their interval, by name"""
+        return {}
+
+    @property
+    def rest_endpoint_weights(self) -> dict[str, int]:
+        """
+        Return the rate-limit weight of each endpoint key
+
+        Endpoints missing from the mapping consume a single token.
+        """
+        return {}
+
+    @property
+    def rest_endpoint_priorities(self) -> dict[str, RequestPriority]:
+        """
+        Return the scheduling lane of each endpoint key
+
+        Endpoints missing from the mapping are scheduled as NORMAL.
+        Order and position endpoints should be HIGH so they jump
+        ahead of bulk market-data polls, which should be LOW.
+        """
+        return {}
+
+    @property
+    def coalesced_endpoints(self) -> set[str]:
+        """
+        Return the endpoint keys whose identical concurrent requests share one response
+
+        Only list read-only endpoints: two identical orders must both be sent.
+        None by default.
+        """
+        return set()
+
     @property
     @abstractmethod
     def base_rest_url(self) -> str:
@@ -96,23 +174,103 @@ class DEXExchangeBase(ABC):
     def session_headers(self) -> dict[str, str]:
         """Get the headers we need for a https session"""
 
+    @property
+    def transport(self) -> AsyncHttpTransport:
+        """
+        Return the async http transport instance
+
+        Lazily initialize the transport. All endpoint methods
+        share its connection pool, so requests made concurrently
+        reuse keep-alive connections and never block the event loop.
+
+        :return: AsyncHttpTransport object
+        """
+        if self._transport:
+            return self._transport
+        self._transport = AsyncHttpTransport(
+            headers=self.session_headers,
+            pool_size=self._pool_size,
+            connect_timeout=self._connect_timeout,
+            read_timeout=self._read_timeout,
+        )
+        return self._transport
+
     @property
     def session(self) -> Session:
         """
         Return the requests.Session object instance
 
-        Lazily initialize the session object. If the
-        session does not already exist, we can easily
-        create the session here and assign to the
-        attributes for the session.
+        The session is owned by the transport. Calls made directly on it
+        are blocking, so prefer `request` inside coroutines.
 
         :return: Session object
         """
-        if self._session:
-            return self._session
-        self._session = Session()
-        self._session.headers.update(self.session_headers)
-        return self._session
+        return self.transport.session
+
+    async def request(
+        self,
+        method: str,
+        endpoint_key: str,
+        body: Optional[dict] = None,
+        priority: Optional[RequestPriority] = None,
+        coalesce: Optional[bool] = None,
+        **endpoint_kwargs,
+    ) -> Response:
+        """
+        Send a request to a REST endpoint through the async transport
+
+        The request waits for the shared rate limiter first, using the
+        endpoint's weight and priority. Requests of a coalesced endpoint
+        identical to one in flight (same method, endpoint, body and
+        endpoint kwargs) do not send anything and share its response,
+        see `coalesced_endpoints`.
+
+        :param method: http verb, e.g. "GET" or "POST"
+        :param endpoint_key: endpoint key to identify which rest-based api endpoint we wish to use
+        :param body: json body of the request
+        :param priority: overrides the endpoint's scheduling lane
+        :param coalesce: overrides whether the request is coalesced with identical ones
+        :param endpoint_kwargs: any kwargs that need to be added inside the endpoint's formatted string
+        :return: the response of the request
+        """
+        if coalesce is None:
+            coalesce = endpoint_key in self.coalesced_endpoints
+        if not coalesce:
+            return await self._send(method, endpoint_key, body, priority, **endpoint_kwargs)
+        key = (
+            method.upper(),
+            endpoint_key,
+            json.dumps(body, sort_keys=True) if body is not None else None,
+            tuple(sorted(endpoint_kwargs.items())),
+        )
+        return await self._single_flight.do(
+            key,
+            lambda: self._send(method, endpoint_key, body, priority, **endpoint_kwargs),
+            endpoint=endpoint_key,
+        )
+
+    async def _send(
+        self,
+        method: str,
+        endpoint_key: str,
+        body: Optional[dict],
+        priority: Optional[RequestPriority],
+        **endpoint_kwargs,
+    ) -> Response:
+        url = self.get_rest_endpoint_url(endpoint_key, **endpoint_kwargs)
+        if self._rate_limiter:
+            await self._rate_limiter.acquire(
+                weight=self.rest_endpoint_weights.get(endpoint_key, 1),
+                priority=priority
+                or self.rest_endpoint_priorities.get(endpoint_key, RequestPriority.NORMAL),
+            )
+        return await self.transport.request(method, url, json=body)
+
+    async def close(self):
+        """Close the transport and release its pooled connections"""
+        if self._transport:
+            self._transport.close()
+            self._transport = None
 
     def get_rest_endpoint_url(
         self,
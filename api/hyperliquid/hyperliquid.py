@@ -1,25 +1,35 @@
 """DEX Exchange Base"""
 import asyncio
 import logging
-from typing import Optional
+from typing import Awaitable, Callable, Optional
 import json
 import os
+from pathlib import Path
 from typing import Dict
 
 from api.dex_exchange_base import DEXExchangeBase
 from api.hyperliquid.constants import PATH_TO_HYPERLIQUID
-from caching.stream_manager import RedisStreamManager
+from api.hyperliquid.hyperliquid_websocket import HyperliquidWebsocketClient
+from caching.metadata import MetadataCache
+from caching.stream_manager import LazyStreamManager
 from caching.streams import StreamNameBuilder
-from models.enums import Blockchains, DataType, Exchanges, StreamNames
-from requests import Response
+from models.enums import Blockchains, DataType, Exchanges, RequestPriority, StreamNames, TraceStage
+from models.symbols import SymbolRegistry
 from utilities.common import get_config
-from utilities.parsing import JsonParser
+from utilities.codecs import CODECS
 from utilities.logger import SetupLogger
+from utilities.single_flight import single_flight
+from utilities.venues import VENUES
 
 
 _PATH_TO_REDIS_CONFIG = PATH_TO_HYPERLIQUID / "redis_config.json"
 _PATH_TO_HYPERLIQUID_CONFIG = PATH_TO_HYPERLIQUID / "hyperliquid_config.json"
-_redis_stream_manager = RedisStreamManager.from_config(_PATH_TO_REDIS_CONFIG)
+_PATH_TO_METADATA_SNAPSHOT = Path("metadata") / "hyperliquid-cosmos.json"
+_METADATA_TTL = 3_600
+# seconds between two checks of the metadata age, a check only calls the exchange once the ttl elapsed
+_METADATA_CHECK_INTERVAL = 60
+# built on first use, importing the module neither reads the config nor opens a pool
+_redis_stream_manager = LazyStreamManager(_PATH_TO_REDIS_CONFIG)
 
 _stream_name_builder = (
     StreamNameBuilder()
@@ -30,8 +40,17 @@ _stream_name_builder = (
 _REDIS_STREAMS = {
     stream: _stream_name_builder.set("stream", stream).name for stream in StreamNames
 }
+_METADATA_EVENT_STREAM = (
+    StreamNameBuilder()
+    .set("marketplace", Exchanges.HYPERLIQUID)
+    .set("blockchain", Blockchains.COSMOS)
+    .set("data_type", DataType.ADAPTED)
+    .set("stream", StreamNames.METADATA)
+    .name
+)
 
 
+@VENUES.exchange(Exchanges.HYPERLIQUID, Blockchains.COSMOS)
 class HyperLiquid(DEXExchangeBase):
     """
     Base DEX Exchange Instance
@@ -41,19 +60,43 @@ class HyperLiquid(DEXExchangeBase):
     methods to interact with said counterparties.
     """
 
-    _confi_data = get_config()
-
     def __init__(self):
         self._logger_config = SetupLogger(
             'hyperliquid_api', 'logs/hyperliquid/hyperliquid_api.log')
         self._hyperliquid_logger = self._logger_config.create_logger()
+        self._payload_logger = self._logger_config.create_payload_logger()
         self._hyperliquid_config = self.load_config()
         self._base_rest_url = self._hyperliquid_config["base_url"]
         self._base_websocket_url = self._hyperliquid_config["websocket_url"]
         self._rest_endpoint_urls = self._hyperliquid_config["endpoints"]
+        transport_config = self._hyperliquid_config.get("transport", {})
+        metadata_config = self._hyperliquid_config.get("metadata", {})
+        self._confi_data = get_config()
+        coalesce_window = self._hyperliquid_config.get("coalesce_window_ms", 0) / 1000
 
         super().__init__(
-            api_key=self._confi_data["api_key"], api_qps=self._confi_data["api_qps"], logger=self._hyperliquid_logger)
+            api_key=self._confi_data["api_key"],
+            api_qps=self._confi_data["api_qps"],
+            api_burst=self._confi_data.get("api_burst"),
+            logger=self._hyperliquid_logger,
+            coalesce_window=coalesce_window,
+            **transport_config,
+        )
+        self._websocket_clients: list[HyperliquidWebsocketClient] = []
+        self.metadata = MetadataCache(
+            "hyperliquid-cosmos",
+            self._fetch_meta,
+            Path(metadata_config.get("snapshot", _PATH_TO_METADATA_SNAPSHOT)),
+            ttl=metadata_config.get("ttl", _METADATA_TTL),
+            symbols=lambda meta: {asset["name"]: asset for asset in meta["universe"]},
+            redis_stream_manager=_redis_stream_manager,
+            event_stream=_METADATA_EVENT_STREAM,
+            logger=self._hyperliquid_logger,
+        )
+        # every coin of the universe is registered in the symbol registry shared by the adapters and consumers
+        self.metadata.subscribe(
+            lambda meta: SymbolRegistry.for_venue(Exchanges.HYPERLIQUID, Blockchains.COSMOS).load_metadata(
+                meta["universe"]))
 
     @property
     def base_rest_url(self) -> str:
@@ -67,6 +110,19 @@ class HyperLiquid(DEXExchangeBase):
     def rest_endpoint_urls(self) -> dict[str, str]:
         return self._rest_endpoint_urls
 
+    @property
+    def rest_endpoint_weights(self) -> dict[str, int]:
+        return self._hyperliquid_config.get("endpoint_weights", {})
+
+    @property
+    def rest_endpoint_priorities(self) -> dict[str, RequestPriority]:
+        return {"allMids": RequestPriority.LOW}
+
+    @property
+    def coalesced_endpoints(self) -> set[str]:
+        # info endpoints are read-only
+        return {"allMids", "meta"}
+
     @property
     def session_headers(self) -> dict[str, str]:
         return {
@@ -90,18 +146,108 @@ class HyperLiquid(DEXExchangeBase):
         with open(hyperliquid_config_path, "r") as config_file:
             return json.load(config_file)
 
-    @_redis_stream_manager.publish_result(_REDIS_STREAMS[StreamNames.PRICES])
-    async def get_all_mids(self) -> Response:
-        url = self.get_rest_endpoint_url("allMids")
+    def ingestion_tasks(self) -> dict[str, Callable[[], Awaitable]]:
+        """Stream market data into the raw streams over the websocket"""
+        return {"websocket": self.create_websocket_client().run_forever}
+
+    def periodic_tasks(self) -> dict[str, tuple[Callable[[], Awaitable], float]]:
+        """Refresh the exchange metadata once it is older than its ttl"""
+        return {"metadata": (self.metadata.refresh_if_stale, _METADATA_CHECK_INTERVAL)}
+
+    def create_websocket_client(
+        self,
+        coins: Optional[list[str]] = None,
+        users: Optional[list[str]] = None,
+    ) -> HyperliquidWebsocketClient:
+        """
+        Build the websocket ingestion engine publishing into the raw streams
+
+        Subscribes to allMids, plus l2Book and trades for every coin and
+        userEvents for every user address. Defaults are read from the
+        optional "websocket" block of the hyperliquid config.
+
+        :param coins: coins whose order book and trades are streamed
+        :param users: user addresses whose events are streamed
+        :return: client to run with `run_forever`
+        """
+        websocket_config = self._hyperliquid_config.get("websocket", {})
+        coins = websocket_config.get("coins", []) if coins is None else coins
+        users = websocket_config.get("users", []) if users is None else users
+        subscriptions = [{"type": "allMids"}]
+        for coin in coins:
+            subscriptions.append({"type": "l2Book", "coin": coin})
+            subscriptions.append({"type": "trades", "coin": coin})
+        for user in users:
+            subscriptions.append({"type": "userEvents", "user": user})
+        websocket_client = HyperliquidWebsocketClient(
+            url=self.base_websocket_url,
+            redis_stream_manager=_redis_stream_manager,
+            raw_streams=_REDIS_STREAMS,
+            subscriptions=subscriptions,
+            heartbeat_interval=websocket_config.get("heartbeat_interval", 30.0),
+            logger=self.logger,
+        )
+        self._websocket_clients.append(websocket_client)
+        return websocket_client
+
+    async def close(self):
+        """
+        Stop the websocket clients, flush the raw entries still buffered and close the transport
+
+        Call it once ingestion stopped and before the redis pools are closed.
+        """
+        for websocket_client in self._websocket_clients:
+            await websocket_client.stop()
+        self._websocket_clients.clear()
+        await _redis_stream_manager.aclose()
+        await super().close()
+
+    async def get_meta(self) -> dict | None:
+        """
+        Return the perpetuals metadata from the metadata cache
+
+        The exchange is only called when neither memory nor the snapshot
+        holds the metadata, a stale value is returned while it is
+        refreshed in the background.
+
+        :return: the metadata, with the "universe" list of coins
+        """
+        return await self.metadata.get()
+
+    async def _fetch_meta(self) -> dict | None:
+        """Fetch the perpetuals metadata from the exchange"""
+        body = {
+            "type": "meta"
+        }
+        try:
+            response = await self.request("POST", "meta", body=body)
+            response.raise_for_status()
+            return CODECS.decode(response)
+        except Exception as e:
+            self.logger.error("Error in retrieving meta", exc_info=True)
+            return None
+
+    # overlapping polls share one request and publish one raw entry
+    @single_flight("HyperLiquid.get_all_mids")
+    @_redis_stream_manager.publish_result(
+        _REDIS_STREAMS[StreamNames.PRICES], trace_stage=TraceStage.RAW_PUBLISH, return_stage=TraceStage.RECEIVE)
+    async def get_all_mids(self) -> dict[str, str]:
+        """
+        Get the mid price of every coin
+
+        The published entry carries the receive trace stamp, the returned mapping does not.
+
+        :return: mapping between coins and mids
+        """
         body = {
             "type": "allMids"
         }
         try:
-            response = self.session.post(url=url, json=body)
+            response = await self.request("POST", "allMids", body=body)
             response.raise_for_status()
-            json_result = JsonParser.loads(response)
-            self.logger.debug("Response from get_all_mids: %s", json_result)
-            return json_result
+            mids = CODECS.decode(response)
+            self._payload_logger.debug("Response from get_all_mids: %s", mids)
+            return mids
         except Exception as e:
             self.logger.error("Error in retrieving all mids", exc_info=True)
             return None
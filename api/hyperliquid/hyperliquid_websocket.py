@@ -0,0 +1,214 @@
+"""HyperLiquid Websocket Ingestion"""
+
+import asyncio
+import json
+import logging
+import random
+import time
+from typing import Any, Optional
+
+import websockets
+from websockets.exceptions import ConnectionClosed
+
+from caching.stream_manager import RedisStreamManager
+from models.enums import StreamNames, TraceStage
+from utilities.codecs import CODECS
+from utilities.metrics import stamp
+
+# websocket channel of a frame -> stream receiving its payload
+_CHANNEL_TO_STREAM = {
+    "allMids": StreamNames.PRICES,
+    "l2Book": StreamNames.ORDER_BOOK,
+    "trades": StreamNames.TRADES,
+    "user": StreamNames.PNL,
+}
+_HEARTBEAT_INTERVAL = 30.0
+_MIN_RECONNECT_DELAY = 0.5
+_MAX_RECONNECT_DELAY = 30.0
+
+
+class HyperliquidWebsocketClient:
+    """
+    Long-lived websocket ingestion engine for HyperLiquid
+
+    All subscriptions are multiplexed over a single connection. Each
+    frame is pushed as soon as it arrives into the raw redis stream
+    matching its channel, so adapters see new data within milliseconds
+    instead of waiting for the next REST poll.
+
+    allMids frames are published as the flat coin -> mid mapping, which
+    is the same layout the REST endpoint publishes. Frames with nested
+    payloads (l2Book, trades, user events) are published untouched under
+    the "frame" field, without being re-encoded.
+
+    The connection is kept alive with application-level pings. When it
+    drops or stays silent for too long we reconnect with exponential
+    backoff and replay every active subscription.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        redis_stream_manager: RedisStreamManager,
+        raw_streams: dict[StreamNames, str],
+        subscriptions: Optional[list[dict[str, Any]]] = None,
+        heartbeat_interval: float = _HEARTBEAT_INTERVAL,
+        logger: Optional[logging.Logger] = None,
+    ):
+        """
+        Constructor for the websocket client
+
+        :param url: websocket url of the exchange
+        :param redis_stream_manager: redis client used to publish the frames
+        :param raw_streams: mapping between stream names and raw redis stream names
+        :param subscriptions: subscription payloads to send on every (re)connect
+            e.g. [{"type": "allMids"}, {"type": "l2Book", "coin": "BTC"}]
+        :param heartbeat_interval: seconds between pings, the connection is
+            considered dead after two intervals without any frame
+        :param logger: logger of the owning exchange
+        :return: new instance
+        """
+        self._url = url
+        self._redis_stream_manager = redis_stream_manager
+        self._raw_streams = raw_streams
+        self._subscriptions: list[dict[str, Any]] = []
+        for subscription in subscriptions or []:
+            self._add_subscription(subscription)
+        self._heartbeat_interval = heartbeat_interval
+        self._logger = logger or logging.getLogger(__name__)
+        self._websocket = None
+        self._running = False
+        self._last_frame_at = 0.0
+        self._frames: dict[str, int] = {}
+        self._publish_errors = 0
+        self._reconnects = 0
+
+    @property
+    def subscriptions(self) -> list[dict[str, Any]]:
+        return list(self._subscriptions)
+
+    @property
+    def connected(self) -> bool:
+        return self._websocket is not None
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return frame counters per channel and connection health"""
+        return {
+            "connected": self.connected,
+            "subscriptions": len(self._subscriptions),
+            "frames": dict(self._frames),
+            "publish_errors": self._publish_errors,
+            "reconnects": self._reconnects,
+            "seconds_since_last_frame": (
+                time.monotonic() - self._last_frame_at if self._last_frame_at else None
+            ),
+        }
+
+    def _add_subscription(self, subscription: dict[str, Any]) -> bool:
+        if subscription in self._subscriptions:
+            return False
+        self._subscriptions.append(subscription)
+        return True
+
+    async def _send(self, method: str, subscription: Optional[dict[str, Any]] = None):
+        message = {"method": method}
+        if subscription is not None:
+            message["subscription"] = subscription
+        await self._websocket.send(json.dumps(message))
+
+    async def subscribe(self, subscription: dict[str, Any]):
+        """
+        Add a subscription, sending it right away when connected
+
+        :param subscription: subscription payload, e.g. {"type": "trades", "coin": "ETH"}
+        """
+        if self._add_subscription(subscription) and self._websocket is not None:
+            await self._send("subscribe", subscription)
+
+    async def unsubscribe(self, subscription: dict[str, Any]):
+        """
+        Remove a subscription so it is not replayed on reconnect
+
+        :param subscription: subscription payload previously subscribed
+        """
+        if subscription not in self._subscriptions:
+            return
+        self._subscriptions.remove(subscription)
+        if self._websocket is not None:
+            await self._send("unsubscribe", subscription)
+
+    async def run_forever(self):
+        """Connect, ingest frames and reconnect until stop is called"""
+        self._running = True
+        delay = _MIN_RECONNECT_DELAY
+        while self._running:
+            try:
+                async with websockets.connect(self._url, ping_interval=None) as websocket:
+                    self._websocket = websocket
+                    self._last_frame_at = time.monotonic()
+                    self._logger.info("Websocket connected to %s", self._url)
+                    for subscription in self._subscriptions:
+                        await self._send("subscribe", subscription)
+                    delay = _MIN_RECONNECT_DELAY
+                    heartbeat = asyncio.create_task(self._heartbeat())
+                    try:
+                        async for frame in websocket:
+                            await self._on_frame(frame)
+                    finally:
+                        heartbeat.cancel()
+            except asyncio.CancelledError:
+                raise
+            except (ConnectionClosed, OSError, asyncio.TimeoutError) as e:
+                self._logger.warning("Websocket connection lost: %s", e)
+            except Exception:
+                self._logger.error("Unexpected websocket error", exc_info=True)
+            finally:
+                self._websocket = None
+
+            if self._running:
+                self._reconnects += 1
+                await asyncio.sleep(delay * (1 + random.random()) / 2)
+                delay = min(delay * 2, _MAX_RECONNECT_DELAY)
+
+    async def stop(self):
+        """Stop reconnecting and close the active connection"""
+        self._running = False
+        if self._websocket is not None:
+            await self._websocket.close()
+
+    async def _heartbeat(self):
+        """Ping the server and drop the connection when it goes silent"""
+        while True:
+            await asyncio.sleep(self._heartbeat_interval)
+            if time.monotonic() - self._last_frame_at > 2 * self._heartbeat_interval:
+                self._logger.warning("No websocket frame received, reconnecting")
+                await self._websocket.close()
+                return
+            await self._send("ping")
+
+    async def _on_frame(self, frame: str | bytes):
+        received = time.monotonic_ns()
+        self._last_frame_at = received / 1e9
+        message = CODECS.decode(frame)
+        channel = message.get("channel")
+        self._frames[channel] = self._frames.get(channel, 0) + 1
+
+        stream = _CHANNEL_TO_STREAM.get(channel)
+        if stream is None:
+            # pong, subscriptionResponse and error frames are not market data
+            if channel == "error":
+                self._logger.error("Websocket error frame: %s", message.get("data"))
+            return
+
+        if channel == "allMids":
+            fields = message["data"]["mids"]
+        else:
+            fields = {"frame": frame}
+        stamp(fields, TraceStage.RECEIVE, at=received)
+        stamp(fields, TraceStage.RAW_PUBLISH)
+        try:
+            await self._redis_stream_manager.publish(self._raw_streams[stream], fields)
+        except Exception:
+            self._publish_errors += 1
+            self._logger.error("Error publishing %s frame to redis", channel, exc_info=True)
@@ -0,0 +1,130 @@
+"""Async Rate Limiter"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Any, Optional
+
+from models.enums import RequestPriority
+
+
+class RateLimiter:
+    """
+    Token-bucket scheduler shared by every REST call of an exchange
+
+    Tokens refill continuously at `qps` per second up to `burst`. Each
+    request consumes tokens equal to its endpoint weight. Requests that
+    cannot be served immediately wait in priority lanes: a waiting HIGH
+    request (orders, positions) is always granted before any NORMAL or
+    LOW request (bulk market data), and requests inside a lane are
+    served in FIFO order.
+    """
+
+    def __init__(self, qps: float, burst: Optional[float] = None):
+        """
+        Constructor for the rate limiter
+
+        :param qps: sustained number of tokens granted per second
+        :param burst: maximum number of tokens that can accumulate, defaults to qps
+        :return: new instance
+        """
+        if qps <= 0:
+            raise ValueError("qps must be positive")
+        self._rate = float(qps)
+        self._capacity = float(burst or qps)
+        self._tokens = self._capacity
+        self._updated_at = time.monotonic()
+        self._waiters: list[tuple[int, int, float, float, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._granted = 0
+        self._queued = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    @property
+    def qps(self) -> float:
+        return self._rate
+
+    @property
+    def burst(self) -> float:
+        return self._capacity
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for *_, future in self._waiters if not future.done())
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return a snapshot of the queue depth and wait-time metrics"""
+        depth_by_lane = {priority.name: 0 for priority in RequestPriority}
+        for priority, *_, future in self._waiters:
+            if not future.done():
+                depth_by_lane[RequestPriority(priority).name] += 1
+        return {
+            "qps": self._rate,
+            "burst": self._capacity,
+            "tokens": self._refill(),
+            "queue_depth": sum(depth_by_lane.values()),
+            "queue_depth_by_lane": depth_by_lane,
+            "granted": self._granted,
+            "queued": self._queued,
+            "avg_wait": self._total_wait / self._queued if self._queued else 0.0,
+            "max_wait": self._max_wait,
+        }
+
+    def _refill(self) -> float:
+        now = time.monotonic()
+        self._tokens = min(
+            self._capacity, self._tokens + (now - self._updated_at) * self._rate
+        )
+        self._updated_at = now
+        return self._tokens
+
+    async def acquire(
+        self,
+        weight: float = 1,
+        priority: RequestPriority = RequestPriority.NORMAL,
+    ):
+        """
+        Wait until the request is allowed to be sent
+
+        :param weight: number of tokens the request consumes, capped at the burst size
+        :param priority: lane in which the request waits for tokens
+        """
+        weight = min(float(weight), self._capacity)
+        if not self._waiters and self._refill() >= weight:
+            self._tokens -= weight
+            self._granted += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        enqueued_at = time.monotonic()
+        heapq.heappush(
+            self._waiters, (priority.value, next(self._sequence), weight, enqueued_at, future)
+        )
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        await future
+
+    async def _dispatch(self):
+        """Grant tokens to the waiting requests in priority order"""
+        while self._waiters:
+            _, _, weight, enqueued_at, future = self._waiters[0]
+            if future.done():
+                # the waiting coroutine was cancelled, it no longer needs tokens
+                heapq.heappop(self._waiters)
+                continue
+            tokens = self._refill()
+            if tokens < weight:
+                await asyncio.sleep((weight - tokens) / self._rate)
+                continue
+            heapq.heappop(self._waiters)
+            self._tokens -= weight
+            waited = time.monotonic() - enqueued_at
+            self._granted += 1
+            self._queued += 1
+            self._total_wait += waited
+            self._max_wait = max(self._max_wait, waited)
+            future.set_result(None)
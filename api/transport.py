@@ -0,0 +1,118 @@
+"""Async HTTP Transport"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Optional
+
+from requests import Response, Session
+from requests.adapters import HTTPAdapter
+
+_DEFAULT_POOL_SIZE = 10
+_DEFAULT_CONNECT_TIMEOUT = 3.05
+_DEFAULT_READ_TIMEOUT = 10.0
+
+
+class AsyncHttpTransport:
+    """
+    Non-blocking HTTP transport over a pooled keep-alive session
+
+    Every request is executed by a dedicated worker thread so the
+    event loop is never blocked on socket I/O. The number of workers
+    matches the size of the connection pool, so each in-flight request
+    owns a persistent connection and concurrent requests overlap
+    instead of queueing behind each other.
+    """
+
+    def __init__(
+        self,
+        headers: Optional[dict[str, str]] = None,
+        pool_size: int = _DEFAULT_POOL_SIZE,
+        connect_timeout: float = _DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: float = _DEFAULT_READ_TIMEOUT,
+    ):
+        """
+        Constructor for the transport
+
+        :param headers: headers attached to every request of the session
+        :param pool_size: maximum number of keep-alive connections and concurrent requests
+        :param connect_timeout: seconds to wait for a connection to be established
+        :param read_timeout: seconds to wait for the server to send a response
+        :return: new instance
+        """
+        self._pool_size = pool_size
+        self._timeout = (connect_timeout, read_timeout)
+        self._session = Session()
+        self._session.headers.update(headers or {})
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            pool_block=True,
+        )
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        self._executor = ThreadPoolExecutor(
+            max_workers=pool_size,
+            thread_name_prefix="http-transport",
+        )
+        self._in_flight = 0
+        self._requests = 0
+        self._errors = 0
+        self._total_latency = 0.0
+
+    @property
+    def session(self) -> Session:
+        return self._session
+
+    @property
+    def pool_size(self) -> int:
+        return self._pool_size
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return a snapshot of the transport counters"""
+        return {
+            "pool_size": self._pool_size,
+            "in_flight": self._in_flight,
+            "requests": self._requests,
+            "errors": self._errors,
+            "avg_latency": self._total_latency / self._requests if self._requests else 0.0,
+        }
+
+    async def request(self, method: str, url: str, **kwargs) -> Response:
+        """
+        Send a request without blocking the running event loop
+
+        :param method: http verb, e.g. "GET" or "POST"
+        :param url: fully qualified url of the request
+        :param kwargs: any keyword argument accepted by requests.Session.request
+        :return: the response of the request
+        """
+        kwargs.setdefault("timeout", self._timeout)
+        loop = asyncio.get_running_loop()
+        self._in_flight += 1
+        start = time.perf_counter()
+        try:
+            return await loop.run_in_executor(
+                self._executor,
+                partial(self._session.request, method, url, **kwargs),
+            )
+        except Exception:
+            self._errors += 1
+            raise
+        finally:
+            self._in_flight -= 1
+            self._requests += 1
+            self._total_latency += time.perf_counter() - start
+
+    async def get(self, url: str, **kwargs) -> Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> Response:
+        return await self.request("POST", url, **kwargs)
+
+    def close(self):
+        """Release the pooled connections and the worker threads"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._session.close()
@@ -0,0 +1,66 @@
+"""
+Benchmark batch consumption against the single-message adapter path
+
+Seeds the raw prices stream with synthetic allMids entries, then drains
+it once with HyperliquidAdapter.get_oracle_prices (one entry per round
+trip) and once with get_oracle_prices_batch for each batch size.
+Uses the redis from api/hyperliquid/redis_config.json, like the job.
+
+Usage:
+    PYTHONPATH=. python benchmarks/adapter_batch_benchmark.py --entries 2000
+"""
+
+import argparse
+import asyncio
+import time
+
+from adapters.hyperliquid.hyperliquid_adapter import (
+    _REDIS_STREAMS,
+    HyperliquidAdapter,
+    _redis_stream_manager,
+)
+from models.enums import StreamNames
+
+_RAW_STREAM = _REDIS_STREAMS["raw"][StreamNames.PRICES]
+_ADAPTED_STREAM = _REDIS_STREAMS["adapted"][StreamNames.PNL]
+
+
+async def _seed(n_entries: int, n_symbols: int):
+    # trimming keeps the durable consumer groups, deleting would drop them
+    for stream_name in (_RAW_STREAM, _ADAPTED_STREAM):
+        await _redis_stream_manager.xtrim(stream_name, maxlen=0, approximate=False)
+    message = {f"COIN{i}": f"{100 + i}.25" for i in range(n_symbols)}
+    await _redis_stream_manager.publish_many(_RAW_STREAM, [message] * n_entries)
+
+
+async def _drain(adapt, n_entries: int) -> float:
+    adapted = 0
+    start = time.perf_counter()
+    while adapted < n_entries:
+        result = await adapt()
+        if not result:
+            break
+        adapted += len(result) if isinstance(result, list) else 1
+    return time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=2000)
+    parser.add_argument("--symbols", type=int, default=100)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[10, 100, 500])
+    args = parser.parse_args()
+
+    await _seed(args.entries, args.symbols)
+    elapsed = await _drain(HyperliquidAdapter().get_oracle_prices, args.entries)
+    print(f"single:     {args.entries / elapsed:10.1f} entries/s")
+
+    for batch_size in args.batch_sizes:
+        await _seed(args.entries, args.symbols)
+        adapter = HyperliquidAdapter(batch_size=batch_size)
+        elapsed = await _drain(adapter.get_oracle_prices_batch, args.entries)
+        print(f"batch={batch_size:<5} {args.entries / elapsed:10.1f} entries/s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,52 @@
+"""
+Measure the throughput of every registered codec
+
+Encodes and decodes a synthetic allMids payload with each codec of
+utilities.codecs.CODECS, and compares with the former stdlib path
+(text -> json.loads).
+
+Usage:
+    PYTHONPATH=. python benchmarks/codec_benchmark.py --symbols 1000
+"""
+
+import argparse
+import json
+import time
+
+from utilities.codecs import CODECS, PassthroughCodec
+
+
+def _throughput(func, payload, n: int) -> float:
+    start = time.perf_counter()
+    for _ in range(n):
+        func(payload)
+    return n / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--symbols", type=int, default=1000)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    mids = {f"COIN{i}": f"{100 + i}.25" for i in range(args.symbols)}
+    encoded = json.dumps(mids).encode()
+    print(f"payload: {args.symbols} symbols, {len(encoded)} bytes")
+
+    for name in CODECS.names:
+        codec = CODECS.get(name)
+        if name == PassthroughCodec.name:
+            encode = _throughput(codec.encode, encoded, args.iterations)
+            decode = _throughput(codec.decode, encoded, args.iterations)
+        else:
+            encode = _throughput(codec.encode, mids, args.iterations)
+            decode = _throughput(codec.decode, encoded, args.iterations)
+        print(f"{name:<12} encode {encode:12,.0f} ops/s   decode {decode:12,.0f} ops/s")
+
+    text = encoded.decode()
+    legacy = _throughput(json.loads, text, args.iterations)
+    print(f"{'stdlib json':<12} decode {legacy:12,.0f} ops/s (str -> json.loads)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+Microbenchmarks of the hot paths, with regression checks against a baseline
+
+Measures the best ops/s over several rounds and the peak memory allocated
+by a single operation (tracemalloc) of:
+    - JsonParser.loads on an allMids mapping
+    - CODECS.decode of an encoded allMids payload
+    - StreamNameBuilder.name
+    - HyperliquidAdapter._adapt_oracle_prices on a raw entry
+    - publish_result publishing an allMids mapping to redis
+    - the consumer decode path: reading the last adapted entry and parsing it
+
+for synthetic allMids payloads of 10 to 1,000 symbols. The redis cases run
+against --redis-url, or against an in-process fakeredis server when it is
+installed, and are skipped otherwise.
+
+With --save-baseline the results are written to the baseline file. Without
+it they are compared to the stored baseline, and the script exits with
+status 1 when a case lost more than --margin of its ops/s or allocates more
+than --margin above its baseline. Baselines are machine specific: record
+one on the machine the checks run on.
+
+Usage:
+    PYTHONPATH=. python benchmarks/hot_path_benchmark.py --save-baseline
+    PYTHONPATH=. python benchmarks/hot_path_benchmark.py --margin 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from adapters.hyperliquid.hyperliquid_adapter import HyperliquidAdapter
+from caching.stream_manager import RedisStreamManager
+from caching.streams import StreamNameBuilder
+from data_client.hyperliquid.hyperliquid_consumer import HyperliquidConsumer
+from models.enums import Blockchains, DataType, Exchanges, StreamNames
+from redis.asyncio.connection import ConnectionPool
+from utilities.codecs import CODECS
+from utilities.parsing import JsonParser
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
+
+_DEFAULT_BASELINE = Path(__file__).parent / "hot_path_baseline.json"
+_SYMBOL_COUNTS = (10, 100, 1000)
+_BENCHMARK_STREAM = "benchmark-hyperliquid-cosmos-prices"
+
+
+def _redis_clients(redis_url: str | None) -> tuple[RedisStreamManager, RedisStreamManager] | None:
+    """Return a bytes client and a decoding client sharing the same server"""
+    if redis_url is not None:
+        return (
+            RedisStreamManager.from_url(redis_url),
+            RedisStreamManager.from_url(redis_url, decode_responses=True),
+        )
+    if fakeredis is None:
+        return None
+    server = fakeredis.FakeServer()
+    return tuple(
+        RedisStreamManager(connection_pool=ConnectionPool(
+            connection_class=fakeredis.aioredis.FakeConnection,
+            server=server,
+            decode_responses=decode,
+        ))
+        for decode in (False, True)
+    )
+
+
+def _cases(n_symbols: int, clients) -> dict:
+    """Return the name -> (function, is coroutine function) of every case for a payload size"""
+    mids = {f"COIN{i}": f"{100 + i}.25" for i in range(n_symbols)}
+    encoded = CODECS.encode(mids)
+    raw_entry = {coin.encode(): price.encode() for coin, price in mids.items()}
+    adapted_entry = {f"{coin}/USD": price for coin, price in mids.items()}
+    consumer = HyperliquidConsumer("redis://localhost:6379/0", Exchanges.HYPERLIQUID, Blockchains.COSMOS)
+
+    cases = {
+        "json_parser_loads": (lambda: JsonParser.loads(mids), False),
+        "codec_decode": (lambda: CODECS.decode(encoded), False),
+        "adapt_oracle_prices": (lambda: HyperliquidAdapter._adapt_oracle_prices(raw_entry), False),
+        "consumer_parse": (lambda: consumer._parse_oracle_prices(adapted_entry), False),
+    }
+    if clients is not None:
+        writer, reader = clients
+
+        @writer.publish_result(_BENCHMARK_STREAM)
+        async def publish():
+            return mids
+
+        async def consume():
+            entries = await reader.xrevrange(_BENCHMARK_STREAM, count=1)
+            return consumer._parse_oracle_prices(entries[0][1])
+
+        cases["publish_result"] = (publish, True)
+        cases["consumer_read"] = (consume, True)
+    return cases
+
+
+def _stream_name_case() -> dict:
+    builder = (
+        StreamNameBuilder()
+        .set("marketplace", Exchanges.HYPERLIQUID)
+        .set("blockchain", Blockchains.COSMOS)
+        .set("data_type", DataType.RAW)
+        .set("stream", StreamNames.PRICES)
+    )
+    return {"stream_name": (lambda: builder.name, False)}
+
+
+def _measure(func, is_async: bool, loop: asyncio.AbstractEventLoop, duration: float, repeat: int) -> dict:
+    """Return the best ops/s of `repeat` rounds, the least disturbed by noise, and the peak allocation"""
+    call = (lambda: loop.run_until_complete(func())) if is_async else func
+    call()  # warm up caches and lazily created state
+
+    best = 0.0
+    for _ in range(repeat):
+        iterations = 0
+        start = time.perf_counter()
+        while True:
+            for _ in range(10):
+                call()
+            iterations += 10
+            elapsed = time.perf_counter() - start
+            if elapsed >= duration / repeat:
+                break
+        best = max(best, iterations / elapsed)
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    baseline, _ = tracemalloc.get_traced_memory()
+    call()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"ops_per_sec": best, "peak_bytes": peak - baseline}
+
+
+def _regressions(results: dict, baseline: dict, margin: float) -> list[str]:
+    failures = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        if result["ops_per_sec"] < reference["ops_per_sec"] * (1 - margin):
+            failures.append(
+                f"{name}: {result['ops_per_sec']:,.0f} ops/s, baseline {reference['ops_per_sec']:,.0f}")
+        if result["peak_bytes"] > reference["peak_bytes"] * (1 + margin):
+            failures.append(
+                f"{name}: {result['peak_bytes']:,} bytes, baseline {reference['peak_bytes']:,}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--redis-url", help="redis to benchmark against, in-process fakeredis if missing")
+    parser.add_argument("--duration", type=float, default=1.0, help="seconds spent on every case")
+    parser.add_argument("--repeat", type=int, default=5, help="rounds per case, the best one is kept")
+    parser.add_argument("--baseline", type=Path, default=_DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--margin", type=float, default=0.2, help="tolerated regression, 0.2 is 20%%")
+    args = parser.parse_args()
+
+    loop = asyncio.new_event_loop()
+    clients = _redis_clients(args.redis_url)
+    if clients is None:
+        print("redis cases skipped: no --redis-url and fakeredis is not installed")
+
+    cases = _stream_name_case()
+    for n_symbols in _SYMBOL_COUNTS:
+        for name, case in _cases(n_symbols, clients).items():
+            cases[f"{name}[{n_symbols}]"] = case
+
+    results = {}
+    for name, (func, is_async) in cases.items():
+        results[name] = _measure(func, is_async, loop, args.duration, args.repeat)
+        print(f"{name:<28} {results[name]['ops_per_sec']:14,.0f} ops/s {results[name]['peak_bytes']:12,} bytes")
+    loop.close()
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"baseline saved to {args.baseline}")
+        return
+
+    if not args.baseline.exists():
+        print(f"no baseline at {args.baseline}, run with --save-baseline first")
+        return
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    failures = _regressions(results, baseline, args.margin)
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    if failures:
+        sys.exit(1)
+    print(f"no regression beyond {args.margin:.0%}")
+
+
+if __name__ == "__main__":
+    main()
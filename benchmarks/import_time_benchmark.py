@@ -0,0 +1,90 @@
+"""
+Cold start budget check of the entry points
+
+Imports every entry point in a fresh interpreter, several times, and
+reports the median time spent importing it together with the heavy
+dependencies it pulled in. The script exits with status 1 when an entry
+point takes longer than its budget or imports a dependency it must only
+load on first use (pandas and pyarrow are only needed to build frames
+and archives).
+
+Budgets are in milliseconds of import time, interpreter start-up
+excluded. They hold on a developer laptop; scale them with --budget-scale
+on slower machines rather than editing them.
+
+Usage:
+    PYTHONPATH=. python benchmarks/import_time_benchmark.py
+    PYTHONPATH=. python benchmarks/import_time_benchmark.py --repeat 11 --budget-scale 2
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+_ROOT = Path(__file__).resolve().parent.parent
+# entry point -> import time budget in milliseconds
+_BUDGETS_MS = {
+    "api.hyperliquid.hyperliquid": 500,
+    "adapters.hyperliquid.hyperliquid_adapter": 550,
+    "data_client.hyperliquid.hyperliquid_consumer": 500,
+    "jobs.hyperliquid.hyperliquid_job": 700,
+    "jobs.multi_exchange.multi_exchange_job": 400,
+}
+# dependencies loaded on first use only
+_DEFERRED = ("pandas", "pyarrow")
+_REPORTED = ("numpy", "pandas", "pyarrow", "pydantic", "redis", "requests", "orjson")
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"ms": elapsed * 1000, "loaded": [m for m in {reported!r} if m in sys.modules]}}))
+"""
+
+
+def _measure(module: str, repeat: int) -> tuple[float, list[str]]:
+    """Return the median import time of a module in a fresh interpreter, and the heavy dependencies it loaded"""
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(_ROOT), os.environ.get("PYTHONPATH")]))}
+    timings = []
+    loaded: list[str] = []
+    for _ in range(repeat):
+        completed = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module, reported=_REPORTED)],
+            capture_output=True, text=True, check=True, cwd=_ROOT, env=env,
+        )
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        timings.append(result["ms"])
+        loaded = result["loaded"]
+    return statistics.median(timings), loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=7, help="fresh interpreters per entry point, the median is kept")
+    parser.add_argument("--budget-scale", type=float, default=1.0, help="multiplier applied to every budget")
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'entry point':<48} {'import ms':>10} {'budget ms':>10}  loaded")
+    for module, budget in _BUDGETS_MS.items():
+        budget *= args.budget_scale
+        elapsed, loaded = _measure(module, args.repeat)
+        print(f"{module:<48} {elapsed:>10.0f} {budget:>10.0f}  {', '.join(loaded)}")
+        if elapsed > budget:
+            failures.append(f"{module} imports in {elapsed:.0f} ms, over its {budget:.0f} ms budget")
+        deferred = [dependency for dependency in _DEFERRED if dependency in loaded]
+        if deferred:
+            failures.append(f"{module} imports {', '.join(deferred)} at start-up")
+
+    for failure in failures:
+        print(f"FAILED: {failure}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
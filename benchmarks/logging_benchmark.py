@@ -0,0 +1,98 @@
+"""
+Compare the caller-side cost of the logging setups
+
+Logs an allMids payload at INFO for every message, as the adapter did,
+with:
+    - the former setup: a synchronous FileHandler
+    - SetupLogger in synchronous mode (rotating file)
+    - SetupLogger in asynchronous mode (queue and listener thread)
+    - the sampled and rate-limited payload logger of an asynchronous SetupLogger
+
+The caller throughput is what the event loop pays. For asynchronous
+modes the time until the listener has written every record is also shown.
+On a fast local disk the caller cost is dominated by rendering the payload
+into the message, which only sampling avoids; --write-delay-us simulates a
+slow or contended disk, whose stalls the asynchronous modes keep off the
+caller.
+
+Usage:
+    PYTHONPATH=. python benchmarks/logging_benchmark.py --messages 20000 --symbols 100
+"""
+
+import argparse
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from utilities.logger import SetupLogger
+
+
+def _former_logger(log_file: Path) -> logging.Logger:
+    logger = logging.getLogger("benchmark_former")
+    logger.setLevel(logging.DEBUG)
+    handler = logging.FileHandler(log_file)
+    handler.setLevel(logging.DEBUG)
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+    logger.addHandler(handler)
+    return logger
+
+
+def _slow_down(handler: logging.Handler, delay: float):
+    emit = handler.emit
+
+    def slow_emit(record):
+        time.sleep(delay)
+        emit(record)
+
+    handler.emit = slow_emit
+
+
+def _file_handlers(logger: logging.Logger, log_file: Path) -> list[logging.Handler]:
+    listener = SetupLogger._listeners.get(os.path.abspath(log_file))
+    handlers = listener.handlers if listener is not None else logger.handlers
+    return [handler for handler in handlers if isinstance(handler, logging.FileHandler)]
+
+
+def _run(name: str, logger: logging.Logger, payload: dict, n: int):
+    start = time.perf_counter()
+    for _ in range(n):
+        logger.info("Raw data received from redis: %s ", payload)
+    caller = time.perf_counter() - start
+    SetupLogger.shutdown()
+    drained = time.perf_counter() - start
+    print(f"{name:<28} {n / caller:12,.0f} msg/s on the caller   {drained:7.3f}s until written")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--symbols", type=int, default=100)
+    parser.add_argument("--write-delay-us", type=float, default=0.0,
+                        help="simulated blocking time of every write")
+    args = parser.parse_args()
+
+    payload = {f"COIN{i}": f"{100 + i}.25" for i in range(args.symbols)}
+    directory = Path(tempfile.mkdtemp())
+
+    setups = {
+        "former FileHandler": lambda path: _former_logger(path),
+        "synchronous rotating": lambda path: SetupLogger(
+            "benchmark_sync", str(path), asynchronous=False).create_logger(),
+        "asynchronous queue": lambda path: SetupLogger(
+            "benchmark_async", str(path)).create_logger(),
+        "asynchronous sampled payload": lambda path: SetupLogger(
+            "benchmark_payload", str(path)).create_payload_logger(),
+    }
+    for i, (name, setup) in enumerate(setups.items()):
+        log_file = directory / f"{i}.log"
+        logger = setup(log_file)
+        if args.write_delay_us:
+            for handler in _file_handlers(logging.getLogger(logger.name.split(".")[0]), log_file):
+                _slow_down(handler, args.write_delay_us / 1e6)
+        _run(name, logger, payload, args.messages)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Microbenchmark the order book engine
+
+Measures the cost of a single level update near the top of the book,
+of extracting the top-N levels, and of building the DataFrame view,
+across many tickers.
+
+Usage:
+    PYTHONPATH=. python benchmarks/orderbook_benchmark.py --tickers 300
+"""
+
+import argparse
+import random
+import time
+
+from models.orderbook import OrderBookEngine
+
+
+def _seed(engine: OrderBookEngine, tickers: list[str], levels: int):
+    for ticker in tickers:
+        engine.apply_snapshot(
+            ticker,
+            [(100.0 - i * 0.01, 1.0) for i in range(levels)],
+            [(100.01 + i * 0.01, 1.0) for i in range(levels)],
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickers", type=int, default=300)
+    parser.add_argument("--levels", type=int, default=200)
+    parser.add_argument("--updates", type=int, default=200_000)
+    parser.add_argument("--depth", type=int, default=50)
+    args = parser.parse_args()
+
+    engine = OrderBookEngine(capacity=args.levels)
+    tickers = [f"COIN{i}/USD" for i in range(args.tickers)]
+    _seed(engine, tickers, args.levels)
+
+    rng = random.Random(0)
+    updates = [
+        (
+            rng.choice(tickers),
+            is_bid := rng.random() < 0.5,
+            round((100.0 - rng.randint(0, 30) * 0.01) if is_bid else (100.01 + rng.randint(0, 30) * 0.01), 2),
+            rng.choice([0.0, 0.5, 1.0, 2.0]),
+        )
+        for _ in range(args.updates)
+    ]
+    start = time.perf_counter()
+    for ticker, is_bid, price, size in updates:
+        engine.apply_update(ticker, is_bid, price, size)
+    elapsed = time.perf_counter() - start
+    print(f"update:   {elapsed / args.updates * 1e6:8.2f} us/op ({args.updates / elapsed:,.0f} ops/s)")
+
+    books = [engine.book(ticker) for ticker in tickers]
+    rounds = 20
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for book in books:
+            book.top(args.depth)
+    elapsed = time.perf_counter() - start
+    print(f"top-{args.depth}:   {elapsed / (rounds * len(books)) * 1e6:8.2f} us/op")
+
+    start = time.perf_counter()
+    for book in books:
+        book.to_frame(args.depth)
+    elapsed = time.perf_counter() - start
+    print(f"frame:    {elapsed / len(books) * 1e6:8.2f} us/op (built)")
+
+    start = time.perf_counter()
+    for book in books:
+        book.to_frame(args.depth)
+    elapsed = time.perf_counter() - start
+    print(f"frame:    {elapsed / len(books) * 1e6:8.2f} us/op (cached)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Measure the per-message cost of normalizing allMids coin names
+
+Compares rebuilding f"{coin.decode()}/USD" for every symbol of every
+message with looking up the interned ticker in the SymbolRegistry.
+
+Usage:
+    PYTHONPATH=. python benchmarks/symbol_benchmark.py --symbols 10 100 1000
+"""
+
+import argparse
+import time
+
+from models.enums import Blockchains, Exchanges
+from models.symbols import SymbolRegistry
+
+
+def _legacy(prices_data: dict) -> dict:
+    return {f"{ticker.decode()}/USD": float(price.decode())
+            for ticker, price in prices_data.items()}
+
+
+def _registry(registry: SymbolRegistry):
+    ticker = registry.ticker
+
+    def adapt(prices_data: dict) -> dict:
+        return {ticker(coin): float(price) for coin, price in prices_data.items()}
+
+    return adapt
+
+
+def _by_id(registry: SymbolRegistry):
+    symbol_id = registry.id
+
+    def adapt(prices_data: dict) -> list:
+        return [(symbol_id(coin), float(price)) for coin, price in prices_data.items()]
+
+    return adapt
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--symbols", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--messages", type=int, default=2000)
+    args = parser.parse_args()
+
+    for n_symbols in args.symbols:
+        registry = SymbolRegistry(Exchanges.HYPERLIQUID, Blockchains.COSMOS)
+        message = {f"COIN{i}".encode(): f"{100 + i}.25".encode() for i in range(n_symbols)}
+        registry.load_metadata({"name": coin.decode()} for coin in message)
+        for name, adapt in (
+            ("f-string", _legacy),
+            ("registry", _registry(registry)),
+            ("ids", _by_id(registry)),
+        ):
+            start = time.perf_counter()
+            for _ in range(args.messages):
+                adapt(message)
+            elapsed = time.perf_counter() - start
+            print(f"symbols={n_symbols:<5} {name:<9} {elapsed / args.messages * 1e6:10.2f} us/message")
+
+
+if __name__ == "__main__":
+    main()
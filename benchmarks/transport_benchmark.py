@@ -0,0 +1,103 @@
+"""
+Benchmark concurrent endpoint fetches through the async transport
+
+Starts a local mock server that answers every request after a fixed
+delay, then compares awaiting the requests one after another with
+gathering them concurrently through DEXExchangeBase.request.
+
+Usage:
+    PYTHONPATH=. python benchmarks/transport_benchmark.py
+"""
+
+import argparse
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from api.dex_exchange_base import DEXExchangeBase
+
+_RESPONSE_DELAY = 0.05
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(_RESPONSE_DELAY)
+        payload = json.dumps({"BTC": "39874.58", "ETH": "2645.55"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class _MockExchange(DEXExchangeBase):
+    def __init__(self, base_url: str, pool_size: int):
+        self._base_url = base_url
+        super().__init__(pool_size=pool_size)
+
+    @property
+    def base_rest_url(self) -> str:
+        return self._base_url
+
+    @property
+    def base_websocket_url(self) -> str:
+        return ""
+
+    @property
+    def rest_endpoint_urls(self) -> dict[str, str]:
+        return {"allMids": "info"}
+
+    @property
+    def session_headers(self) -> dict[str, str]:
+        return {"Content-Type": "application/json"}
+
+
+async def _run(exchange: DEXExchangeBase, n_requests: int) -> tuple[float, float]:
+    body = {"type": "allMids"}
+    # warm up the pool so both runs use established connections
+    await asyncio.gather(*(exchange.request("POST", "allMids", body=body)
+                           for _ in range(exchange.transport.pool_size)))
+
+    start = time.perf_counter()
+    for _ in range(n_requests):
+        await exchange.request("POST", "allMids", body=body)
+    sequential = time.perf_counter() - start
+
+    start = time.perf_counter()
+    await asyncio.gather(*(exchange.request("POST", "allMids", body=body)
+                           for _ in range(n_requests)))
+    concurrent = time.perf_counter() - start
+    return sequential, concurrent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--pool-size", type=int, default=10)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _MockHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    exchange = _MockExchange(f"http://127.0.0.1:{server.server_port}/", args.pool_size)
+    try:
+        sequential, concurrent = asyncio.run(_run(exchange, args.requests))
+    finally:
+        asyncio.run(exchange.close())
+        server.shutdown()
+
+    print(f"requests={args.requests} pool_size={args.pool_size} delay={_RESPONSE_DELAY}s")
+    print(f"sequential: {sequential:.3f}s ({args.requests / sequential:.1f} req/s)")
+    print(f"concurrent: {concurrent:.3f}s ({args.requests / concurrent:.1f} req/s)")
+    print(f"speedup:    {sequential / concurrent:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
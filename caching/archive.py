@@ -0,0 +1,352 @@
+import json
+import os
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from caching.stream_manager import RedisStreamManager
+from utilities.logger import SetupLogger
+
+_DEFAULT_CHUNK_SIZE = 10_000
+_DEFAULT_COMPRESSION = "zstd"
+_CHECKPOINT_FILE = "_checkpoints.json"
+_COMPACTED_PREFIX = "compacted-"
+_MS_PER_HOUR = 3_600_000
+_ID_COLUMNS = ("id", "timestamp")
+
+
+def _partition(root: Path, stream_name: str, hour_ms: int) -> Path:
+    hour = datetime.fromtimestamp(hour_ms / 1000, tz=timezone.utc)
+    return root / stream_name / f"date={hour:%Y-%m-%d}" / f"hour={hour:%H}"
+
+
+def _partition_hour(directory: Path) -> int:
+    date = directory.parent.name.split("=", 1)[1]
+    hour = directory.name.split("=", 1)[1]
+    return int(datetime.strptime(f"{date} {hour}", "%Y-%m-%d %H")
+               .replace(tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def _parse_id(entry_id: str) -> tuple[int, int]:
+    milliseconds, sequence = entry_id.split("-", 1)
+    return int(milliseconds), int(sequence)
+
+
+def _partition_files(directory: Path) -> tuple[list[Path], list[Path]]:
+    """
+    Return the files of an hourly partition to read and the ones left over by a compaction
+
+    Parts are named after their first id and compacted files after their
+    last id. A part whose entries are all in the latest compacted file,
+    or an older compacted file, is left over by a compaction interrupted
+    before it removed them.
+    """
+    compacted = sorted(
+        directory.glob(f"{_COMPACTED_PREFIX}*.arrow"),
+        key=lambda path: _parse_id(path.stem[len(_COMPACTED_PREFIX):]))
+    parts = sorted(
+        (path for path in directory.glob("*.arrow") if not path.name.startswith(_COMPACTED_PREFIX)),
+        key=lambda path: _parse_id(path.stem))
+    if not compacted:
+        return parts, []
+    last_id = _parse_id(compacted[-1].stem[len(_COMPACTED_PREFIX):])
+    live = [compacted[-1]] + [path for path in parts if _parse_id(path.stem) > last_id]
+    stale = compacted[:-1] + [path for path in parts if _parse_id(path.stem) <= last_id]
+    return live, stale
+
+
+def _read_file(path: Path) -> pa.Table:
+    """Read an archive file, memory-mapped, with every field as binary"""
+    # the map stays open while the table references its buffers
+    table = ipc.open_file(pa.memory_map(str(path))).read_all()
+    for i, field in enumerate(table.schema):
+        if field.name not in _ID_COLUMNS and field.type != pa.binary():
+            # files written before fields were kept as binary hold float64 columns
+            table = table.set_column(
+                i, field.name, table.column(i).cast(pa.string()).cast(pa.binary()))
+    return table
+
+
+def _cast_numeric(table: pa.Table) -> pa.Table:
+    """Cast the fields whose values all parse as numbers to float64"""
+    for i, field in enumerate(table.schema):
+        if field.name in _ID_COLUMNS:
+            continue
+        try:
+            column = table.column(i).cast(pa.string()).cast(pa.float64())
+        except pa.ArrowInvalid:
+            continue
+        table = table.set_column(i, field.name, column)
+    return table
+
+
+def _entries_to_table(entries: list) -> pa.Table:
+    """
+    Convert raw stream entries to a columnar table
+
+    Every field becomes a binary column holding the values as published,
+    so files of a stream always agree on the type of a field whatever
+    values a chunk happens to hold. Missing fields are null.
+    """
+    ids = []
+    timestamps = []
+    columns: dict[bytes, list] = {}
+    for i, (entry_id, fields) in enumerate(entries):
+        entry_id = entry_id.decode() if isinstance(entry_id, bytes) else entry_id
+        ids.append(entry_id)
+        timestamps.append(int(entry_id.split("-", 1)[0]))
+        for name, value in fields.items():
+            columns.setdefault(name, [None] * len(entries))[i] = value
+
+    arrays = {
+        "id": pa.array(ids, type=pa.string()),
+        "timestamp": pa.array(timestamps, type=pa.timestamp("ms", tz="UTC")),
+    }
+    for name, values in columns.items():
+        column_name = name.decode() if isinstance(name, bytes) else name
+        arrays[column_name] = pa.array(
+            [value.encode() if isinstance(value, str) else value for value in values],
+            type=pa.binary(),
+        )
+    return pa.table(arrays)
+
+
+class StreamArchiver:
+    """
+    Drain redis streams into compressed columnar files
+
+    Entries are written as Arrow IPC files partitioned by stream and
+    hour: <root>/<stream>/date=YYYY-MM-DD/hour=HH/<first id>.arrow.
+    The last archived id of every stream is checkpointed after its files
+    are written, so a restarted archiver resumes where it stopped and a
+    crash between the two steps only rewrites the same files.
+
+    Every pass writes one part per hour it spans. Once the checkpoint of
+    a stream moves past an hour no entry can land in it anymore, and its
+    parts are compacted into a single compacted-<last id>.arrow file.
+
+    Redis stays small: with `retention` set, archived entries older
+    than the retention window are trimmed from the streams. Entries a
+    consumer group has not read or acknowledged yet are never trimmed,
+    so a lagging or stopped consumer still gets them when it catches up.
+    """
+
+    def __init__(
+        self,
+        redis_stream_manager: RedisStreamManager,
+        stream_names: list[str],
+        root: Path,
+        chunk_size: int = _DEFAULT_CHUNK_SIZE,
+        compression: Optional[str] = _DEFAULT_COMPRESSION,
+        retention: Optional[float] = None,
+    ):
+        """
+        :param redis_stream_manager: redis client owning the streams
+        :param stream_names: streams to archive
+        :param root: directory of the archive
+        :param chunk_size: maximum number of entries read per round trip
+        :param compression: "zstd", "lz4" or None, uncompressed files are read without copies
+        :param retention: seconds of archived history kept in redis, never trimmed if null
+        """
+        self.redis = redis_stream_manager
+        self.stream_names = stream_names
+        self.root = Path(root)
+        self.chunk_size = chunk_size
+        self.compression = compression
+        self.retention = retention
+        self.logger_config = SetupLogger(
+            'stream_archiver', 'logs/streams/stream_archiver.log')
+        self.logger = self.logger_config.create_logger()
+        self._checkpoint_path = self.root / _CHECKPOINT_FILE
+        self.checkpoints: dict[str, str] = self._load_checkpoints()
+        # stream -> hour of the checkpoint when its partitions were last compacted
+        self._compacted_hours: dict[str, int] = {}
+
+    def _load_checkpoints(self) -> dict[str, str]:
+        if not self._checkpoint_path.exists():
+            return {}
+        with open(self._checkpoint_path) as f:
+            return json.load(f)
+
+    def _save_checkpoints(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        temporary_path = self._checkpoint_path.with_suffix(".tmp")
+        with open(temporary_path, "w") as f:
+            json.dump(self.checkpoints, f)
+        os.replace(temporary_path, self._checkpoint_path)
+
+    def _write(self, stream_name: str, entries: list):
+        """Write a chunk of entries, one file per hour it spans"""
+        by_hour: dict[int, list] = {}
+        for entry in entries:
+            entry_id = entry[0].decode() if isinstance(entry[0], bytes) else entry[0]
+            hour_ms = int(entry_id.split("-", 1)[0]) // _MS_PER_HOUR * _MS_PER_HOUR
+            by_hour.setdefault(hour_ms, []).append(entry)
+
+        options = ipc.IpcWriteOptions(compression=self.compression)
+        for hour_ms, hour_entries in by_hour.items():
+            table = _entries_to_table(hour_entries)
+            directory = _partition(self.root, stream_name, hour_ms)
+            directory.mkdir(parents=True, exist_ok=True)
+            first_id = table.column("id")[0].as_py()
+            with ipc.new_file(directory / f"{first_id}.arrow", table.schema, options=options) as writer:
+                writer.write_table(table)
+
+    async def archive_stream(self, stream_name: str) -> int:
+        """
+        Archive every entry of a stream appended since the last checkpoint
+
+        :param stream_name: stream to archive
+        :return: number of archived entries
+        """
+        archived = 0
+        while True:
+            last_id = self.checkpoints.get(stream_name)
+            low = f"({last_id}" if last_id else "-"
+            entries = await self.redis.xrange(stream_name, min=low, max="+", count=self.chunk_size)
+            if not entries:
+                break
+            self._write(stream_name, entries)
+            last_entry_id = entries[-1][0]
+            self.checkpoints[stream_name] = (
+                last_entry_id.decode() if isinstance(last_entry_id, bytes) else last_entry_id)
+            self._save_checkpoints()
+            archived += len(entries)
+            if len(entries) < self.chunk_size:
+                break
+
+        if stream_name in self.checkpoints:
+            checkpoint_hour = _parse_id(self.checkpoints[stream_name])[0] // _MS_PER_HOUR * _MS_PER_HOUR
+            if self._compacted_hours.get(stream_name) != checkpoint_hour:
+                self.compact(stream_name)
+                self._compacted_hours[stream_name] = checkpoint_hour
+
+        if self.retention is not None and stream_name in self.checkpoints:
+            checkpoint_ms = int(self.checkpoints[stream_name].split("-", 1)[0])
+            min_id = min(checkpoint_ms, int((time.time() - self.retention) * 1000))
+            group_floor = await self._group_floor(stream_name)
+            if group_floor is not None:
+                min_id = min(min_id, group_floor)
+            await self.redis.xtrim(stream_name, minid=min_id, approximate=True)
+        return archived
+
+    async def _group_floor(self, stream_name: str) -> Optional[int]:
+        """
+        Return the time, in milliseconds, of the oldest entry a consumer group of the stream still needs
+
+        That is the oldest pending entry of a group, or its last delivered
+        entry when nothing is pending, every later entry being undelivered.
+
+        :param stream_name: trimmed stream
+        :return: the oldest time to keep, null if the stream has no group
+        """
+        floor = None
+        for group in await self.redis.xinfo_groups(stream_name):
+            group_name = group["name"]
+            if group["pending"]:
+                entry_id = (await self.redis.xpending(stream_name, group_name))["min"]
+            else:
+                entry_id = group["last-delivered-id"]
+            entry_id = entry_id.decode() if isinstance(entry_id, bytes) else entry_id
+            entry_ms = _parse_id(entry_id)[0]
+            floor = entry_ms if floor is None else min(floor, entry_ms)
+        return floor
+
+    def compact(self, stream_name: str) -> int:
+        """
+        Rewrite the parts of every closed hour of a stream into one file
+
+        An hour is closed once the checkpoint of the stream is past it. The
+        compacted file is written aside and moved into place before the
+        parts are removed, readers skip the parts it already holds, so a
+        crash at any step loses nor duplicates any entry.
+
+        :param stream_name: archived stream
+        :return: number of compacted hours
+        """
+        checkpoint = self.checkpoints.get(stream_name)
+        if checkpoint is None:
+            return 0
+        checkpoint_ms = _parse_id(checkpoint)[0]
+        options = ipc.IpcWriteOptions(compression=self.compression)
+        compacted = 0
+        for directory in sorted((self.root / stream_name).glob("date=*/hour=*")):
+            if _partition_hour(directory) + _MS_PER_HOUR > checkpoint_ms:
+                continue
+            live, stale = _partition_files(directory)
+            if len(live) > 1:
+                table = pa.concat_tables([_read_file(path) for path in live], promote_options="default")
+                last_id = table.column("id")[-1].as_py()
+                temporary_path = directory / f"{_COMPACTED_PREFIX}{last_id}.tmp"
+                with ipc.new_file(temporary_path, table.schema, options=options) as writer:
+                    writer.write_table(table)
+                os.replace(temporary_path, directory / f"{_COMPACTED_PREFIX}{last_id}.arrow")
+                stale += live
+                compacted += 1
+            for path in stale:
+                path.unlink(missing_ok=True)
+        if compacted:
+            self.logger.info("Compacted %s hours of stream %s", compacted, stream_name)
+        return compacted
+
+    async def archive(self) -> dict[str, int]:
+        """Archive every stream, returning the number of archived entries per stream"""
+        counts = {}
+        for stream_name in self.stream_names:
+            try:
+                counts[stream_name] = await self.archive_stream(stream_name)
+            except Exception as e:
+                self.logger.error(
+                    f"An error occurred while archiving stream {stream_name}: {e}")
+        self.logger.info("Archived entries: %s", counts)
+        return counts
+
+
+def read_archive(
+    root: Path,
+    stream_name: str,
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    numeric: bool = True,
+) -> pa.Table:
+    """
+    Read the archived entries of a stream through memory-mapped files
+
+    Only the hourly partitions overlapping the time range are opened.
+    Uncompressed files are read without copying their buffers.
+
+    :param root: directory of the archive
+    :param stream_name: archived stream
+    :param start: unix time of the first entry, no bound if null
+    :param end: unix time of the last entry, no bound if null
+    :param numeric: whether fields whose values all parse as numbers are cast to float64, all fields are
+        binary otherwise
+    :return: table with "id", "timestamp" and one column per field
+    """
+    stream_root = Path(root) / stream_name
+    start_hour = None if start is None else int(start * 1000) // _MS_PER_HOUR * _MS_PER_HOUR
+    end_hour = None if end is None else int(end * 1000) // _MS_PER_HOUR * _MS_PER_HOUR
+
+    tables = []
+    for directory in sorted(stream_root.glob("date=*/hour=*")):
+        hour_ms = _partition_hour(directory)
+        if (start_hour is not None and hour_ms < start_hour) or \
+                (end_hour is not None and hour_ms > end_hour):
+            continue
+        tables.extend(_read_file(path) for path in _partition_files(directory)[0])
+
+    if not tables:
+        return pa.table({})
+    table = pa.concat_tables(tables, promote_options="default")
+    if start is not None or end is not None:
+        timestamps = table.column("timestamp").cast(pa.int64()).to_numpy()
+        mask = pa.array(
+            ((timestamps >= start * 1000) if start is not None else True)
+            & ((timestamps <= end * 1000) if end is not None else True)
+        )
+        table = table.filter(mask)
+    return _cast_numeric(table) if numeric else table
@@ -0,0 +1,196 @@
+import time
+from typing import Any, Optional
+
+from redis.asyncio.connection import BlockingConnectionPool
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from models.enums import PoolRole
+from utilities.metrics import METRICS, MetricsRegistry
+
+POOL_MAX_CONNECTIONS = "dex_redis_pool_max_connections"
+POOL_IN_USE = "dex_redis_pool_in_use_connections"
+POOL_IDLE = "dex_redis_pool_idle_connections"
+POOL_UTILISATION = "dex_redis_pool_utilisation"
+POOL_WAITS = "dex_redis_pool_waits_total"
+POOL_WAIT = "dex_redis_pool_wait_seconds"
+POOL_TIMEOUTS = "dex_redis_pool_timeouts_total"
+# settings of the pools of a role, overridden by the "pools" section of a redis config
+_DEFAULT_POOL_SETTINGS = {
+    PoolRole.WRITE: {
+        "max_connections": 32,
+        # seconds a command waits for a free connection before failing
+        "timeout": 5,
+        # idle connections are pinged before reuse once this many seconds passed
+        "health_check_interval": 30,
+        "socket_keepalive": True,
+        "socket_timeout": 10,
+    },
+    PoolRole.READ: {
+        "max_connections": 64,
+        "timeout": 5,
+        "health_check_interval": 30,
+        "socket_keepalive": True,
+        # blocking reads legitimately wait on the socket for as long as they block
+        "socket_timeout": None,
+    },
+}
+
+
+class MeteredConnectionPool(BlockingConnectionPool):
+    """
+    Bounded redis connection pool recording its utilisation
+
+    Commands wait up to `timeout` seconds for a free connection once
+    `max_connections` are in use instead of opening more. Connections in
+    use and idle, the utilisation, the waits for a free connection and
+    the waits that timed out are recorded in the metrics registry,
+    labelled by pool name.
+    """
+
+    def __init__(self, name: str, role: PoolRole, metrics: MetricsRegistry = METRICS, **kwargs):
+        """
+        :param name: name of the pool, used as metric label
+        :param role: commands the pool is dedicated to
+        :param metrics: registry receiving the pool gauges and counters
+        :param kwargs: BlockingConnectionPool and connection arguments
+        """
+        super().__init__(**kwargs)
+        self.name = name
+        self.role = role
+        metrics.gauge(POOL_MAX_CONNECTIONS, pool=name).set(self.max_connections)
+        self._in_use = metrics.gauge(POOL_IN_USE, pool=name)
+        self._idle = metrics.gauge(POOL_IDLE, pool=name)
+        self._utilisation = metrics.gauge(POOL_UTILISATION, pool=name)
+        self._waits = metrics.counter(POOL_WAITS, pool=name)
+        self._wait = metrics.histogram(POOL_WAIT, pool=name)
+        self._timeouts = metrics.counter(POOL_TIMEOUTS, pool=name)
+
+    @property
+    def stats(self) -> dict[str, Any]:
+        """Return the connections in use and idle, the utilisation and the waits of the pool"""
+        in_use = len(self._in_use_connections)
+        return {
+            "role": self.role.value,
+            "max_connections": self.max_connections,
+            "in_use": in_use,
+            "idle": len(self._available_connections),
+            "utilisation": in_use / self.max_connections,
+            "waits": self._waits.value,
+            "wait_p99": self._wait.percentile(0.99),
+            "timeouts": self._timeouts.value,
+        }
+
+    async def get_connection(self, command_name, *keys, **options):
+        if self.can_get_connection():
+            connection = await super().get_connection(command_name, *keys, **options)
+        else:
+            self._waits.inc()
+            started = time.perf_counter()
+            try:
+                connection = await super().get_connection(command_name, *keys, **options)
+            except RedisConnectionError:
+                self._timeouts.inc()
+                raise
+            finally:
+                self._wait.record(time.perf_counter() - started)
+        self._observe()
+        return connection
+
+    async def release(self, connection):
+        await super().release(connection)
+        self._observe()
+
+    def _observe(self):
+        in_use = len(self._in_use_connections)
+        self._in_use.set(in_use)
+        self._idle.set(len(self._available_connections))
+        self._utilisation.set(in_use / self.max_connections)
+
+
+class RedisConnectionManager:
+    """
+    Owner of the redis connection pools of a process
+
+    Every redis gets one bounded pool per role: blocking stream reads hold
+    their connection for as long as they block, so they draw from the read
+    pool and can never exhaust the connections publishers need. Clients of
+    the same redis, role and response decoding share one pool, whichever
+    exchange, adapter, consumer or job builds them. Pools are sized and
+    kept alive per role, see `configure`.
+    """
+
+    def __init__(self, metrics: MetricsRegistry = METRICS):
+        """
+        :param metrics: registry receiving the pool gauges and counters
+        """
+        self._metrics = metrics
+        self._pools: dict[str, MeteredConnectionPool] = {}
+        self._settings: dict[tuple[str, PoolRole], dict[str, Any]] = {}
+
+    @staticmethod
+    def pool_name(redis_url: str, role: PoolRole, decode_responses: bool = False) -> str:
+        """Return the name of a pool, e.g. "write:redis://localhost:6379/0" """
+        name = f"{role.value}:{redis_url}"
+        return f"{name}:decoded" if decode_responses else name
+
+    def configure(self, redis_url: str, role: PoolRole, **settings: Any):
+        """
+        Override the settings of the pools of a redis and role
+
+        Settings apply to pools built afterwards, pools already in use keep theirs.
+
+        :param redis_url: url of the redis
+        :param role: role of the pools
+        :param settings: max_connections, timeout, health_check_interval, socket_keepalive, socket_timeout, ...
+        """
+        self._settings.setdefault((redis_url, role), {}).update(settings)
+
+    def pool(
+        self,
+        redis_url: str,
+        role: PoolRole = PoolRole.WRITE,
+        decode_responses: bool = False,
+        encoding: str = "utf-8",
+    ) -> MeteredConnectionPool:
+        """
+        Return the pool of a redis and role, building it on first use
+
+        :param redis_url: url of the redis
+        :param role: commands the connections are used for
+        :param decode_responses: whether responses are decoded to str
+        :param encoding: encoding of the decoded responses
+        """
+        name = self.pool_name(redis_url, role, decode_responses)
+        pool = self._pools.get(name)
+        if pool is None:
+            settings = {**_DEFAULT_POOL_SETTINGS[role], **self._settings.get((redis_url, role), {})}
+            pool = self._pools[name] = MeteredConnectionPool.from_url(
+                redis_url,
+                name=name,
+                role=role,
+                metrics=self._metrics,
+                decode_responses=decode_responses,
+                encoding=encoding,
+                **settings,
+            )
+        return pool
+
+    @property
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Return the stats of every pool, by pool name"""
+        return {name: pool.stats for name, pool in self._pools.items()}
+
+    async def aclose(self, name: Optional[str] = None):
+        """
+        Disconnect and forget pools, clients still holding them reconnect on their next command
+
+        :param name: pool to close, every pool if null
+        """
+        names = [name] if name is not None else list(self._pools)
+        for pool_name in names:
+            pool = self._pools.pop(pool_name, None)
+            if pool is not None:
+                await pool.disconnect()
+
+
+CONNECTIONS = RedisConnectionManager()
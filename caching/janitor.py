@@ -0,0 +1,103 @@
+import asyncio
+import re
+
+from redis.asyncio import ResponseError
+
+from caching.stream_manager import RedisStreamManager
+from utilities.logger import SetupLogger
+
+_DEFAULT_INTERVAL = 300.0
+_DEFAULT_CONSUMER_IDLE_MS = 3_600_000
+# groups created by the former generate_group_name carried a unix timestamp suffix
+_LEGACY_GROUP_PATTERN = re.compile(r"_\d{10}$")
+
+
+class StreamJanitor:
+    """
+    Periodically remove orphaned consumer groups and consumers
+
+    A consumer is orphaned once it has been idle longer than
+    `consumer_idle_ms` and owns no pending entries; consumers that still
+    own entries are left alone so the live consumers of the group can
+    reclaim them first. Only legacy time-stamped groups are destroyed:
+    a durable group left without consumers may belong to a service that
+    runs rarely or that this job does not know about, and destroying it
+    would make that service re-read the whole stream.
+    """
+
+    def __init__(
+        self,
+        redis_stream_manager: RedisStreamManager,
+        stream_names: list[str],
+        interval: float = _DEFAULT_INTERVAL,
+        consumer_idle_ms: int = _DEFAULT_CONSUMER_IDLE_MS,
+    ):
+        """
+        :param redis_stream_manager: redis client owning the streams
+        :param stream_names: streams to keep clean
+        :param interval: seconds between two cleanups
+        :param consumer_idle_ms: idle time after which a consumer without pending entries is removed
+        """
+        self.redis = redis_stream_manager
+        self.stream_names = stream_names
+        self.interval = interval
+        self.consumer_idle_ms = consumer_idle_ms
+        self.logger_config = SetupLogger(
+            'stream_janitor', 'logs/streams/stream_janitor.log')
+        self.logger = self.logger_config.create_logger()
+
+    @staticmethod
+    def _decode(value) -> str:
+        return value.decode() if isinstance(value, bytes) else value
+
+    def _is_orphaned_group(self, group: dict) -> bool:
+        return bool(_LEGACY_GROUP_PATTERN.search(self._decode(group["name"])))
+
+    async def clean_stream(self, stream_name: str) -> tuple[int, int]:
+        """
+        Remove the orphaned consumers and groups of a stream
+
+        :param stream_name: stream to clean
+        :return: number of removed consumers and removed groups
+        """
+        removed_consumers = 0
+        removed_groups = 0
+        try:
+            groups = await self.redis.xinfo_groups(stream_name)
+        except ResponseError:
+            # the stream does not exist yet
+            return removed_consumers, removed_groups
+
+        for group in groups:
+            group_name = self._decode(group["name"])
+            consumers = await self.redis.xinfo_consumers(stream_name, group_name)
+            for consumer in consumers:
+                if consumer["pending"] == 0 and consumer["idle"] > self.consumer_idle_ms:
+                    await self.redis.xgroup_delconsumer(
+                        stream_name, group_name, self._decode(consumer["name"]))
+                    removed_consumers += 1
+
+            if self._is_orphaned_group(group):
+                await self.redis.xgroup_destroy(stream_name, group_name)
+                removed_groups += 1
+
+        if removed_consumers or removed_groups:
+            self.logger.info(
+                "Removed %s consumers and %s groups from %s",
+                removed_consumers, removed_groups, stream_name)
+        return removed_consumers, removed_groups
+
+    async def clean(self):
+        """Clean every stream, an error on one stream does not stop the others"""
+        for stream_name in self.stream_names:
+            try:
+                await self.clean_stream(stream_name)
+            except Exception as e:
+                self.logger.error(
+                    f"An error occurred while cleaning stream {stream_name}: {e}")
+
+    async def run_forever(self):
+        """Clean every stream, then wait `interval` seconds, until cancelled"""
+        while True:
+            await self.clean()
+            await asyncio.sleep(self.interval)
@@ -0,0 +1,232 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional
+
+from utilities.codecs import CODECS
+from utilities.metrics import METRICS, MetricsRegistry
+
+METADATA_FETCHES = "dex_metadata_fetches_total"
+METADATA_FETCH_ERRORS = "dex_metadata_fetch_errors_total"
+METADATA_CHANGES = "dex_metadata_changes_total"
+METADATA_AGE = "dex_metadata_age_seconds"
+_DEFAULT_TTL = 3_600.0
+
+
+def _digest(data: Any) -> str:
+    """Return a digest of a json-compatible value that does not depend on key order"""
+    return hashlib.sha256(json.dumps(data, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+
+
+class MetadataCache:
+    """
+    In-memory TTL cache of exchange metadata backed by an on-disk snapshot
+
+    Symbol universes, size decimals and leverage limits barely change, so
+    the metadata is fetched once and then served from memory. Every
+    fetch is written to a json snapshot, and a process started within
+    `ttl` of the last fetch loads the snapshot instead of calling the
+    exchange. A warm restart makes no REST call at all.
+
+    Reads never wait on the exchange once a value is loaded. A stale
+    value is still returned, and a background refresh is started.
+    `refresh_if_stale` is meant to be scheduled periodically.
+
+    Every fetch is compared with the cached value by digest. On a change,
+    listeners are called with the new metadata, and a compact event is
+    published to the event stream. The event names the symbols that were
+    added, removed or changed, not the whole metadata.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fetch: Callable[[], Awaitable[Optional[dict]]],
+        snapshot_path: Path,
+        ttl: float = _DEFAULT_TTL,
+        symbols: Optional[Callable[[dict], dict[str, Any]]] = None,
+        redis_stream_manager=None,
+        event_stream: Optional[str] = None,
+        logger: Optional[logging.Logger] = None,
+        metrics: MetricsRegistry = METRICS,
+    ):
+        """
+        :param name: name of the cache, used as metric label and in events
+        :param fetch: coroutine function fetching the metadata from the exchange, None on failure
+        :param snapshot_path: json file holding the last fetched metadata
+        :param ttl: seconds after which the metadata is fetched again
+        :param symbols: function returning the per-symbol entries of the metadata by symbol name, used to
+            describe changes, the top-level keys if null
+        :param redis_stream_manager: client publishing the change events, no event if null
+        :param event_stream: stream receiving the change events
+        :param logger: logger of the owning exchange
+        :param metrics: registry receiving the fetch and change counters
+        """
+        self.name = name
+        self._fetch = fetch
+        self.snapshot_path = Path(snapshot_path)
+        self.ttl = ttl
+        self._symbols = symbols or (lambda data: data)
+        self._redis_stream_manager = redis_stream_manager
+        self._event_stream = event_stream
+        self._logger = logger or logging.getLogger(__name__)
+        self._metrics = metrics
+        self._listeners: list[Callable[[dict], Any]] = []
+        self._value: Optional[dict] = None
+        self._digest: Optional[str] = None
+        self._fetched_at = 0.0
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def value(self) -> Optional[dict]:
+        """Return the cached metadata without waiting, None until it is loaded"""
+        return self._value
+
+    @property
+    def age(self) -> float:
+        """Return the seconds elapsed since the cached metadata was fetched"""
+        return time.time() - self._fetched_at if self._value is not None else float("inf")
+
+    @property
+    def stale(self) -> bool:
+        return self.age > self.ttl
+
+    def subscribe(self, listener: Callable[[dict], Any]):
+        """
+        Call a function with the metadata whenever it is loaded or changes
+
+        The listener is called at once if the metadata is already loaded.
+
+        :param listener: function taking the metadata
+        """
+        self._listeners.append(listener)
+        if self._value is not None:
+            listener(self._value)
+
+    async def get(self) -> Optional[dict]:
+        """
+        Return the metadata, fetching it only when neither memory nor the snapshot holds any
+
+        A stale value is returned as is, and a background refresh is started.
+        """
+        if self._value is None:
+            async with self._lock:
+                if self._value is None and not self.load():
+                    await self.refresh()
+        elif self.stale:
+            self.refresh_in_background()
+        return self._value
+
+    def load(self) -> bool:
+        """
+        Load the snapshot into memory
+
+        :return: whether a snapshot was loaded
+        """
+        try:
+            with open(self.snapshot_path, "rb") as f:
+                snapshot = json.load(f)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError):
+            self._logger.error("Metadata snapshot %s is unreadable", self.snapshot_path, exc_info=True)
+            return False
+        self._set(snapshot["data"], snapshot["digest"], snapshot["fetched_at"])
+        self._logger.info("Loaded %s metadata fetched %.0fs ago from %s", self.name, self.age, self.snapshot_path)
+        return True
+
+    async def refresh(self) -> bool:
+        """
+        Fetch the metadata, replacing the cached value and announcing it if it changed
+
+        The cached value is kept when the fetch fails.
+
+        :return: whether the metadata changed
+        """
+        self._metrics.counter(METADATA_FETCHES, cache=self.name).inc()
+        try:
+            data = await self._fetch()
+        except Exception:
+            data = None
+            self._logger.error("Failed to fetch %s metadata", self.name, exc_info=True)
+        if data is None:
+            self._metrics.counter(METADATA_FETCH_ERRORS, cache=self.name).inc()
+            return False
+
+        previous, previous_digest = self._value, self._digest
+        digest = _digest(data)
+        changed = digest != previous_digest
+        if changed:
+            self._set(data, digest, time.time())
+        else:
+            self._fetched_at = time.time()
+        self._save()
+        if changed:
+            self._metrics.counter(METADATA_CHANGES, cache=self.name).inc()
+            await self._announce(previous, previous_digest)
+        return changed
+
+    def refresh_in_background(self):
+        """Start a refresh unless one is already running"""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self.refresh())
+
+    async def refresh_if_stale(self):
+        """Load the snapshot on first run and fetch the metadata once it is older than the ttl"""
+        if self._value is None:
+            self.load()
+        if self.stale:
+            await self.refresh()
+        self._metrics.gauge(METADATA_AGE, cache=self.name).set(self.age)
+
+    def _set(self, data: dict, digest: str, fetched_at: float):
+        self._value = data
+        self._digest = digest
+        self._fetched_at = fetched_at
+        for listener in self._listeners:
+            try:
+                listener(data)
+            except Exception:
+                self._logger.error("Listener of %s metadata failed", self.name, exc_info=True)
+
+    def _save(self):
+        try:
+            self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+            temporary_path = self.snapshot_path.with_suffix(".tmp")
+            with open(temporary_path, "w") as f:
+                json.dump({"fetched_at": self._fetched_at, "digest": self._digest, "data": self._value}, f)
+            os.replace(temporary_path, self.snapshot_path)
+        except OSError:
+            self._logger.error("Failed to write metadata snapshot %s", self.snapshot_path, exc_info=True)
+
+    def changes(self, previous: Optional[dict], current: dict) -> dict[str, list[str]]:
+        """Return the names of the symbols added, removed and changed between two metadata"""
+        before = self._symbols(previous) if previous is not None else {}
+        after = self._symbols(current)
+        return {
+            "added": sorted(name for name in after if name not in before),
+            "removed": sorted(name for name in before if name not in after),
+            "changed": sorted(name for name in after if name in before and after[name] != before[name]),
+        }
+
+    async def _announce(self, previous: Optional[dict], previous_digest: Optional[str]):
+        changes = self.changes(previous, self._value)
+        self._logger.info("%s metadata changed: %s", self.name, changes)
+        if self._redis_stream_manager is None or self._event_stream is None:
+            return
+        event = {
+            "cache": self.name,
+            "digest": self._digest,
+            "previous_digest": previous_digest or "",
+            "fetched_at": self._fetched_at,
+            **{kind: CODECS.encode(names) for kind, names in changes.items()},
+        }
+        try:
+            await self._redis_stream_manager.publish(self._event_stream, event)
+        except Exception:
+            self._logger.error("Failed to publish the %s metadata change", self.name, exc_info=True)
@@ -0,0 +1,237 @@
+import asyncio
+import json
+import time
+from pathlib import Path
+from typing import Iterable, NamedTuple, Optional
+
+import numpy as np
+
+from caching.archive import read_archive
+from caching.stream_manager import RedisStreamManager
+from models.enums import TraceStage
+from utilities.logger import SetupLogger
+from utilities.metrics import split_trace, stamp
+
+_DEFAULT_BATCH_SIZE = 500
+
+
+class RecordedEntry(NamedTuple):
+    stream: str
+    timestamp_ms: int
+    fields: dict
+
+
+def _decode(value):
+    return value.decode() if isinstance(value, bytes) else value
+
+
+async def dump_streams(
+    redis_stream_manager: RedisStreamManager,
+    stream_names: Iterable[str],
+    path: Path,
+    chunk_size: int = 10_000,
+) -> int:
+    """
+    Record the entries of redis streams into a json-lines dump
+
+    Each line holds {"stream", "id", "fields"}; the file can be replayed
+    with `load_dump` and StreamReplayer.
+
+    :return: number of recorded entries
+    """
+    count = 0
+    with open(path, "w") as f:
+        for stream_name in stream_names:
+            low = "-"
+            while True:
+                entries = await redis_stream_manager.xrange(
+                    stream_name, min=low, max="+", count=chunk_size)
+                for entry_id, fields in entries:
+                    line = {
+                        "stream": stream_name,
+                        "id": _decode(entry_id),
+                        "fields": {_decode(k): _decode(v) for k, v in fields.items()},
+                    }
+                    f.write(json.dumps(line) + "\n")
+                count += len(entries)
+                if len(entries) < chunk_size:
+                    break
+                low = f"({_decode(entries[-1][0])}"
+    return count
+
+
+def load_dump(path: Path) -> list[RecordedEntry]:
+    """Load the entries of a json-lines dump, ordered by time"""
+    entries = []
+    with open(path) as f:
+        for line in f:
+            record = json.loads(line)
+            # recorded trace stamps are stale, replay stamps new ones
+            split_trace(record["fields"])
+            entries.append(RecordedEntry(
+                record["stream"], int(record["id"].split("-", 1)[0]), record["fields"]))
+    entries.sort(key=lambda entry: entry.timestamp_ms)
+    return entries
+
+
+def load_archive(
+    root: Path,
+    stream_names: Iterable[str],
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+) -> list[RecordedEntry]:
+    """Load archived entries of several streams, ordered by time"""
+    entries = []
+    for stream_name in stream_names:
+        table = read_archive(root, stream_name, start, end, numeric=False)
+        if not table.num_rows:
+            continue
+        timestamps = table.column("timestamp").cast("int64").to_pylist()
+        field_names = [name for name in table.column_names if name not in ("id", "timestamp")]
+        columns = {name: table.column(name).to_pylist() for name in field_names}
+        for i, timestamp_ms in enumerate(timestamps):
+            fields = {}
+            for name in field_names:
+                value = columns[name][i]
+                if value is not None:
+                    fields[name] = value
+            split_trace(fields)
+            entries.append(RecordedEntry(stream_name, timestamp_ms, fields))
+    entries.sort(key=lambda entry: entry.timestamp_ms)
+    return entries
+
+
+class StreamReplayer:
+    """
+    Re-inject recorded raw entries into redis streams
+
+    Entries are replayed in their recorded order, either paced on their
+    recorded timestamps (speed 1 is real time, speed N is N times faster)
+    or as fast as possible when speed is null, in pipelined batches.
+    The adapter consumes the streams unmodified, so `measure` can then
+    report the sustained adaptation throughput and the end-to-end lag
+    between each injected raw entry and the adapted entry it produced.
+    """
+
+    def __init__(
+        self,
+        redis_stream_manager: RedisStreamManager,
+        entries: list[RecordedEntry],
+        speed: Optional[float] = 1.0,
+        stream_map: Optional[dict[str, str]] = None,
+        batch_size: int = _DEFAULT_BATCH_SIZE,
+    ):
+        """
+        :param redis_stream_manager: redis client owning the streams
+        :param entries: recorded entries, ordered by time
+        :param speed: replay speed relative to real time, as fast as possible if null
+        :param stream_map: renames recorded streams to target streams, same name if missing
+        :param batch_size: number of entries per pipeline when replaying as fast as possible
+        """
+        self.redis = redis_stream_manager
+        self.entries = entries
+        self.speed = speed
+        self.stream_map = stream_map or {}
+        self.batch_size = batch_size
+        self.logger_config = SetupLogger(
+            'stream_replayer', 'logs/streams/stream_replayer.log')
+        self.logger = self.logger_config.create_logger()
+        # target stream -> ids of the injected entries, in order
+        self.injected: dict[str, list[str]] = {}
+
+    @staticmethod
+    def _stamp(fields: dict):
+        """Stamp injected entries as if they were just received, so they are traced"""
+        now = time.monotonic_ns()
+        stamp(fields, TraceStage.RECEIVE, at=now)
+        stamp(fields, TraceStage.RAW_PUBLISH, at=now)
+
+    def _target(self, entry: RecordedEntry) -> str:
+        return self.stream_map.get(entry.stream, entry.stream)
+
+    async def replay(self) -> dict:
+        """
+        Inject every entry, pacing them according to the speed
+
+        :return: number of injected entries, elapsed time and injection rate
+        """
+        self.injected = {}
+        start = time.perf_counter()
+        if self.speed:
+            first_ms = self.entries[0].timestamp_ms if self.entries else 0
+            for entry in self.entries:
+                delay = (entry.timestamp_ms - first_ms) / 1000 / self.speed - (time.perf_counter() - start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                target = self._target(entry)
+                self._stamp(entry.fields)
+                entry_id = await self.redis.xadd(target, entry.fields)
+                self.injected.setdefault(target, []).append(_decode(entry_id))
+        else:
+            for i in range(0, len(self.entries), self.batch_size):
+                batch = self.entries[i:i + self.batch_size]
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    for entry in batch:
+                        self._stamp(entry.fields)
+                        pipe.xadd(self._target(entry), entry.fields)
+                    entry_ids = await pipe.execute()
+                for entry, entry_id in zip(batch, entry_ids):
+                    self.injected.setdefault(self._target(entry), []).append(_decode(entry_id))
+
+        elapsed = time.perf_counter() - start
+        stats = {
+            "injected": len(self.entries),
+            "elapsed": elapsed,
+            "injection_rate": len(self.entries) / elapsed if elapsed else 0.0,
+        }
+        self.logger.info("Replay finished: %s", stats)
+        return stats
+
+    async def measure(
+        self,
+        raw_stream: str,
+        adapted_stream: str,
+        since_id: str,
+        timeout: float = 30.0,
+    ) -> dict:
+        """
+        Wait for the adapter to catch up and report throughput and lag
+
+        Assumes the adapter turns every raw entry of `raw_stream` into
+        exactly one entry of `adapted_stream`, in order (e.g. allMids into
+        oracle prices), so the n-th adapted entry matches the n-th
+        injected raw entry.
+
+        :param raw_stream: target stream of the injected entries
+        :param adapted_stream: stream the adapter publishes to
+        :param since_id: id of the adapted stream before the replay started
+        :param timeout: seconds to wait for the adapter to catch up
+        :return: adaptation throughput (entries/s) and end-to-end lag percentiles (s)
+        """
+        injected = self.injected.get(raw_stream, [])
+        deadline = time.monotonic() + timeout
+        adapted = []
+        low = f"({since_id}"
+        while len(adapted) < len(injected) and time.monotonic() < deadline:
+            entries = await self.redis.xrange(adapted_stream, min=low, max="+")
+            if entries:
+                adapted.extend(_decode(entry_id) for entry_id, _ in entries)
+                low = f"({adapted[-1]}"
+            else:
+                await asyncio.sleep(0.1)
+
+        n = min(len(adapted), len(injected))
+        if not n:
+            return {"adapted": 0, "injected": len(injected)}
+        adapted_ms = np.array([int(entry_id.split("-", 1)[0]) for entry_id in adapted[:n]])
+        injected_ms = np.array([int(entry_id.split("-", 1)[0]) for entry_id in injected[:n]])
+        lag = (adapted_ms - injected_ms) / 1000
+        duration = (adapted_ms[-1] - injected_ms[0]) / 1000
+        return {
+            "injected": len(injected),
+            "adapted": n,
+            "throughput": n / duration if duration > 0 else float("inf"),
+            "lag_p50": float(np.percentile(lag, 50)),
+            "lag_p99": float(np.percentile(lag, 99)),
+            "lag_max": float(lag.max()),
+        }
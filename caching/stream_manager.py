@@ -1,53 +1,151 @@
+import asyncio
 import json
+import time
 from functools import wraps
 from pathlib import Path
 from typing import Callable, Type
 
 from pydantic import BaseModel
 from redis.asyncio import Redis, ResponseError
-from redis.asyncio.connection import ConnectionPool
-from utilities.parsing import JsonParser
+from caching.connections import CONNECTIONS, RedisConnectionManager
+from models.enums import PoolRole, TraceStage
+from utilities.codecs import CODECS
 from utilities.logger import SetupLogger
+from utilities.metrics import stamp
 
 _MAX_JSON_LEN = 10_000
+_DEFAULT_MAX_BATCH_SIZE = 100
+_DEFAULT_LINGER_MS = 5
+# pending entries idle for this long belong to a crashed consumer
+_DEFAULT_MIN_IDLE_TIME_MS = 60_000
 
 
 class RedisStreamManager(Redis):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        # client of the blocking stream reads, see `from_pools`
+        self.reader: Redis = self
         self.logger_config = SetupLogger(
             'redis_stream', 'logs/streams/redis_stream_manager.log')
         self.logger = self.logger_config.create_logger()
+        self.payload_logger = self.logger_config.create_payload_logger()
+        self._buffering = False
+        self._max_batch_size = _DEFAULT_MAX_BATCH_SIZE
+        self._linger = _DEFAULT_LINGER_MS / 1000
+        self._buffer: dict[str, list[dict]] = {}
+        self._buffered = 0
+        self._flush_lock = asyncio.Lock()
+        self._linger_task: asyncio.Task | None = None
+        self._flushes = 0
+        self._flushed_entries = 0
+        self._max_flushed_batch = 0
+        self._dropped_entries = 0
+        self._total_flush_latency = 0.0
+        self._max_flush_latency = 0.0
+        self._consumer_groups: set[tuple[str, str]] = set()
+        self._last_claim: dict[tuple[str, str], float] = {}
+
+    @classmethod
+    def from_pools(
+        cls,
+        redis_url: str,
+        decode_responses: bool = False,
+        encoding: str = "utf-8",
+        connections: RedisConnectionManager = CONNECTIONS,
+    ) -> "RedisStreamManager":
+        """
+        Build a client on the shared pools of a redis
+
+        Commands are sent over the write pool, while blocking stream reads
+        (`read_group`, and `reader` for callers issuing their own) go
+        through the read pool, so long blocking reads never starve
+        publishers of connections. Closing the client leaves the pools
+        open, see `RedisConnectionManager.aclose`.
+
+        :param redis_url: url of the redis
+        :param decode_responses: whether responses are decoded to str
+        :param encoding: encoding of the decoded responses
+        :param connections: manager owning the pools
+        """
+        client = cls(connection_pool=connections.pool(redis_url, PoolRole.WRITE, decode_responses, encoding))
+        client.reader = Redis(connection_pool=connections.pool(redis_url, PoolRole.READ, decode_responses, encoding))
+        return client
 
     @classmethod
     def from_config(cls, json_config_file_path: Path) -> Redis:
         """
         Implement our extension of the async redis client using values from a json config
 
+        Clients of the same redis share its pools, so every exchange,
+        adapter and job module of a process draws from the same
+        connections, see `from_pools`. An optional "pools" section sizes
+        the pools per role, e.g. {"read": {"max_connections": 128}}.
+
         json_config_file_path:
         """
         with open(json_config_file_path, "rb") as f:
             configs = json.load(f)
         redis_url = f"redis://{configs['host']}:{configs['port']}/{configs['db']}"
-        # connection_pool = ConnectionPool.from_url(**configs)
-        connection_pool = ConnectionPool.from_url(redis_url)
-        client = cls(
-            connection_pool=connection_pool,
-            single_connection_client=False,
-        )
-        client.auto_close_connection_pool = True
+        for role, settings in configs.get("pools", {}).items():
+            CONNECTIONS.configure(redis_url, PoolRole(role), **settings)
+        client = cls.from_pools(redis_url)
+        if "buffered_publisher" in configs:
+            client.enable_buffering(**configs["buffered_publisher"])
         return client
 
+    def enable_buffering(
+        self,
+        max_batch_size: int = _DEFAULT_MAX_BATCH_SIZE,
+        linger_ms: float = _DEFAULT_LINGER_MS,
+    ):
+        """
+        Accumulate published entries and write them through a pipeline
+
+        Entries are buffered per stream and flushed together in a single
+        round trip once `max_batch_size` entries are waiting or the oldest
+        one has waited `linger_ms`, whichever comes first. Entries of a
+        stream are written in the order they were published.
+
+        :param max_batch_size: number of buffered entries that triggers a flush
+        :param linger_ms: longest time an entry waits in the buffer
+        """
+        self._buffering = True
+        self._max_batch_size = max_batch_size
+        self._linger = linger_ms / 1000
+
+    @property
+    def publisher_stats(self) -> dict:
+        """Return flush latency and batch size statistics of the buffered publisher"""
+        return {
+            "buffering": self._buffering,
+            "buffered": self._buffered,
+            "flushes": self._flushes,
+            "flushed_entries": self._flushed_entries,
+            "dropped_entries": self._dropped_entries,
+            "avg_batch_size": self._flushed_entries / self._flushes if self._flushes else 0.0,
+            "max_batch_size": self._max_flushed_batch,
+            "avg_flush_latency": self._total_flush_latency / self._flushes if self._flushes else 0.0,
+            "max_flush_latency": self._max_flush_latency,
+        }
+
     def publish_result(
         self,
         stream_name: str,
         message_model: Type[BaseModel] | None = None,
+        trace_stage: TraceStage | None = None,
+        return_stage: TraceStage | None = None,
     ) -> Callable:
         """
         Decorator generator for async functions that will publish results to redis
 
+        Stamps only go into the published message, the result returned to
+        the caller is left untouched.
+
         :param stream_name:
         :param message_model:
+        :param trace_stage: stage stamped into the published message, none if null
+        :param return_stage: stage stamped with the time the function returned, e.g. TraceStage.RECEIVE for
+            a function fetching the result, none if null
         :return: the wrapper to send output into redis
         """
 
@@ -56,34 +154,283 @@ class RedisStreamManager(Redis):
             async def wrapper(*args, **kwargs):
                 # Call the original function and get the result
                 result = await func(*args, **kwargs)
+                returned = time.monotonic_ns()
 
-                # Convert the generic value into a json string
-                json_result = JsonParser.loads(result)
-                self.logger.debug(
-                    "Received the data %s for the stream  %s and publishing to redis ", json_result, stream_name)
+                if result is None:
+                    return result
+
+                # Convert the generic value into a flat mapping of fields,
+                # decoding serialized payloads exactly once
+                if isinstance(result, dict):
+                    # the caller keeps the result, and may share it, e.g. through single_flight
+                    message = dict(result)
+                elif isinstance(result, BaseModel):
+                    message = result.model_dump(mode="json")
+                else:
+                    message = CODECS.decode(result)
+                if return_stage is not None:
+                    stamp(message, return_stage, at=returned)
+                if trace_stage is not None:
+                    stamp(message, trace_stage)
+                self.payload_logger.debug(
+                    "Received the data %s for the stream  %s and publishing to redis ", message, stream_name)
 
                 # Publish the message to the specified Redis stream
-                await self.xadd(
+                await self.publish(stream_name, message)
+
+                return result
+
+            return wrapper
+
+        return decorator
+
+    async def publish(self, stream_name: str, message: dict):
+        """
+        Append a flat mapping of fields to a capped redis stream
+
+        When buffering is enabled the entry is queued for the next
+        pipelined flush and no id is returned.
+
+        :param stream_name: name of the stream receiving the entry
+        :param message: field-value mapping of the entry
+        :return: the id of the new entry
+        """
+        if not self._buffering:
+            return await self.xadd(
+                stream_name,
+                message,
+                maxlen=_MAX_JSON_LEN,
+                approximate=True,
+            )
+
+        self._buffer.setdefault(stream_name, []).append(message)
+        self._buffered += 1
+        if self._buffered >= self._max_batch_size:
+            await self.flush()
+        elif self._linger_task is None or self._linger_task.done():
+            self._linger_task = asyncio.create_task(self._flush_after_linger())
+
+    async def publish_many(
+        self,
+        stream_name: str,
+        messages: list[dict],
+        ack_stream: str | None = None,
+        ack_group: str | None = None,
+        ack_ids: list | None = None,
+    ):
+        """
+        Append several entries, then acknowledge their sources
+
+        The entries are written in order through a single pipeline. When
+        ack ids are given, they are acknowledged with one XACK once every
+        entry was written, so a consumer that adapted a batch of messages
+        releases its pending entries only when the results are safe. An
+        XACK sent in the same pipeline would still run when redis rejects
+        an XADD (e.g. OOM), losing the messages; a failed publish leaves
+        them pending for redelivery instead.
+
+        :param stream_name: name of the stream receiving the entries
+        :param messages: field-value mappings of the entries
+        :param ack_stream: stream the acknowledged messages were read from
+        :param ack_group: consumer group the acknowledged messages were read by
+        :param ack_ids: ids of the messages to acknowledge
+        :return: the results of the pipeline
+        """
+        async with self.pipeline(transaction=False) as pipe:
+            for message in messages:
+                pipe.xadd(
                     stream_name,
-                    json.loads(json_result),
+                    message,
                     maxlen=_MAX_JSON_LEN,
                     approximate=True,
                 )
+            results = await pipe.execute()
+        if ack_ids:
+            results.append(await self.xack(ack_stream, ack_group, *ack_ids))
+        return results
 
-                return result
+    async def _flush_after_linger(self):
+        await asyncio.sleep(self._linger)
+        await self.flush()
 
-            return wrapper
+    async def flush(self):
+        """Write every buffered entry to redis in a single pipeline"""
+        async with self._flush_lock:
+            if not self._buffered:
+                return
+            buffer, batch_size = self._buffer, self._buffered
+            self._buffer, self._buffered = {}, 0
 
-        return decorator
+            start = time.perf_counter()
+            try:
+                async with self.pipeline(transaction=False) as pipe:
+                    for stream_name, messages in buffer.items():
+                        for message in messages:
+                            pipe.xadd(
+                                stream_name,
+                                message,
+                                maxlen=_MAX_JSON_LEN,
+                                approximate=True,
+                            )
+                    await pipe.execute()
+            except Exception:
+                self._dropped_entries += batch_size
+                self.logger.error(
+                    "Error flushing %s buffered entries to redis", batch_size, exc_info=True)
+                return
+
+            latency = time.perf_counter() - start
+            self._flushes += 1
+            self._flushed_entries += batch_size
+            self._max_flushed_batch = max(self._max_flushed_batch, batch_size)
+            self._total_flush_latency += latency
+            self._max_flush_latency = max(self._max_flush_latency, latency)
+
+    async def aclose(self, close_connection_pool: bool | None = None):
+        """Flush the buffered entries before closing the client"""
+        await self.flush()
+        if self._linger_task is not None:
+            self._linger_task.cancel()
+        if self.reader is not self:
+            await self.reader.aclose(close_connection_pool)
+        await super().aclose(close_connection_pool)
 
     async def create_redis_consumer_group(self, stream_name: str, group_name: str):
         """
         Asynchronously creates a consumer group for a given stream in Redis.
+
+        Groups already created by this client are skipped without a round trip.
         """
+        if (stream_name, group_name) in self._consumer_groups:
+            return
         try:
             self.logger.debug(
                 'Creating the consumer group with stream name %s with group name %s ', stream_name, group_name)
-            await self.xgroup_create(stream_name, group_name, id="0")
+            await self.xgroup_create(stream_name, group_name, id="0", mkstream=True)
         except ResponseError as e:
             if "BUSYGROUP Consumer Group name already exists" not in str(e):
                 raise
+        self._consumer_groups.add((stream_name, group_name))
+
+    async def read_group(
+        self,
+        stream_name: str,
+        group_name: str,
+        consumer_name: str,
+        count: int = 1,
+        block: int | None = None,
+        min_idle_time: int = _DEFAULT_MIN_IDLE_TIME_MS,
+    ) -> list:
+        """
+        Read new entries of a stream for a consumer of a durable group
+
+        Once every `min_idle_time` the consumer first reclaims, with
+        XAUTOCLAIM, entries that were delivered to another consumer of the
+        group and never acknowledged because that consumer crashed.
+        Reclaimed entries are returned before any new entry is read.
+
+        :param stream_name: name of the stream to read
+        :param group_name: durable consumer group of the service
+        :param consumer_name: name of this consumer inside the group
+        :param count: maximum number of entries to return
+        :param block: milliseconds to wait for new entries, no wait if null
+        :param min_idle_time: milliseconds after which a pending entry is reclaimed
+        :return: entries in the same layout as xreadgroup
+        """
+        await self.create_redis_consumer_group(stream_name, group_name)
+
+        key = (stream_name, group_name)
+        try:
+            now = time.monotonic()
+            if now - self._last_claim.get(key, 0.0) >= min_idle_time / 1000:
+                self._last_claim[key] = now
+                _, claimed, *_ = await self.xautoclaim(
+                    stream_name,
+                    group_name,
+                    consumer_name,
+                    min_idle_time,
+                    start_id="0-0",
+                    count=count,
+                )
+                # entries trimmed from the stream are returned without a payload
+                claimed = [entry for entry in claimed if entry[1] is not None]
+                if claimed:
+                    self.logger.info(
+                        "Reclaimed %s pending entries of %s for %s", len(claimed), group_name, consumer_name)
+                    return [[stream_name, claimed]]
+
+            return await self.reader.xreadgroup(
+                streams={stream_name: ">"},
+                consumername=consumer_name,
+                groupname=group_name,
+                count=count,
+                block=block,
+            )
+        except ResponseError as e:
+            if "NOGROUP" not in str(e):
+                raise
+            # the stream was deleted along with its groups, recreate it on the next read
+            self._consumer_groups.discard(key)
+            return []
+
+
+class LazyStreamManager:
+    """
+    Stand-in for the RedisStreamManager of a json config, built on first use
+
+    Modules hold one of these at import time instead of a client, so
+    importing an exchange or adapter module neither reads the redis config
+    nor builds a pool; entry points that never touch redis (CLI help,
+    registry discovery, offline tools) start without paying for it.
+    Attribute access is forwarded to the client, building it once, and
+    `publish_result` decorators resolve the client on their first call.
+    """
+
+    def __init__(self, json_config_file_path: Path):
+        """
+        :param json_config_file_path: redis config the client is built from, see `RedisStreamManager.from_config`
+        """
+        self._json_config_file_path = json_config_file_path
+        self._client: RedisStreamManager | None = None
+
+    @property
+    def client(self) -> RedisStreamManager:
+        if self._client is None:
+            self._client = RedisStreamManager.from_config(self._json_config_file_path)
+        return self._client
+
+    @property
+    def built(self) -> bool:
+        return self._client is not None
+
+    def __getattr__(self, name: str):
+        return getattr(self.client, name)
+
+    def publish_result(
+        self,
+        stream_name: str,
+        message_model: Type[BaseModel] | None = None,
+        trace_stage: TraceStage | None = None,
+        return_stage: TraceStage | None = None,
+    ) -> Callable:
+        """Same as `RedisStreamManager.publish_result`, without building the client at decoration time"""
+
+        def decorator(func):
+            published = None
+
+            @wraps(func)
+            async def wrapper(*args, **kwargs):
+                nonlocal published
+                if published is None:
+                    published = self.client.publish_result(
+                        stream_name, message_model, trace_stage, return_stage)(func)
+                return await published(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    async def aclose(self, close_connection_pool: bool | None = None):
+        """Close the client if it was ever built"""
+        if self._client is not None:
+            await self._client.aclose(close_connection_pool)
@@ -1,9 +1,14 @@
+from __future__ import annotations
+
 import json
 from abc import ABC, abstractmethod
-from requests import Response
+from typing import TYPE_CHECKING
 
 from caching.stream_manager import RedisStreamManager
 
+if TYPE_CHECKING:
+    from requests import Response
+
 
 class DexDataClient(ABC):
     _REDIS_URL = ""
@@ -1,10 +1,22 @@
+from __future__ import annotations
+
+import asyncio
+import time
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import TYPE_CHECKING, Any, AsyncIterator, Optional
 
-import pandas as pd
+import numpy as np
 from caching.stream_manager import RedisStreamManager
 from caching.streams import StreamNameBuilder
-from models.enums import Blockchains, DataType, Exchanges, StreamNames
+from data_client.price_board import PriceBoard
+from models.enums import Blockchains, DataType, Exchanges, StreamNames, TraceStage
+from models.symbols import SymbolRegistry
+from utilities.metrics import METRICS, split_trace
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+_TRACE_STAGES = (TraceStage.CONSUMER_READ,)
 
 
 class DataConsumer(ABC):
@@ -29,18 +41,51 @@ class DataConsumer(ABC):
 
     All tickers must abide by our internal standard: capitalized, unique
     identifier for the symbol.
+
+    In cache mode a background task tails the adapted streams and keeps
+    the latest entry of each one in memory, so reads are answered without
+    a redis round trip. A snapshot older than `max_staleness` seconds is
+    treated as missing.
+
+    With `price_history` set, every oracle price entry read (directly or
+    by the cache) is also recorded in a PriceBoard, exposing the latest
+    prices and their recent history as arrays indexed by symbol id.
+
+    Trace stamps are popped out of every entry read, and the latency
+    between the adapted publish and the read, as well as the end-to-end
+    latency, are recorded in utilities.metrics.METRICS.
     """
 
     _REDIS_ENCODING = "utf-8"
     _REDIS_DECODING_BOOL = True
-
-    def __init__(self, redis_url: str, exchange: Exchanges, blockchain: Blockchains):
+    _CACHE_BLOCK_MS = 1_000
+    # adapted stream the adapters publish the oracle prices to
+    _ORACLE_PRICE_STREAM = StreamNames.PNL
+
+    def __init__(
+        self,
+        redis_url: str,
+        exchange: Exchanges,
+        blockchain: Blockchains,
+        cache: bool = False,
+        max_staleness: Optional[float] = None,
+        price_history: int = 0,
+    ):
+        """
+        :param redis_url: url of the redis holding the adapted streams
+        :param exchange: exchange whose data is consumed
+        :param blockchain: blockchain whose data is consumed
+        :param cache: serve reads from the in-memory latest-value cache
+        :param max_staleness: seconds after which a cached snapshot is ignored, no bound if null
+        :param price_history: number of price snapshots kept in the price board, no board if 0
+        """
         self.exchange = exchange
         self.blockchain = blockchain
-        self.redis = RedisStreamManager.from_url(
-            url=redis_url,
-            encoding=self._REDIS_ENCODING,
+        self.symbols = SymbolRegistry.for_venue(exchange, blockchain)
+        self.redis = RedisStreamManager.from_pools(
+            redis_url,
             decode_responses=self._REDIS_DECODING_BOOL,
+            encoding=self._REDIS_ENCODING,
         )
         self.redis_stream_builder = (
             StreamNameBuilder()
@@ -49,6 +94,12 @@ class DataConsumer(ABC):
             # we only pull internally adapted data
             .set("data_type", DataType.ADAPTED)
         )
+        self.cache_enabled = cache
+        self.max_staleness = max_staleness
+        # stream name -> (entry id, fields, entry timestamp in seconds)
+        self._latest: dict[str, tuple[str, dict, float]] = {}
+        self._cache_task: Optional[asyncio.Task] = None
+        self.price_board = PriceBoard(self.symbols, history=price_history) if price_history else None
 
     def get_stream_name(self, stream: StreamNames) -> str:
         """Return the desired stream's name to consumer inside redis"""
@@ -59,6 +110,244 @@ class DataConsumer(ABC):
 
         return name
 
+    @staticmethod
+    def _entry_timestamp(entry_id: str) -> float:
+        """Return the time, in seconds, at which redis appended the entry"""
+        return int(entry_id.split("-", 1)[0]) / 1000
+
+    async def start_cache(self, streams: Optional[list[StreamNames]] = None):
+        """
+        Hydrate the cache from the newest entries and start tailing the streams
+
+        :param streams: streams to cache, every stream if null
+        """
+        names = [self.get_stream_name(stream) for stream in (streams or list(StreamNames))]
+        last_ids = {}
+        for name in names:
+            entries = await self.redis.xrevrange(name, count=1)
+            if entries:
+                entry_id, fields = entries[0]
+                # the newest entry may be old, its stamps are not a read latency
+                split_trace(fields)
+                self._latest[name] = (entry_id, fields, self._entry_timestamp(entry_id))
+                last_ids[name] = entry_id
+                if name == self.get_stream_name(self._ORACLE_PRICE_STREAM):
+                    self.record_prices(entry_id, fields)
+            else:
+                last_ids[name] = "0-0"
+        self._cache_task = asyncio.create_task(self._tail(last_ids))
+
+    async def stop_cache(self):
+        """Stop tailing the streams"""
+        if self._cache_task is not None:
+            self._cache_task.cancel()
+            try:
+                await self._cache_task
+            except asyncio.CancelledError:
+                pass
+            self._cache_task = None
+
+    async def _tail(self, last_ids: dict[str, str]):
+        while True:
+            try:
+                data = await self.redis.reader.xread(last_ids, block=self._CACHE_BLOCK_MS)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                await asyncio.sleep(self._CACHE_BLOCK_MS / 1000)
+                continue
+            for name, entries in data or []:
+                for _, fields in entries:
+                    self.trace_read(fields)
+                if self.price_board is not None and name == self.get_stream_name(self._ORACLE_PRICE_STREAM):
+                    for entry_id, fields in entries:
+                        self.record_prices(entry_id, fields)
+                # only the newest entry of the batch matters
+                entry_id, fields = entries[-1]
+                self._latest[name] = (entry_id, fields, self._entry_timestamp(entry_id))
+                last_ids[name] = entry_id
+
+    @staticmethod
+    def trace_read(fields: dict):
+        """Pop the trace stamps of an entry just read and record its read latency"""
+        trace = split_trace(fields)
+        if trace:
+            trace[TraceStage.CONSUMER_READ] = time.monotonic_ns()
+            METRICS.observe_trace(trace, _TRACE_STAGES)
+
+    def record_prices(self, entry_id: str, prices: dict[str, str | float]):
+        """Record an oracle price entry in the price board, if enabled"""
+        if self.price_board is not None:
+            self.price_board.update(self._entry_timestamp(entry_id), prices)
+
+    def _price_board(self) -> PriceBoard:
+        if self.price_board is None:
+            raise RuntimeError("The price board is disabled, build the consumer with price_history > 0")
+        return self.price_board
+
+    def latest_prices(self) -> np.ndarray:
+        """
+        Return the latest price of every symbol
+
+        :return: read-only view indexed by symbol id, see `symbols.tickers`
+        """
+        return self._price_board().latest()
+
+    def price_history(self, seconds: float) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Return the price snapshots of the last `seconds` seconds
+
+        :return: read-only views of the timestamps and of the 2-D array of
+            prices, one row per snapshot and one column per symbol id
+        """
+        return self._price_board().last(seconds)
+
+    def price_returns(self, seconds: float) -> np.ndarray:
+        """
+        Return the simple return of every symbol over the last `seconds` seconds
+
+        :return: returns indexed by symbol id, NaN when unknown
+        """
+        return self._price_board().returns(seconds)
+
+    @staticmethod
+    def _entries_to_columns(entries: list) -> tuple[np.ndarray, dict[str, np.ndarray]]:
+        """
+        Convert stream entries to one array per field
+
+        Numeric fields become float columns, NaN where an entry lacks the
+        field; fields holding any non-numeric value become object columns.
+        Trace stamps are dropped, like on the live read path.
+        """
+        n = len(entries)
+        timestamps = np.empty(n, dtype=np.int64)
+        columns: dict[str, np.ndarray] = {}
+        for i, (entry_id, fields) in enumerate(entries):
+            timestamps[i] = int(entry_id.split("-", 1)[0])
+            split_trace(fields)
+            for name, value in fields.items():
+                column = columns.get(name)
+                if column is None:
+                    column = columns[name] = np.full(n, np.nan)
+                try:
+                    column[i] = value
+                except ValueError:
+                    if column.dtype != object:
+                        column = columns[name] = column.astype(object)
+                    column[i] = value
+        return timestamps, columns
+
+    @staticmethod
+    def _columns_to_frame(timestamps: np.ndarray, columns: dict[str, np.ndarray]) -> pd.DataFrame:
+        import pandas as pd
+
+        index = pd.to_datetime(timestamps, unit="ms", utc=True).rename("timestamp")
+        return pd.DataFrame(columns, index=index, copy=False)
+
+    async def iter_range(
+        self,
+        stream: StreamNames,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        chunk_size: int = 1_000,
+        reverse: bool = False,
+    ) -> AsyncIterator[pd.DataFrame]:
+        """
+        Iterate over a time range of an adapted stream in bounded chunks
+
+        Pages through the stream with XRANGE (XREVRANGE when reversed),
+        bounding the range on the server with the millisecond part of the
+        entry ids, so only one chunk is held in memory at a time.
+
+        :param stream: stream to read
+        :param start: unix time of the first entry, beginning of the stream if null
+        :param end: unix time of the last entry, end of the stream if null
+        :param chunk_size: maximum number of entries per chunk
+        :param reverse: yield the newest entries first
+        :return: async generator of DataFrames indexed by entry timestamp, one column per field
+        """
+        name = self.get_stream_name(stream)
+        low = "-" if start is None else str(int(start * 1000))
+        high = "+" if end is None else str(int(end * 1000))
+        while True:
+            if reverse:
+                entries = await self.redis.xrevrange(name, max=high, min=low, count=chunk_size)
+            else:
+                entries = await self.redis.xrange(name, min=low, max=high, count=chunk_size)
+            if not entries:
+                return
+            yield self._columns_to_frame(*self._entries_to_columns(entries))
+            if len(entries) < chunk_size:
+                return
+            # continue right after the last entry, bounds prefixed by "(" are exclusive
+            if reverse:
+                high = f"({entries[-1][0]}"
+            else:
+                low = f"({entries[-1][0]}"
+
+    async def get_range(
+        self,
+        stream: StreamNames,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        chunk_size: int = 1_000,
+    ) -> pd.DataFrame:
+        """
+        Return a time range of an adapted stream as a single DataFrame
+
+        Chunks are converted to arrays as they arrive and every column of
+        the result is allocated once, when the chunks are concatenated.
+
+        :param stream: stream to read
+        :param start: unix time of the first entry, beginning of the stream if null
+        :param end: unix time of the last entry, end of the stream if null
+        :param chunk_size: number of entries fetched per round trip
+        :return: DataFrame indexed by entry timestamp, one column per field
+        """
+        name = self.get_stream_name(stream)
+        low = "-" if start is None else str(int(start * 1000))
+        high = "+" if end is None else str(int(end * 1000))
+        chunks = []
+        while True:
+            entries = await self.redis.xrange(name, min=low, max=high, count=chunk_size)
+            if entries:
+                chunks.append(self._entries_to_columns(entries))
+            if len(entries) < chunk_size:
+                break
+            low = f"({entries[-1][0]}"
+
+        timestamps = np.concatenate([chunk_timestamps for chunk_timestamps, _ in chunks]) \
+            if chunks else np.empty(0, dtype=np.int64)
+        names = list(dict.fromkeys(name for _, columns in chunks for name in columns))
+        columns = {}
+        for column_name in names:
+            parts = []
+            for chunk_timestamps, chunk_columns in chunks:
+                part = chunk_columns.get(column_name)
+                parts.append(part if part is not None else np.full(len(chunk_timestamps), np.nan))
+            columns[column_name] = np.concatenate(parts)
+        return self._columns_to_frame(timestamps, columns)
+
+    def last_update(self, stream: StreamNames) -> Optional[float]:
+        """Return the unix time of the cached snapshot of a stream, if any"""
+        cached = self._latest.get(self.get_stream_name(stream))
+        return cached[2] if cached else None
+
+    def get_cached(self, stream: StreamNames) -> Optional[dict]:
+        """
+        Return the latest snapshot of a stream from memory
+
+        :param stream: stream whose snapshot we are returning
+        :return: fields of the newest entry, None if missing or staler than max_staleness
+        """
+        cached = self._latest.get(self.get_stream_name(stream))
+        if cached is None:
+            return None
+        _, fields, updated_at = cached
+        if self.max_staleness is not None and time.time() - updated_at > self.max_staleness:
+            return None
+        return fields
+
     @abstractmethod
     async def get_funding_rates(self, *args, **kwargs) -> dict[str, float]:
         """
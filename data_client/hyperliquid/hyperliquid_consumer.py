@@ -1,19 +1,50 @@
+from __future__ import annotations
+
 import os
-from typing import Dict
-import json
-import pandas as pd
+from typing import TYPE_CHECKING, Dict, Optional
 from data_client.data_client import DataConsumer
 from models.enums import Blockchains, Exchanges, StreamNames
-from utilities.common import generate_group_name
+from models.orderbook import OrderBookEngine
+from utilities.codecs import CODECS
+from utilities.common import generate_consumer_name, generate_group_name
 from utilities.logger import SetupLogger
 
+if TYPE_CHECKING:
+    import pandas as pd
+
+_SERVICE_NAME = "hyperliquid_consumer"
+_ORDERBOOK_BATCH_SIZE = 100
+
 
 class HyperliquidConsumer(DataConsumer):
-    def __init__(self, redis_url: str, exchange: Exchanges, blockchain: Blockchains):
-        super().__init__(redis_url, exchange, blockchain)
+    def __init__(
+        self,
+        redis_url: str,
+        exchange: Exchanges,
+        blockchain: Blockchains,
+        cache: bool = False,
+        max_staleness: Optional[float] = None,
+        price_history: int = 0,
+    ):
+        super().__init__(
+            redis_url,
+            exchange,
+            blockchain,
+            cache=cache,
+            max_staleness=max_staleness,
+            price_history=price_history,
+        )
+        self.consumer_name = generate_consumer_name(_SERVICE_NAME)
+        self.order_books = OrderBookEngine()
         self.logger_config = SetupLogger(
             'hyperliquid_data_consumer', 'logs/hyperliquid/hyperliquid_data_consumer.log')
         self.logger = self.logger_config.create_logger()
+        self.payload_logger = self.logger_config.create_payload_logger()
+
+    def _parse_oracle_prices(self, oracle_prices: dict[str, str]) -> dict[str, float]:
+        """Convert an adapted entry into the ticker to price mapping, with canonical tickers"""
+        ticker = self.symbols.ticker
+        return {ticker(name): float(price) for name, price in oracle_prices.items()}
 
     async def get_oracle_prices(self, *args, **kwargs) -> dict[str, float]:
         """
@@ -25,28 +56,36 @@ class HyperliquidConsumer(DataConsumer):
         {"BTC/USD" : 0.20, "ETH/USD" : -0.05, "ARB/USD": 0.10}
         """
 
+        if self.cache_enabled:
+            oracle_prices = self.get_cached(StreamNames.PNL)
+            if oracle_prices is None:
+                return None
+            return self._parse_oracle_prices(oracle_prices)
+
         try:
             stream_name = self.get_stream_name(StreamNames.PNL)
-            group_name = generate_group_name(stream_name)
+            group_name = generate_group_name(stream_name, _SERVICE_NAME)
             self.logger.debug(
                 'Consuming oracle prices from stream %s with group_name %s ', stream_name, group_name)
-            await self.redis.create_redis_consumer_group(
+            data = await self.redis.read_group(
                 stream_name,
                 group_name,
-            )
-
-            data = await self.redis.xreadgroup(
-                streams={stream_name: ">"},
-                consumername="consumer",
-                groupname=group_name,
+                self.consumer_name,
                 count=1,
                 block=5,
             )
-
-            oracle_prices = data[0][1][0][1]
-            self.logger.debug(
+            # a poll finding no new entry is the normal idle case of a durable group
+            if not data:
+                return None
+
+            message_id, oracle_prices = data[0][1][0]
+            self.trace_read(oracle_prices)
+            self.record_prices(message_id, oracle_prices)
+            # acknowledging only releases the pending entry, the data stays in the stream
+            await self.redis.xack(stream_name, group_name, message_id)
+            self.payload_logger.debug(
                 "Data consumed by get_oracle_prices %s ", oracle_prices)
-            return json.dumps(oracle_prices)
+            return self._parse_oracle_prices(oracle_prices)
 
         except Exception as e:
             self.logger.exception(
@@ -56,7 +95,43 @@ class HyperliquidConsumer(DataConsumer):
         pass
 
     async def get_orderbook(self, ticker: str, *args, **kwargs) -> pd.DataFrame:
-        pass
+        """
+        Get L2-orderbook data
+
+        Applies the adapted books waiting in the stream to the local order
+        book engine, then returns the view of the requested ticker.
+
+        :param ticker: ticker whose market we are returning
+        :return: dataframe of the first 50 bids and asks, None if the ticker was never seen
+        """
+        try:
+            stream_name = self.get_stream_name(StreamNames.ORDER_BOOK)
+            group_name = generate_group_name(stream_name, _SERVICE_NAME)
+            data = await self.redis.read_group(
+                stream_name,
+                group_name,
+                self.consumer_name,
+                count=_ORDERBOOK_BATCH_SIZE,
+                block=5,
+            )
+
+            if data:
+                entries = data[0][1]
+                for _, book in entries:
+                    self.order_books.apply_snapshot(
+                        book["ticker"],
+                        CODECS.decode(book["bids"]),
+                        CODECS.decode(book["asks"]),
+                        timestamp=float(book["timestamp"]),
+                    )
+                await self.redis.xack(
+                    stream_name, group_name, *[message_id for message_id, _ in entries])
+
+            return self.order_books.to_frame(ticker)
+
+        except Exception as e:
+            self.logger.exception(
+                "Error occurred consuming the orderbook of %s : %s", ticker, e)
 
     async def get_liquidation_prices(self, *args, **kwargs) -> dict[str, float]:
         pass
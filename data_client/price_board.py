@@ -0,0 +1,146 @@
+import logging
+from typing import Iterable, Optional
+
+import numpy as np
+
+from models.symbols import SymbolRegistry
+
+# columns of a board whose registry is not loaded yet, a venue lists a few hundred coins at most
+_MIN_SYMBOLS = 256
+# 2 x 1024 snapshots of 256 symbols take 4 MiB of float64
+_DEFAULT_HISTORY = 1024
+
+
+class PriceBoard:
+    """
+    Vectorized board of the latest prices and their recent history
+
+    Prices are stored in columns indexed by the symbol ids of a
+    SymbolRegistry. The board holds the latest price of every symbol in
+    a single row, plus a fixed-size ring buffer of timestamped snapshots
+    of that row. Memory is allocated once and stays constant: the board
+    takes 16 x history x max_symbols bytes, and has by default a column
+    for every symbol of the registry plus room for as many new ones.
+    Prices of symbols past the last column are dropped with a warning.
+
+    Every snapshot is written twice in a buffer of twice the history
+    length, so the last N snapshots are always contiguous and windows are
+    returned as views instead of copies. Views are read-only and are only
+    valid until the next update overwrites them.
+    """
+
+    def __init__(
+        self,
+        symbols: SymbolRegistry,
+        max_symbols: Optional[int] = None,
+        history: int = _DEFAULT_HISTORY,
+        logger: Optional[logging.Logger] = None,
+    ):
+        """
+        :param symbols: registry assigning the column of every ticker
+        :param max_symbols: number of columns, symbols with a larger id are dropped, twice the registry size
+            (at least 256) if null
+        :param history: number of snapshots kept in the ring buffer
+        :param logger: logger of the owning consumer
+        """
+        if max_symbols is None:
+            max_symbols = max(2 * len(symbols), _MIN_SYMBOLS)
+        self.symbols = symbols
+        self.max_symbols = max_symbols
+        self.history = history
+        self._logger = logger or logging.getLogger(__name__)
+        self._dropped: set[str] = set()
+        self._latest = np.full(max_symbols, np.nan)
+        self._snapshots = np.full((2 * history, max_symbols), np.nan)
+        self._timestamps = np.full(2 * history, np.nan)
+        self._position = 0
+        self._count = 0
+        self.last_update: Optional[float] = None
+
+    def __len__(self) -> int:
+        return self._count
+
+    @staticmethod
+    def _read_only(array: np.ndarray) -> np.ndarray:
+        view = array.view()
+        view.flags.writeable = False
+        return view
+
+    def update(self, timestamp: float, prices: dict[str, float] | Iterable[tuple[str, float]]):
+        """
+        Apply new prices and record a snapshot of the whole row
+
+        :param timestamp: unix time of the prices, expected to be non-decreasing
+        :param prices: mapping or pairs of tickers (or coin names) and prices
+        """
+        items = prices.items() if isinstance(prices, dict) else prices
+        symbol_id = self.symbols.id
+        for name, price in items:
+            column = symbol_id(name)
+            if column < self.max_symbols:
+                self._latest[column] = price
+            elif name not in self._dropped:
+                self._dropped.add(name)
+                self._logger.warning(
+                    "Price board full, dropping the prices of %s, raise max_symbols above %s",
+                    name, self.max_symbols)
+        self.record(timestamp)
+
+    def update_ids(self, timestamp: float, ids: np.ndarray, values: np.ndarray):
+        """
+        Apply new prices by symbol id and record a snapshot of the whole row
+
+        :param timestamp: unix time of the prices, expected to be non-decreasing
+        :param ids: symbol ids of the prices
+        :param values: prices, aligned with ids
+        """
+        self._latest[ids] = values
+        self.record(timestamp)
+
+    def record(self, timestamp: float):
+        """Write the latest row and its timestamp in the ring buffer"""
+        position = self._position
+        for row in (position, position + self.history):
+            self._snapshots[row] = self._latest
+            self._timestamps[row] = timestamp
+        self._position = (position + 1) % self.history
+        self._count = min(self._count + 1, self.history)
+        self.last_update = timestamp
+
+    def latest(self) -> np.ndarray:
+        """Return a read-only view of the latest price of every symbol, NaN if never seen"""
+        return self._read_only(self._latest[:len(self.symbols)])
+
+    def _window(self, count: int) -> tuple[np.ndarray, np.ndarray]:
+        end = self._position + self.history
+        return self._timestamps[end - count:end], self._snapshots[end - count:end]
+
+    def last(self, seconds: float) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Return the snapshots of the last `seconds` seconds
+
+        :param seconds: length of the window, ending at the last update
+        :return: read-only views of the timestamps and of the 2-D array of
+            snapshots, one row per snapshot and one column per symbol id
+        """
+        if not self._count:
+            return self._read_only(self._timestamps[:0]), self._read_only(self._snapshots[:0, :0])
+        timestamps, snapshots = self._window(self._count)
+        start = int(np.searchsorted(timestamps, self.last_update - seconds, side="left"))
+        return (
+            self._read_only(timestamps[start:]),
+            self._read_only(snapshots[start:, :len(self.symbols)]),
+        )
+
+    def returns(self, seconds: float) -> np.ndarray:
+        """
+        Return the simple return of every symbol over the last `seconds` seconds
+
+        :param seconds: length of the window, ending at the last update
+        :return: last price over the first price of the window, minus one, NaN when unknown
+        """
+        _, snapshots = self.last(seconds)
+        if not len(snapshots):
+            return np.full(len(self.symbols), np.nan)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return snapshots[-1] / snapshots[0] - 1.0
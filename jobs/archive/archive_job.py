@@ -0,0 +1,50 @@
+import asyncio
+from pathlib import Path
+
+from api.hyperliquid.constants import PATH_TO_HYPERLIQUID
+from caching.archive import StreamArchiver
+from caching.stream_manager import RedisStreamManager
+from caching.streams import StreamNameBuilder
+from models.enums import Blockchains, DataType, Exchanges, StreamNames
+from utilities.logger import SetupLogger
+
+_PATH_TO_REDIS_CONFIG = PATH_TO_HYPERLIQUID / "redis_config.json"
+_ARCHIVE_ROOT = Path("archive")
+_ARCHIVE_INTERVAL = 10
+# keep one hour of archived history in redis for the live consumers
+_RETENTION = 3_600
+
+_VENUES = [(Exchanges.HYPERLIQUID, Blockchains.COSMOS)]
+
+
+def _stream_names() -> list[str]:
+    names = []
+    for exchange, blockchain in _VENUES:
+        builder = StreamNameBuilder().set("marketplace", exchange).set("blockchain", blockchain)
+        for data_type in DataType:
+            for stream in StreamNames:
+                names.append(builder.set("data_type", data_type).set("stream", stream).name)
+    return names
+
+
+async def main():
+    # Configure logger
+    logger_config = SetupLogger("archive_job_logger", "logs/archive/archive_job.log")
+    logger = logger_config.create_logger()
+    redis_stream_manager = RedisStreamManager.from_config(_PATH_TO_REDIS_CONFIG)
+    archiver = StreamArchiver(
+        redis_stream_manager,
+        _stream_names(),
+        _ARCHIVE_ROOT,
+        retention=_RETENTION,
+    )
+
+    while True:
+        try:
+            await archiver.archive()
+        except Exception as e:
+            logger.error(f"An error occurred: {e}")
+        await asyncio.sleep(_ARCHIVE_INTERVAL)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,28 +1,82 @@
 import asyncio
-from adapters.hyperliquid.hyperliquid_adapter import HyperliquidAdapter
+import signal
+from adapters.executor import AdaptationExecutor
+from adapters.hyperliquid.hyperliquid_adapter import (
+    _REDIS_STREAMS,
+    HyperliquidAdapter,
+    _redis_stream_manager,
+)
+from api.hyperliquid.hyperliquid import HyperLiquid
+from caching.connections import CONNECTIONS
+from caching.janitor import StreamJanitor
+from utilities.common import get_config
 from utilities.logger import SetupLogger
+from utilities.metrics import METRICS, MetricsServer
+from utilities.scheduler import TaskScheduler
+
+# per-stage latency histograms, scraped at http://127.0.0.1:9100/metrics
+_METRICS_PORT = 9100
+# runs executing at once across every feed
+_MAX_IN_FLIGHT = 16
 
 async def main():
     # Configure logger
     logger_config = SetupLogger("hyperliquid_job_logger", "logs/hyperliquid/hyperliquid_job.log" )
     logger = logger_config.create_logger()
-    hyperliquidAdapter = HyperliquidAdapter()
+    # CPU-bound adaptation runs in worker processes when the config has an "adaptation_executor" section
+    executor = AdaptationExecutor.from_config(get_config())
+    if executor is not None:
+        await executor.start()
+    hyperliquidAdapter = HyperliquidAdapter(executor=executor)
+    # Stream market data into the raw streams instead of polling REST
+    hyperliquid = HyperLiquid()
+    websocket_client = hyperliquid.create_websocket_client()
+    websocket_task = asyncio.create_task(websocket_client.run_forever())
+    # Remove legacy consumer groups and idle consumers left behind by crashed or retired services
+    raw_streams = list(_REDIS_STREAMS["raw"].values())
+    adapted_streams = list(_REDIS_STREAMS["adapted"].values())
+    janitor = StreamJanitor(
+        _redis_stream_manager,
+        raw_streams + adapted_streams,
+    )
+    metrics_server = MetricsServer(METRICS, port=_METRICS_PORT)
+    await metrics_server.start()
+
+    # Raw prices are adapted as soon as they land
+    oracle_price_pipeline = hyperliquidAdapter.oracle_price_pipeline()
+    oracle_price_pipeline.start()
+
+    # Periodic feeds run at their own cadence, a feed still running when due is coalesced into one run
+    scheduler = TaskScheduler(max_in_flight=_MAX_IN_FLIGHT, logger=logger)
+    scheduler.add("janitor", janitor.clean, interval=janitor.interval, jitter=janitor.interval / 10)
+    # Metadata is served from its snapshot after a restart, and only fetched once older than its ttl
+    for name, (func, interval) in hyperliquid.periodic_tasks().items():
+        scheduler.add(name, func, interval=interval)
+    scheduler.start()
+
+    # Stop gracefully on SIGINT and SIGTERM, letting runs in flight finish
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    await stop.wait()
 
-    while True:
-        try:
-            tasks = [
-                hyperliquidAdapter.get_oracle_prices(),
-                # hyperliquidAdapter.get_funding_rates(),
-                # hyperliquidAdapter.get_orderbook("BTC/USD"),
-            ]
-            # Gather tasks, but do not await here to keep the loop running
-            asyncio.gather(*tasks)
-            
-            # Add a sleep to control the frequency of task executions
-            await asyncio.sleep(10)  # Adjust as needed
-        except Exception as e:
-            logger.debug(f"An error occurred: {e}")
-            continue
+    logger.info("Stopping, scheduled task stats: %s", scheduler.stats)
+    logger.info("Stopping, pipeline stats: %s", oracle_price_pipeline.stats)
+    logger.info("Stopping, redis pool stats: %s", CONNECTIONS.stats)
+    await scheduler.stop()
+    await oracle_price_pipeline.stop()
+    if executor is not None:
+        logger.info("Stopping, adaptation executor stats: %s", executor.stats)
+        executor.shutdown()
+    await websocket_client.stop()
+    websocket_task.cancel()
+    await asyncio.gather(websocket_task, return_exceptions=True)
+    # flushes the raw entries buffered by the websocket and the polls
+    await hyperliquid.close()
+    await metrics_server.stop()
+    await _redis_stream_manager.aclose()
+    await CONNECTIONS.aclose()
 
 if __name__ == "__main__":
     asyncio.run(main())
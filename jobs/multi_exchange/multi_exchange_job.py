@@ -0,0 +1,213 @@
+import argparse
+import asyncio
+import logging
+import signal
+from typing import Any, Awaitable, Callable, Optional
+
+from adapters.dex_adapter_base import RawDataAdapter
+from adapters.executor import AdaptationExecutor
+from api.dex_exchange_base import DEXExchangeBase
+from caching.connections import CONNECTIONS
+from models.enums import OverlapPolicy
+from utilities.common import get_config
+from utilities.logger import SetupLogger
+from utilities.metrics import METRICS, MetricsRegistry, MetricsServer
+from utilities.scheduler import TaskScheduler
+from utilities.venues import VENUES, Venue
+
+VENUE_FAILURES = "dex_venue_failures_total"
+_METRICS_PORT = 9100
+_MAX_IN_FLIGHT = 32
+_RESTART_DELAY = 5.0
+_STATS_INTERVAL = 60.0
+
+
+class MultiExchangeRunner:
+    """
+    Run the ingestion, pipelines and periodic tasks of several venues in one process
+
+    Every venue is built from its registered DEXExchangeBase and
+    RawDataAdapter implementations. They share the event loop, the redis
+    connection pool of their config, the scheduler, the metrics registry
+    and the adaptation executor, so a new venue costs a few tasks instead
+    of a process.
+
+    Failures are isolated per venue: a venue that cannot be built is
+    reported as failed while the others run, a crashed ingestion loop is
+    restarted after a delay, and failing periodic tasks only count
+    failures in the scheduler.
+    """
+
+    def __init__(
+        self,
+        venues: list[Venue],
+        scheduler: TaskScheduler,
+        logger: Optional[logging.Logger] = None,
+        metrics: MetricsRegistry = METRICS,
+        restart_delay: float = _RESTART_DELAY,
+        executor: Optional[AdaptationExecutor] = None,
+    ):
+        """
+        :param venues: venues to run
+        :param scheduler: scheduler shared by the periodic tasks of every venue
+        :param logger: logger of the job
+        :param metrics: registry shared by every venue
+        :param restart_delay: seconds before a crashed ingestion loop is restarted
+        :param executor: started process pool shared by the CPU-bound transforms of every adapter, inline if null
+        """
+        self.venues = venues
+        self.scheduler = scheduler
+        self.executor = executor
+        self._logger = logger or logging.getLogger(__name__)
+        self._metrics = metrics
+        self.restart_delay = restart_delay
+        self._status: dict[str, str] = {}
+        self._ingestion: dict[str, list[asyncio.Task]] = {}
+        self._pipelines: dict[str, list] = {}
+        self._exchanges: dict[str, DEXExchangeBase] = {}
+        self._adapters: dict[str, RawDataAdapter] = {}
+
+    async def start(self):
+        """
+        Build and start every venue, a venue failing to start does not stop the others
+
+        Whatever a failing venue already started is stopped and closed.
+        """
+        for venue in self.venues:
+            self._ingestion[venue.name] = []
+            self._pipelines[venue.name] = []
+            try:
+                self._start_venue(venue)
+                self._status[venue.name] = "running"
+            except Exception:
+                self._status[venue.name] = "failed"
+                self._metrics.counter(VENUE_FAILURES, venue=venue.name).inc()
+                self._logger.error("Venue %s failed to start", venue.name, exc_info=True)
+                await self._stop_venue(venue.name)
+
+    def _start_venue(self, venue: Venue):
+        if venue.exchange_cls is not None:
+            exchange = self._exchanges[venue.name] = venue.exchange_cls()
+            for name, func in exchange.ingestion_tasks().items():
+                self._ingestion[venue.name].append(asyncio.create_task(self._supervise(venue, name, func)))
+            for name, (func, interval) in exchange.periodic_tasks().items():
+                self.scheduler.add(f"{venue.name}.{name}", func, interval, overlap=OverlapPolicy.COALESCE)
+        if venue.adapter_cls is not None:
+            adapter = self._adapters[venue.name] = venue.adapter_cls(executor=self.executor)
+            for pipeline in adapter.pipelines():
+                pipeline.start()
+                self._pipelines[venue.name].append(pipeline)
+            for name, (func, interval) in adapter.periodic_tasks().items():
+                self.scheduler.add(f"{venue.name}.{name}", func, interval, overlap=OverlapPolicy.COALESCE)
+
+    async def _supervise(self, venue: Venue, name: str, func: Callable[[], Awaitable]):
+        """Run an ingestion loop, restarting it whenever it fails or returns"""
+        while True:
+            try:
+                await func()
+                self._logger.warning("Ingestion %s of %s returned, restarting it", name, venue.name)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self._metrics.counter(VENUE_FAILURES, venue=venue.name).inc()
+                self._logger.error("Ingestion %s of %s failed, restarting it", name, venue.name, exc_info=True)
+            await asyncio.sleep(self.restart_delay)
+
+    @property
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Return the status, failures, pipeline throughput and periodic tasks of every venue"""
+        failures = self._metrics.counters(VENUE_FAILURES)
+        scheduled = self.scheduler.stats
+        stats = {}
+        for venue in self.venues:
+            pipelines = {pipeline.name: pipeline.stats for pipeline in self._pipelines.get(venue.name, [])}
+            stats[venue.name] = {
+                "status": self._status.get(venue.name),
+                "failures": failures.get((("venue", venue.name),), 0),
+                "adapted_per_second": sum(pipeline["adapt"]["throughput"] for pipeline in pipelines.values()),
+                "pipelines": pipelines,
+                "tasks": {
+                    name: task for name, task in scheduled.items() if name.startswith(f"{venue.name}.")
+                },
+            }
+        return stats
+
+    async def stop(self):
+        """
+        Stop every venue
+
+        Call it before the redis pools are closed, the entries still
+        buffered by the exchanges and adapters are flushed.
+        """
+        for venue in self.venues:
+            await self._stop_venue(venue.name)
+
+    async def _stop_venue(self, name: str):
+        """Stop the ingestion loops, drain the pipelines, then close the exchange and the adapter of a venue"""
+        tasks = self._ingestion.pop(name, [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for pipeline in self._pipelines.get(name, []):
+            await pipeline.stop()
+        for instance in (self._exchanges.pop(name, None), self._adapters.pop(name, None)):
+            if instance is None:
+                continue
+            try:
+                await instance.close()
+            except Exception:
+                self._logger.error("Failed to close %s of %s", type(instance).__name__, name, exc_info=True)
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Run several venues in one process")
+    parser.add_argument("--venues", nargs="*", help="venues to run, e.g. hyperliquid-cosmos, all if missing")
+    parser.add_argument("--metrics-port", type=int, default=_METRICS_PORT)
+    return parser.parse_args()
+
+
+async def main():
+    args = _parse_args()
+    # Configure logger
+    logger_config = SetupLogger("multi_exchange_job_logger", "logs/multi_exchange/multi_exchange_job.log")
+    logger = logger_config.create_logger()
+
+    VENUES.discover()
+    venues = [VENUES.get(name) for name in args.venues or VENUES.names]
+    logger.info("Running venues %s", [venue.name for venue in venues])
+
+    # CPU-bound adaptation runs in worker processes when the config has an "adaptation_executor" section
+    executor = AdaptationExecutor.from_config(get_config())
+    if executor is not None:
+        await executor.start()
+    scheduler = TaskScheduler(max_in_flight=_MAX_IN_FLIGHT, logger=logger)
+    runner = MultiExchangeRunner(venues, scheduler, logger=logger, executor=executor)
+    await runner.start()
+
+    async def log_stats():
+        logger.info("Venue stats: %s", runner.stats)
+
+    scheduler.add("runner.stats", log_stats, interval=_STATS_INTERVAL)
+    scheduler.start()
+    metrics_server = MetricsServer(METRICS, port=args.metrics_port)
+    await metrics_server.start()
+
+    # Stop gracefully on SIGINT and SIGTERM
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    await stop.wait()
+
+    logger.info("Stopping, venue stats: %s", runner.stats)
+    await scheduler.stop()
+    await runner.stop()
+    if executor is not None:
+        logger.info("Stopping, adaptation executor stats: %s", executor.stats)
+        executor.shutdown()
+    await metrics_server.stop()
+    logger.info("Stopping, redis pool stats: %s", CONNECTIONS.stats)
+    await CONNECTIONS.aclose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
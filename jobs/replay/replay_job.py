@@ -0,0 +1,68 @@
+import argparse
+import asyncio
+from pathlib import Path
+
+from api.hyperliquid.constants import PATH_TO_HYPERLIQUID
+from caching.replay import StreamReplayer, load_archive, load_dump
+from caching.stream_manager import RedisStreamManager
+from caching.streams import StreamNameBuilder
+from models.enums import Blockchains, DataType, Exchanges, StreamNames
+from utilities.logger import SetupLogger
+
+_PATH_TO_REDIS_CONFIG = PATH_TO_HYPERLIQUID / "redis_config.json"
+
+_stream_name_builder = (
+    StreamNameBuilder()
+    .set("marketplace", Exchanges.HYPERLIQUID)
+    .set("blockchain", Blockchains.COSMOS)
+)
+_RAW_STREAMS = [
+    _stream_name_builder.set("data_type", DataType.RAW).set("stream", stream).name
+    for stream in StreamNames
+]
+# raw prices are adapted one to one into oracle prices
+_MEASURED_RAW_STREAM = _stream_name_builder.set("data_type", DataType.RAW).set("stream", StreamNames.PRICES).name
+_MEASURED_ADAPTED_STREAM = _stream_name_builder.set("data_type", DataType.ADAPTED).set("stream", StreamNames.PNL).name
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(
+        description="Replay recorded raw HyperLiquid entries into redis while the adapter runs")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--archive", type=Path, help="root of a stream archive")
+    source.add_argument("--dump", type=Path, help="json-lines dump written by caching.replay.dump_streams")
+    parser.add_argument("--start", type=float, help="unix time of the first archived entry")
+    parser.add_argument("--end", type=float, help="unix time of the last archived entry")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="1 for real time, N for N times faster, 0 for as fast as possible")
+    parser.add_argument("--timeout", type=float, default=30.0,
+                        help="seconds to wait for the adapter to catch up")
+    return parser.parse_args()
+
+
+async def main():
+    args = _parse_args()
+    # Configure logger
+    logger_config = SetupLogger("replay_job_logger", "logs/replay/replay_job.log")
+    logger = logger_config.create_logger()
+    redis_stream_manager = RedisStreamManager.from_config(_PATH_TO_REDIS_CONFIG)
+
+    if args.archive is not None:
+        entries = load_archive(args.archive, _RAW_STREAMS, args.start, args.end)
+    else:
+        entries = [entry for entry in load_dump(args.dump) if entry.stream in _RAW_STREAMS]
+    logger.info("Loaded %d recorded entries", len(entries))
+
+    last_adapted = await redis_stream_manager.xrevrange(_MEASURED_ADAPTED_STREAM, count=1)
+    since_id = last_adapted[0][0].decode() if last_adapted else "0-0"
+
+    replayer = StreamReplayer(redis_stream_manager, entries, speed=args.speed or None)
+    replay_stats = await replayer.replay()
+    print("replay:", replay_stats)
+    measure_stats = await replayer.measure(
+        _MEASURED_RAW_STREAM, _MEASURED_ADAPTED_STREAM, since_id, timeout=args.timeout)
+    print("adaptation:", measure_stats)
+    await redis_stream_manager.aclose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -11,6 +11,7 @@ class StreamNames(Enum):
     PNL = "pnl"
     PRICES = "prices"
     ORDER_BOOK = "orderbook"
+    METADATA = "metadata"
 
 
 class Blockchains(Enum):
@@ -22,3 +23,32 @@ class Blockchains(Enum):
 class DataType(Enum):
     ADAPTED = "adapted"
     RAW = "raw"
+
+
+class RequestPriority(Enum):
+    """Scheduling lane of a REST request, lower values are served first"""
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
+
+
+class TraceStage(Enum):
+    """Pipeline stages stamped into stream entries, in pipeline order"""
+    RECEIVE = "receive"
+    RAW_PUBLISH = "raw_publish"
+    ADAPT_START = "adapt_start"
+    ADAPT_END = "adapt_end"
+    ADAPTED_PUBLISH = "adapted_publish"
+    CONSUMER_READ = "consumer_read"
+
+
+class OverlapPolicy(Enum):
+    """What a periodic task does when it is due while its previous run is still in flight"""
+    SKIP = "skip"
+    COALESCE = "coalesce"
+
+
+class PoolRole(Enum):
+    """Commands a redis connection pool is dedicated to"""
+    READ = "read"
+    WRITE = "write"
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+from functools import cache
+from typing import TYPE_CHECKING, Iterable, Optional
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+_DEFAULT_CAPACITY = 200
+_DEFAULT_DEPTH = 50
+
+
+@cache
+def _frame_columns() -> pd.MultiIndex:
+    """Columns of every order book frame, built with the first frame so importing the module does not load pandas"""
+    import pandas as pd
+
+    return pd.MultiIndex.from_product([["bid", "ask"], ["price", "quantity"]])
+
+
+class BookSide:
+    """
+    One side of an L2 order book stored in sorted, preallocated arrays
+
+    Levels are kept sorted by a key that grows towards the best price
+    (the price for bids, minus the price for asks), so the best level is
+    always the last one. Updates near the top of the book, which are the
+    most frequent, only shift a few elements, and the top-N levels are
+    returned as array views without sorting. At most `capacity` levels
+    are kept; the worst level is evicted to make room for a better one.
+    """
+
+    __slots__ = ("_sign", "_keys", "_prices", "_sizes", "_count")
+
+    def __init__(self, is_bid: bool, capacity: int = _DEFAULT_CAPACITY):
+        self._sign = 1.0 if is_bid else -1.0
+        self._keys = np.empty(capacity)
+        self._prices = np.empty(capacity)
+        self._sizes = np.empty(capacity)
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def capacity(self) -> int:
+        return len(self._keys)
+
+    def load(self, prices: Iterable[float], sizes: Iterable[float]):
+        """Replace every level with a snapshot, in any order"""
+        prices = np.asarray(prices, dtype=float)
+        sizes = np.asarray(sizes, dtype=float)
+        keys = self._sign * prices
+        order = np.argsort(keys, kind="stable")[-self.capacity:]
+        n = len(order)
+        self._keys[:n] = keys[order]
+        self._prices[:n] = prices[order]
+        self._sizes[:n] = sizes[order]
+        self._count = n
+
+    def update(self, price: float, size: float):
+        """Set the size of a price level, removing the level when size is 0"""
+        key = self._sign * price
+        n = self._count
+        i = int(np.searchsorted(self._keys[:n], key))
+        if i < n and self._keys[i] == key:
+            if size:
+                self._sizes[i] = size
+            else:
+                for array in (self._keys, self._prices, self._sizes):
+                    array[i:n - 1] = array[i + 1:n]
+                self._count = n - 1
+            return
+        if not size:
+            return
+
+        if n < self.capacity:
+            for array in (self._keys, self._prices, self._sizes):
+                array[i + 1:n + 1] = array[i:n]
+            self._count = n + 1
+        elif i == 0:
+            # worse than every level we keep
+            return
+        else:
+            # evict the worst level and shift the worse half down
+            i -= 1
+            for array in (self._keys, self._prices, self._sizes):
+                array[:i] = array[1:i + 1]
+        self._keys[i] = key
+        self._prices[i] = price
+        self._sizes[i] = size
+
+    def top(self, depth: int) -> tuple[np.ndarray, np.ndarray]:
+        """Return views of the prices and sizes of the best levels, best first"""
+        n = self._count
+        d = min(depth, n)
+        return self._prices[n - d:n][::-1], self._sizes[n - d:n][::-1]
+
+
+class OrderBook:
+    """
+    L2 order book of a single ticker
+
+    The DataFrame view is built lazily, only when asked for, and reused
+    until the next change of the book.
+    """
+
+    __slots__ = ("ticker", "bids", "asks", "timestamp", "_frame", "_frame_depth")
+
+    def __init__(self, ticker: str, capacity: int = _DEFAULT_CAPACITY):
+        self.ticker = ticker
+        self.bids = BookSide(is_bid=True, capacity=capacity)
+        self.asks = BookSide(is_bid=False, capacity=capacity)
+        self.timestamp: Optional[float] = None
+        self._frame: Optional[pd.DataFrame] = None
+        self._frame_depth = 0
+
+    def apply_snapshot(
+        self,
+        bids: Iterable[tuple[float, float]],
+        asks: Iterable[tuple[float, float]],
+        timestamp: Optional[float] = None,
+    ):
+        """
+        Replace both sides of the book
+
+        :param bids: (price, size) levels of the bid side
+        :param asks: (price, size) levels of the ask side
+        :param timestamp: exchange time of the snapshot
+        """
+        for side, levels in ((self.bids, bids), (self.asks, asks)):
+            levels = np.asarray(list(levels), dtype=float).reshape(-1, 2)
+            side.load(levels[:, 0], levels[:, 1])
+        self.timestamp = timestamp
+        self._frame = None
+
+    def apply_update(self, is_bid: bool, price: float, size: float, timestamp: Optional[float] = None):
+        """
+        Apply a single level update
+
+        :param is_bid: whether the level belongs to the bid side
+        :param price: price of the level
+        :param size: new size of the level, 0 removes it
+        :param timestamp: exchange time of the update
+        """
+        (self.bids if is_bid else self.asks).update(price, size)
+        self.timestamp = timestamp
+        self._frame = None
+
+    def top(self, depth: int = _DEFAULT_DEPTH) -> dict[str, tuple[np.ndarray, np.ndarray]]:
+        """Return views of the best bid and ask levels"""
+        return {"bid": self.bids.top(depth), "ask": self.asks.top(depth)}
+
+    def to_frame(self, depth: int = _DEFAULT_DEPTH) -> pd.DataFrame:
+        """
+        Return the best levels as a two-level column DataFrame
+
+        Bid prices are descending and ask prices ascending. A side with
+        fewer levels than the other is padded with NaN.
+        """
+        if self._frame is not None and self._frame_depth == depth:
+            return self._frame
+        import pandas as pd
+
+        bid_prices, bid_sizes = self.bids.top(depth)
+        ask_prices, ask_sizes = self.asks.top(depth)
+        rows = max(len(bid_prices), len(ask_prices))
+        values = np.full((rows, 4), np.nan)
+        values[:len(bid_prices), 0] = bid_prices
+        values[:len(bid_sizes), 1] = bid_sizes
+        values[:len(ask_prices), 2] = ask_prices
+        values[:len(ask_sizes), 3] = ask_sizes
+        self._frame = pd.DataFrame(values, columns=_frame_columns())
+        self._frame_depth = depth
+        return self._frame
+
+
+class OrderBookEngine:
+    """Order books of every ticker of a venue, created on first use"""
+
+    def __init__(self, capacity: int = _DEFAULT_CAPACITY):
+        """
+        :param capacity: maximum number of levels kept per side of each book
+        """
+        self.capacity = capacity
+        self._books: dict[str, OrderBook] = {}
+
+    def __contains__(self, ticker: str) -> bool:
+        return ticker in self._books
+
+    @property
+    def tickers(self) -> list[str]:
+        return list(self._books)
+
+    def book(self, ticker: str) -> OrderBook:
+        """Return the book of a ticker, creating an empty one if needed"""
+        book = self._books.get(ticker)
+        if book is None:
+            book = self._books[ticker] = OrderBook(ticker, self.capacity)
+        return book
+
+    def apply_snapshot(self, ticker: str, bids, asks, timestamp: Optional[float] = None):
+        self.book(ticker).apply_snapshot(bids, asks, timestamp)
+
+    def apply_update(self, ticker: str, is_bid: bool, price: float, size: float,
+                     timestamp: Optional[float] = None):
+        self.book(ticker).apply_update(is_bid, price, size, timestamp)
+
+    def to_frame(self, ticker: str, depth: int = _DEFAULT_DEPTH) -> Optional[pd.DataFrame]:
+        """Return the DataFrame view of a ticker's book, None if it was never seen"""
+        book = self._books.get(ticker)
+        return book.to_frame(depth) if book is not None else None
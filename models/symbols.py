@@ -0,0 +1,111 @@
+import sys
+from typing import Iterable, Optional
+
+from models.enums import Blockchains, Exchanges
+
+_DEFAULT_QUOTE = "USD"
+
+
+class SymbolRegistry:
+    """
+    Canonical tickers and dense integer ids of the symbols of a venue
+
+    Venue coin names (as str or as the raw bytes read from redis) map to
+    an interned canonical ticker that abides by our internal standard,
+    e.g. b"btc" -> "BTC/USD", and to an integer id assigned in order of
+    registration. Ids are dense, so hot paths can index arrays by id
+    instead of hashing freshly built strings. Different coin names that
+    normalize to the same ticker share the same id.
+
+    Use `for_venue` to get the registry shared by every adapter and
+    consumer of an exchange and blockchain pair.
+    """
+
+    _REGISTRIES: dict[tuple[Exchanges, Blockchains], "SymbolRegistry"] = {}
+
+    def __init__(self, exchange: Exchanges, blockchain: Blockchains, quote: str = _DEFAULT_QUOTE):
+        self.exchange = exchange
+        self.blockchain = blockchain
+        self.quote = quote
+        self._tickers: list[str] = []
+        self._ticker_to_id: dict[str, int] = {}
+        # coin name, ticker, or their bytes -> id and -> ticker
+        self._aliases: dict[str | bytes, int] = {}
+        self._alias_tickers: dict[str | bytes, str] = {}
+        self.metadata: dict[str, dict] = {}
+
+    @classmethod
+    def for_venue(cls, exchange: Exchanges, blockchain: Blockchains) -> "SymbolRegistry":
+        """Return the registry shared by the process for an exchange and blockchain"""
+        key = (exchange, blockchain)
+        registry = cls._REGISTRIES.get(key)
+        if registry is None:
+            registry = cls._REGISTRIES[key] = cls(exchange, blockchain)
+        return registry
+
+    def __len__(self) -> int:
+        return len(self._tickers)
+
+    def __contains__(self, name: str | bytes) -> bool:
+        return name in self._aliases
+
+    @property
+    def tickers(self) -> list[str]:
+        """Return the canonical tickers, indexed by id"""
+        return list(self._tickers)
+
+    def canonical(self, coin: str | bytes) -> str:
+        """Return the canonical ticker of a venue coin name without registering it"""
+        if isinstance(coin, bytes):
+            coin = coin.decode()
+        if "/" in coin:
+            return coin.upper()
+        return f"{coin.upper()}/{self.quote}"
+
+    def register(self, coin: str | bytes, metadata: Optional[dict] = None) -> int:
+        """
+        Register a venue coin name and return its id
+
+        :param coin: venue coin name or canonical ticker
+        :param metadata: venue metadata of the symbol, e.g. size decimals
+        :return: the id of the symbol
+        """
+        symbol_id = self._aliases.get(coin)
+        if symbol_id is None:
+            ticker = sys.intern(self.canonical(coin))
+            symbol_id = self._ticker_to_id.get(ticker)
+            if symbol_id is None:
+                symbol_id = len(self._tickers)
+                self._tickers.append(ticker)
+                self._ticker_to_id[ticker] = symbol_id
+            name = coin.decode() if isinstance(coin, bytes) else coin
+            for alias in (name, name.encode(), ticker, ticker.encode()):
+                self._aliases[alias] = symbol_id
+                self._alias_tickers[alias] = self._tickers[symbol_id]
+        if metadata is not None:
+            self.metadata[self._tickers[symbol_id]] = metadata
+        return symbol_id
+
+    def load_metadata(self, universe: Iterable[dict], name_key: str = "name"):
+        """
+        Register every symbol listed in the exchange metadata
+
+        :param universe: one mapping per symbol, e.g. the "universe" of HyperLiquid's meta endpoint
+        :param name_key: key of the venue coin name inside each mapping
+        """
+        for asset in universe:
+            self.register(asset[name_key], metadata=asset)
+
+    def id(self, name: str | bytes) -> int:
+        """Return the id of a coin name or ticker, registering it on first sight"""
+        symbol_id = self._aliases.get(name)
+        return symbol_id if symbol_id is not None else self.register(name)
+
+    def ticker(self, name: str | bytes) -> str:
+        """Return the interned canonical ticker of a coin name, registering it on first sight"""
+        ticker = self._alias_tickers.get(name)
+        return ticker if ticker is not None else self._tickers[self.register(name)]
+
+    def ticker_of(self, symbol_id: int) -> str:
+        """Return the canonical ticker of an id"""
+        return self._tickers[symbol_id]
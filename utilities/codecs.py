@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import json
+import sys
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any, Optional
+
+from pydantic import BaseModel
+
+if TYPE_CHECKING:
+    from requests import Response
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional fast backend
+    orjson = None
+
+
+def _is_response(x: Any) -> bool:
+    """
+    Return whether a value is an http response
+
+    Consumers and adapters never see responses, so requests is only
+    looked up once something else (the REST transport) has imported it.
+    """
+    requests = sys.modules.get("requests")
+    return requests is not None and isinstance(x, requests.Response)
+
+
+class Codec(ABC):
+    """Encode python objects to bytes and decode bytes back"""
+
+    name: str = ""
+
+    @abstractmethod
+    def encode(self, x: Any) -> bytes:
+        """Serialize a value into bytes"""
+
+    @abstractmethod
+    def decode(self, data: bytes | str) -> Any:
+        """Deserialize bytes into a value"""
+
+
+class JsonCodec(Codec):
+    """Standard library json, always available"""
+
+    name = "json"
+
+    def encode(self, x: Any) -> bytes:
+        return json.dumps(x, separators=(",", ":")).encode()
+
+    def decode(self, data: bytes | str) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(Codec):
+    """orjson backend, several times faster than the standard library"""
+
+    name = "orjson"
+
+    def encode(self, x: Any) -> bytes:
+        return orjson.dumps(x)
+
+    def decode(self, data: bytes | str) -> Any:
+        return orjson.loads(data)
+
+
+class PassthroughCodec(Codec):
+    """
+    Zero-copy codec for payloads that are already serialized
+
+    Bytes-like values are handed over untouched, strings are only
+    utf-8 encoded. Decoding returns the bytes as they were stored.
+    """
+
+    name = "passthrough"
+
+    def encode(self, x: Any) -> bytes:
+        if isinstance(x, (bytes, bytearray, memoryview)):
+            return x
+        if isinstance(x, str):
+            return x.encode()
+        raise TypeError(f"Cannot pass through a value of type {type(x).__name__}")
+
+    def decode(self, data: bytes | str) -> bytes | str:
+        return data
+
+
+class CodecRegistry:
+    """
+    Registry of the codecs shared by the publisher, the adapters and the consumers
+
+    Every stage encodes a payload once when it produces it and decodes it
+    once when it needs its content; already serialized payloads (bytes,
+    http responses) are forwarded through the passthrough codec instead
+    of being decoded and encoded again.
+    """
+
+    def __init__(self):
+        self._codecs: dict[str, Codec] = {}
+        self._default: Optional[str] = None
+
+    @property
+    def names(self) -> list[str]:
+        return list(self._codecs)
+
+    def register(self, codec: Codec, default: bool = False):
+        """
+        Add a codec to the registry
+
+        :param codec: codec to register under its name
+        :param default: use the codec when no name is given
+        """
+        self._codecs[codec.name] = codec
+        if default or self._default is None:
+            self._default = codec.name
+
+    def get(self, name: Optional[str] = None) -> Codec:
+        """Return the codec registered under a name, the default one if null"""
+        return self._codecs[name or self._default]
+
+    def encode(self, x: Any, codec: Optional[str] = None) -> bytes:
+        """
+        Serialize a value, forwarding serialized payloads untouched
+
+        :param x: bytes, http response, pydantic model or json-compatible value
+        :param codec: name of the codec for json-compatible values, default if null
+        :return: the serialized payload
+        """
+        if isinstance(x, (bytes, bytearray, memoryview, str)):
+            return self._codecs[PassthroughCodec.name].encode(x)
+        if _is_response(x):
+            return x.content
+        if isinstance(x, BaseModel):
+            return x.model_dump_json().encode()
+        return self.get(codec).encode(x)
+
+    def decode(self, data: bytes | str | Response, codec: Optional[str] = None) -> Any:
+        """
+        Deserialize a payload
+
+        :param data: serialized payload or http response
+        :param codec: name of the codec, default if null
+        :return: the deserialized value
+        """
+        if _is_response(data):
+            data = data.content
+        return self.get(codec).decode(data)
+
+
+CODECS = CodecRegistry()
+CODECS.register(JsonCodec())
+CODECS.register(PassthroughCodec())
+if orjson is not None:
+    CODECS.register(OrjsonCodec(), default=True)
@@ -1,6 +1,6 @@
 import json
 import os
-import time
+import socket
 
 
 def get_config():
@@ -11,6 +11,16 @@ def get_config():
         return json.load(f)
 
 
-def generate_group_name(stream_name: str) -> str:
-    current_time = int(time.time())
-    return f"{stream_name}_{current_time}"
+def generate_group_name(stream_name: str, service: str) -> str:
+    """
+    Return the durable consumer group of a service on a stream
+
+    The name is stable across restarts, so a service resumes from its
+    last delivered entry instead of re-reading the stream.
+    """
+    return f"{stream_name}_{service}"
+
+
+def generate_consumer_name(service: str) -> str:
+    """Return a consumer name unique to this process within the service's group"""
+    return f"{service}-{socket.gethostname()}-{os.getpid()}"
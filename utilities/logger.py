@@ -1,24 +1,195 @@
+import atexit
 import logging
 import os
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional
+
+_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+_DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+_DEFAULT_BACKUP_COUNT = 5
+# payload loggers keep one record out of 100, at most 10 per second
+_DEFAULT_SAMPLE_EVERY = 100
+_DEFAULT_RATE_LIMIT = 10.0
+_PAYLOAD_SUFFIX = "payload"
+
+
+class SamplingFilter(logging.Filter):
+    """Let through one record out of `every`, records above `max_level` always pass"""
+
+    def __init__(self, every: int, max_level: int = logging.INFO):
+        super().__init__()
+        self.every = every
+        self.max_level = max_level
+        self._seen = 0
+        self.dropped = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.max_level:
+            return True
+        self._seen += 1
+        if (self._seen - 1) % self.every == 0:
+            return True
+        self.dropped += 1
+        return False
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Let through at most `rate` records per second, in bursts of up to `burst`
+
+    Records above `max_level` always pass, warnings and errors are never dropped.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None, max_level: int = logging.INFO):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst if burst is not None else max(rate, 1.0)
+        self.max_level = max_level
+        self._tokens = self.burst
+        self._refilled_at = time.monotonic()
+        self.dropped = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.max_level:
+            return True
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return True
+        self.dropped += 1
+        return False
+
 
 class SetupLogger:
-    def __init__(self, logger_name, log_file):
+    """
+    Configure a named logger writing to a size-rotated file
+
+    In asynchronous mode (the default) the logger only puts records on a
+    queue and a background thread per log file writes them, so disk I/O
+    never runs on the event loop. Queued records are written when the
+    interpreter exits. Files are rotated once they reach `max_bytes`.
+
+    Setup is idempotent: creating the same logger name again returns the
+    already configured logger instead of adding another handler.
+    """
+
+    _lock = threading.Lock()
+    _configured: set[str] = set()
+    # absolute log file -> queue drained by its listener thread
+    _queues: dict[str, queue.SimpleQueue] = {}
+    _listeners: dict[str, QueueListener] = {}
+
+    def __init__(
+        self,
+        logger_name,
+        log_file,
+        level: int = logging.DEBUG,
+        asynchronous: bool = True,
+        max_bytes: int = _DEFAULT_MAX_BYTES,
+        backup_count: int = _DEFAULT_BACKUP_COUNT,
+    ):
+        """
+        :param logger_name: name of the logger
+        :param log_file: file the records are written to
+        :param level: lowest level written
+        :param asynchronous: write from a background thread instead of the caller
+        :param max_bytes: size at which the file is rotated, never rotated if 0
+        :param backup_count: number of rotated files kept
+        """
         self.logger_name = logger_name
         self.log_file = log_file
-    
+        self.level = level
+        self.asynchronous = asynchronous
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+
+    def _file_handler(self) -> logging.Handler:
+        handler = RotatingFileHandler(
+            self.log_file, maxBytes=self.max_bytes, backupCount=self.backup_count)
+        handler.setLevel(self.level)
+        handler.setFormatter(logging.Formatter(_FORMAT))
+        return handler
+
+    def _queue_handler(self) -> logging.Handler:
+        """Return a handler feeding the listener of the log file, starting it once per file"""
+        path = os.path.abspath(self.log_file)
+        log_queue = self._queues.get(path)
+        if log_queue is None:
+            log_queue = self._queues[path] = queue.SimpleQueue()
+            listener = QueueListener(log_queue, self._file_handler(), respect_handler_level=True)
+            listener.start()
+            self._listeners[path] = listener
+        handler = QueueHandler(log_queue)
+        handler.setLevel(self.level)
+        return handler
+
     def create_logger(self):
-        log_directory = os.path.dirname(self.log_file)
-        os.makedirs(log_directory, exist_ok=True)
-        
-        logger = logging.getLogger(self.logger_name)
-        logger.setLevel(logging.DEBUG)
-        
-        handler = logging.FileHandler(self.log_file)
-        handler.setLevel(logging.DEBUG)
-        
-        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-        handler.setFormatter(formatter)
-        
-        logger.addHandler(handler)
-    
+        with self._lock:
+            logger = logging.getLogger(self.logger_name)
+            if self.logger_name in self._configured:
+                return logger
+
+            log_directory = os.path.dirname(self.log_file)
+            os.makedirs(log_directory, exist_ok=True)
+
+            logger.setLevel(self.level)
+            handler = self._queue_handler() if self.asynchronous else self._file_handler()
+            logger.addHandler(handler)
+            self._configured.add(self.logger_name)
+
+        return logger
+
+    def create_payload_logger(
+        self,
+        sample_every: int = _DEFAULT_SAMPLE_EVERY,
+        rate_limit: Optional[float] = _DEFAULT_RATE_LIMIT,
+    ) -> logging.Logger:
+        """
+        Return a child logger for messages embedding full payloads
+
+        Its records go to the file of the parent logger, but only one
+        record out of `sample_every` is kept, and at most `rate_limit`
+        records per second. Dropped records are never formatted.
+
+        :param sample_every: keep one record out of this many, all if 1
+        :param rate_limit: records kept per second, unlimited if null
+        :return: the "<logger name>.payload" logger
+        """
+        self.create_logger()
+        with self._lock:
+            name = f"{self.logger_name}.{_PAYLOAD_SUFFIX}"
+            logger = logging.getLogger(name)
+            if name in self._configured:
+                return logger
+            if sample_every > 1:
+                logger.addFilter(SamplingFilter(sample_every))
+            if rate_limit is not None:
+                logger.addFilter(RateLimitFilter(rate_limit))
+            self._configured.add(name)
         return logger
+
+    @classmethod
+    def shutdown(cls):
+        """Write every queued record and stop the listener threads"""
+        with cls._lock:
+            for listener in cls._listeners.values():
+                listener.stop()
+            cls._listeners.clear()
+
+    @classmethod
+    def _restart_listeners(cls):
+        # threads do not survive a fork, the child drains its copy of the queues itself
+        cls._lock = threading.Lock()
+        for listener in cls._listeners.values():
+            listener._thread = None
+            listener.start()
+
+
+atexit.register(SetupLogger.shutdown)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=SetupLogger._restart_listeners)
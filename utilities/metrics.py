@@ -0,0 +1,289 @@
+import asyncio
+import math
+import time
+from typing import Iterable, Optional
+
+from models.enums import TraceStage
+
+TRACE_PREFIX = "trace:"
+_STAGES = list(TraceStage)
+# stage -> field name, as str and as the raw bytes read from redis
+_TRACE_FIELDS = [
+    (stage, f"{TRACE_PREFIX}{stage.value}", f"{TRACE_PREFIX}{stage.value}".encode())
+    for stage in _STAGES
+]
+_FIELD_NAMES = {stage: name for stage, name, _ in _TRACE_FIELDS}
+
+# buckets grow by 2^(1/8), about 9% per bucket, from 1 microsecond to ~70 minutes
+_MIN_LATENCY = 1e-6
+_BUCKETS_PER_DOUBLING = 8
+_N_BUCKETS = 32 * _BUCKETS_PER_DOUBLING
+_LOG_GROWTH = math.log(2) / _BUCKETS_PER_DOUBLING
+_QUANTILES = (0.5, 0.99)
+
+STAGE_LATENCY = "dex_stage_latency_seconds"
+END_TO_END_LATENCY = "dex_end_to_end_latency_seconds"
+
+
+def stamp(fields: dict, stage: TraceStage, at: Optional[int] = None) -> dict:
+    """
+    Stamp the monotonic time a stage was reached into the fields of an entry
+
+    Stamps are nanoseconds of the system-wide monotonic clock, so stamps
+    written by different processes of the same host are comparable.
+
+    :param fields: fields of the entry, updated in place
+    :param stage: stage reached
+    :param at: time.monotonic_ns() when the stage was reached, now if null
+    :return: the fields
+    """
+    fields[_FIELD_NAMES[stage]] = time.monotonic_ns() if at is None else at
+    return fields
+
+
+def split_trace(fields: dict) -> dict[TraceStage, int]:
+    """
+    Pop the trace stamps out of the fields of an entry
+
+    :param fields: fields of a stream entry, with str or bytes names
+    :return: monotonic nanoseconds of every stamped stage
+    """
+    trace = {}
+    for stage, name, name_bytes in _TRACE_FIELDS:
+        value = fields.pop(name, None)
+        if value is None:
+            value = fields.pop(name_bytes, None)
+        if value is not None:
+            trace[stage] = int(value)
+    return trace
+
+
+def trace_fields(trace: dict[TraceStage, int]) -> dict[str, int]:
+    """Return the stamps of a trace as entry fields, to carry them to the next stream"""
+    return {_FIELD_NAMES[stage]: value for stage, value in trace.items()}
+
+
+class LatencyHistogram:
+    """
+    Log-scale latency histogram with constant memory
+
+    Recording is a logarithm and an increment. Percentiles are read from
+    the bucket upper bounds, about 9% above the exact value at worst.
+    """
+
+    def __init__(self):
+        self._buckets = [0] * _N_BUCKETS
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        if seconds > _MIN_LATENCY:
+            bucket = min(int(math.log(seconds / _MIN_LATENCY) / _LOG_GROWTH), _N_BUCKETS - 1)
+        else:
+            bucket = 0
+        self._buckets[bucket] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q: float) -> float:
+        """Return the latency under which a fraction q of the records fall"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bucket, count in enumerate(self._buckets):
+            seen += count
+            if seen >= rank:
+                return min(_MIN_LATENCY * math.exp((bucket + 1) * _LOG_GROWTH), self.max)
+        return self.max
+
+
+class Counter:
+    """Monotonically increasing count"""
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: int = 1):
+        self.value += amount
+
+
+class Gauge:
+    """Value that goes up and down"""
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float):
+        self.value = value
+
+
+class MetricsRegistry:
+    """
+    Latency histograms, counters and gauges of a process, rendered in the Prometheus text format
+
+    Metrics are identified by a name and labels, and are created on first use.
+    """
+
+    def __init__(self):
+        self._histograms: dict[str, dict[tuple, LatencyHistogram]] = {}
+        self._counters: dict[str, dict[tuple, Counter]] = {}
+        self._gauges: dict[str, dict[tuple, Gauge]] = {}
+
+    def histogram(self, name: str, **labels: str) -> LatencyHistogram:
+        """Return the histogram of a metric name and labels, creating it on first use"""
+        series = self._histograms.setdefault(name, {})
+        key = tuple(sorted(labels.items()))
+        histogram = series.get(key)
+        if histogram is None:
+            histogram = series[key] = LatencyHistogram()
+        return histogram
+
+    def counter(self, name: str, **labels: str) -> Counter:
+        """Return the counter of a metric name and labels, creating it on first use"""
+        series = self._counters.setdefault(name, {})
+        key = tuple(sorted(labels.items()))
+        counter = series.get(key)
+        if counter is None:
+            counter = series[key] = Counter()
+        return counter
+
+    def gauge(self, name: str, **labels: str) -> Gauge:
+        """Return the gauge of a metric name and labels, creating it on first use"""
+        series = self._gauges.setdefault(name, {})
+        key = tuple(sorted(labels.items()))
+        gauge = series.get(key)
+        if gauge is None:
+            gauge = series[key] = Gauge()
+        return gauge
+
+    def observe_trace(self, trace: dict[TraceStage, int], stages: Iterable[TraceStage]):
+        """
+        Record the latency of stages from the stamps of a trace
+
+        The latency of a stage is the time elapsed since the previous
+        stamped stage. The last given stage also records the end-to-end
+        latency since the first stamped stage.
+
+        :param trace: stamps of an entry, see `split_trace`
+        :param stages: stages stamped by the calling component
+        """
+        stage = None
+        for stage in stages:
+            reached = trace.get(stage)
+            if reached is None:
+                continue
+            for previous in reversed(_STAGES[:_STAGES.index(stage)]):
+                if previous in trace:
+                    self.histogram(STAGE_LATENCY, stage=stage.value).record(
+                        (reached - trace[previous]) / 1e9)
+                    break
+        if stage is not None and stage in trace:
+            first = min(trace.values())
+            self.histogram(END_TO_END_LATENCY, stage=stage.value).record(
+                (trace[stage] - first) / 1e9)
+
+    def snapshot(self) -> dict[str, dict[tuple, dict[str, float]]]:
+        """Return the count, p50, p99 and max of every histogram, see `counters` for counters"""
+        return {
+            name: {
+                labels: {
+                    "count": histogram.count,
+                    "p50": histogram.percentile(0.5),
+                    "p99": histogram.percentile(0.99),
+                    "max": histogram.max,
+                }
+                for labels, histogram in series.items()
+            }
+            for name, series in self._histograms.items()
+        }
+
+    def counters(self, name: str) -> dict[tuple, int]:
+        """Return the value of every counter of a metric name, by labels"""
+        return {labels: counter.value for labels, counter in self._counters.get(name, {}).items()}
+
+    def gauges(self, name: str) -> dict[tuple, float]:
+        """Return the value of every gauge of a metric name, by labels"""
+        return {labels: gauge.value for labels, gauge in self._gauges.get(name, {}).items()}
+
+    @staticmethod
+    def _labels(labels: tuple, **extra: str) -> str:
+        pairs = [*labels, *extra.items()]
+        if not pairs:
+            return ""
+        return "{" + ",".join(f'{key}="{value}"' for key, value in pairs) + "}"
+
+    def render(self) -> str:
+        """Render every histogram as a Prometheus summary plus a max gauge, every counter and every gauge"""
+        lines = []
+        for name, series in self._counters.items():
+            lines.append(f"# TYPE {name} counter")
+            for labels, counter in series.items():
+                lines.append(f"{name}{self._labels(labels)} {counter.value}")
+        for name, series in self._gauges.items():
+            lines.append(f"# TYPE {name} gauge")
+            for labels, gauge in series.items():
+                lines.append(f"{name}{self._labels(labels)} {gauge.value:g}")
+        for name, series in self._histograms.items():
+            lines.append(f"# TYPE {name} summary")
+            for labels, histogram in series.items():
+                for q in _QUANTILES:
+                    lines.append(
+                        f"{name}{self._labels(labels, quantile=str(q))} {histogram.percentile(q):.9f}")
+                lines.append(f"{name}_sum{self._labels(labels)} {histogram.sum:.9f}")
+                lines.append(f"{name}_count{self._labels(labels)} {histogram.count}")
+            lines.append(f"# TYPE {name}_max gauge")
+            for labels, histogram in series.items():
+                lines.append(f"{name}_max{self._labels(labels)} {histogram.max:.9f}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Serve the metrics of a registry over HTTP, for Prometheus to scrape"""
+
+    def __init__(self, registry: MetricsRegistry, host: str = "127.0.0.1", port: int = 9100):
+        """
+        :param registry: metrics to expose
+        :param host: interface to listen on, local only by default
+        :param port: port to listen on
+        """
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = await reader.readline()
+            # drain the headers, the request has no body
+            while (await reader.readline()).strip():
+                pass
+            parts = request_line.decode(errors="replace").split()
+            if len(parts) >= 2 and parts[1] == "/metrics":
+                status, body = "200 OK", self.registry.render().encode()
+            else:
+                status, body = "404 Not Found", b""
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                f"Content-Type: text/plain; version=0.0.4\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        finally:
+            writer.close()
+
+
+METRICS = MetricsRegistry()
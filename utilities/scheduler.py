@@ -0,0 +1,231 @@
+import asyncio
+import logging
+import random
+from typing import Any, Awaitable, Callable, Optional
+
+from models.enums import OverlapPolicy
+from utilities.metrics import METRICS, MetricsRegistry
+
+TASK_DURATION = "dex_task_duration_seconds"
+TASK_LATENESS = "dex_task_lateness_seconds"
+TASK_RUNS = "dex_task_runs_total"
+TASK_FAILURES = "dex_task_failures_total"
+TASK_SKIPPED = "dex_task_skipped_total"
+_DEFAULT_GRACE_PERIOD = 10.0
+
+
+class ScheduledTask:
+    """A coroutine function run periodically by a TaskScheduler"""
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[], Awaitable[Any]],
+        interval: float,
+        jitter: float,
+        overlap: OverlapPolicy,
+        timeout: Optional[float],
+    ):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.jitter = jitter
+        self.overlap = overlap
+        self.timeout = timeout
+        self.running = False
+        self.pending = False
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+        self.coalesced = 0
+        self.missed = 0
+        self.last_error: Optional[str] = None
+
+
+class TaskScheduler:
+    """
+    Run many periodic coroutines at their own cadence in one event loop
+
+    Every task is fired on a fixed-rate grid of its interval, delayed by
+    a random jitter so tasks sharing an interval do not fire together.
+    A task never overlaps itself: when it is due while its previous run
+    is still in flight, the tick is either skipped or coalesced with the
+    other missed ticks into a single run started as soon as the previous
+    one ends. Ticks missed because the loop was blocked are dropped
+    instead of being replayed in a burst.
+
+    `max_in_flight` caps the runs executing at once across all tasks,
+    waiting runs are reported as late. Run durations and lateness (start
+    time minus scheduled time) are recorded per task in the metrics
+    registry, exceptions are logged and counted without stopping the task.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: Optional[int] = None,
+        logger: Optional[logging.Logger] = None,
+        metrics: MetricsRegistry = METRICS,
+    ):
+        """
+        :param max_in_flight: maximum number of runs executing at once, unbounded if null
+        :param logger: logger of the owning job
+        :param metrics: registry receiving the durations, lateness and counters
+        """
+        self._tasks: dict[str, ScheduledTask] = {}
+        self._semaphore = asyncio.Semaphore(max_in_flight) if max_in_flight else None
+        self._logger = logger or logging.getLogger(__name__)
+        self._metrics = metrics
+        self._drivers: list[asyncio.Task] = []
+        self._in_flight: set[asyncio.Task] = set()
+        self._running = False
+        self._stopped = asyncio.Event()
+
+    def add(
+        self,
+        name: str,
+        func: Callable[[], Awaitable[Any]],
+        interval: float,
+        jitter: float = 0.0,
+        overlap: OverlapPolicy = OverlapPolicy.SKIP,
+        timeout: Optional[float] = None,
+    ) -> ScheduledTask:
+        """
+        Schedule a coroutine function
+
+        :param name: unique name of the task, used as metric label
+        :param func: coroutine function called without arguments on every run
+        :param interval: seconds between two scheduled runs
+        :param jitter: largest random delay, in seconds, added to every run
+        :param overlap: what to do when the task is due while still running
+        :param timeout: seconds after which a run is cancelled and counted as failed, no limit if null
+        :return: the scheduled task, holding its counters
+        """
+        if name in self._tasks:
+            raise ValueError(f"Task {name} is already scheduled")
+        task = self._tasks[name] = ScheduledTask(name, func, interval, jitter, overlap, timeout)
+        if self._running:
+            self._drivers.append(asyncio.create_task(self._drive(task)))
+        return task
+
+    @property
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """Return the counters and the duration and lateness percentiles of every task"""
+        stats = {}
+        for name, task in self._tasks.items():
+            duration = self._metrics.histogram(TASK_DURATION, task=name)
+            lateness = self._metrics.histogram(TASK_LATENESS, task=name)
+            stats[name] = {
+                "running": task.running,
+                "runs": task.runs,
+                "failures": task.failures,
+                "skipped": task.skipped,
+                "coalesced": task.coalesced,
+                "missed": task.missed,
+                "last_error": task.last_error,
+                "duration_p50": duration.percentile(0.5),
+                "duration_p99": duration.percentile(0.99),
+                "lateness_p50": lateness.percentile(0.5),
+                "lateness_p99": lateness.percentile(0.99),
+                "lateness_max": lateness.max,
+            }
+        return stats
+
+    def start(self):
+        """Start firing every scheduled task"""
+        self._running = True
+        self._stopped.clear()
+        self._drivers = [asyncio.create_task(self._drive(task)) for task in self._tasks.values()]
+
+    async def run_forever(self):
+        """Start the scheduler and wait until it is stopped, stopping it if cancelled"""
+        self.start()
+        try:
+            await self._stopped.wait()
+        except asyncio.CancelledError:
+            await self.stop()
+            raise
+
+    async def stop(self, grace_period: float = _DEFAULT_GRACE_PERIOD):
+        """
+        Stop firing tasks and wait for the runs in flight
+
+        :param grace_period: seconds given to the runs in flight before they are cancelled
+        """
+        self._running = False
+        for driver in self._drivers:
+            driver.cancel()
+        await asyncio.gather(*self._drivers, return_exceptions=True)
+        self._drivers = []
+
+        if self._in_flight:
+            _, late = await asyncio.wait(self._in_flight, timeout=grace_period)
+            for run in late:
+                run.cancel()
+            await asyncio.gather(*late, return_exceptions=True)
+        self._stopped.set()
+
+    async def _drive(self, task: ScheduledTask):
+        loop = asyncio.get_running_loop()
+        scheduled = loop.time()
+        while self._running:
+            fire_at = scheduled + random.uniform(0, task.jitter)
+            delay = fire_at - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            if not task.running:
+                self._launch(task, fire_at)
+            elif task.overlap is OverlapPolicy.COALESCE:
+                task.pending = True
+                task.coalesced += 1
+            else:
+                task.skipped += 1
+                self._metrics.counter(TASK_SKIPPED, task=task.name).inc()
+
+            scheduled += task.interval
+            now = loop.time()
+            if now > scheduled + task.interval:
+                # the loop was blocked, drop the missed ticks instead of bursting
+                missed = int((now - scheduled) // task.interval)
+                task.missed += missed
+                scheduled += missed * task.interval
+
+    def _launch(self, task: ScheduledTask, scheduled: float):
+        task.running = True
+        run = asyncio.create_task(self._execute(task, scheduled))
+        self._in_flight.add(run)
+        run.add_done_callback(self._in_flight.discard)
+
+    async def _execute(self, task: ScheduledTask, scheduled: float):
+        loop = asyncio.get_running_loop()
+        try:
+            if self._semaphore is not None:
+                await self._semaphore.acquire()
+            try:
+                started = loop.time()
+                self._metrics.histogram(TASK_LATENESS, task=task.name).record(max(started - scheduled, 0.0))
+                try:
+                    if task.timeout is not None:
+                        await asyncio.wait_for(task.func(), task.timeout)
+                    else:
+                        await task.func()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    task.failures += 1
+                    task.last_error = repr(e)
+                    self._metrics.counter(TASK_FAILURES, task=task.name).inc()
+                    self._logger.error("Scheduled task %s failed", task.name, exc_info=True)
+                finally:
+                    task.runs += 1
+                    self._metrics.counter(TASK_RUNS, task=task.name).inc()
+                    self._metrics.histogram(TASK_DURATION, task=task.name).record(loop.time() - started)
+            finally:
+                if self._semaphore is not None:
+                    self._semaphore.release()
+        finally:
+            task.running = False
+
+        if task.pending and self._running:
+            task.pending = False
+            self._launch(task, loop.time())
@@ -0,0 +1,106 @@
+import asyncio
+import time
+from functools import wraps
+from typing import Any, Awaitable, Callable, Hashable
+
+from utilities.metrics import METRICS, MetricsRegistry
+
+SINGLE_FLIGHT_CALLS = "dex_single_flight_calls_total"
+SINGLE_FLIGHT_COALESCED = "dex_single_flight_coalesced_total"
+# completed results kept for the window before expired ones are swept
+_MAX_CACHED = 1_024
+
+
+class SingleFlight:
+    """
+    Share one in-flight call, and optionally its result, between identical concurrent calls
+
+    The first caller of a key runs the call, callers of the same key
+    arriving while it is in flight await the same result (or exception)
+    instead of starting their own. With a `window`, a successful result
+    is also returned to callers arriving up to `window` seconds after it
+    completed, absorbing bursts of duplicates. Calls run in their own
+    task, so a cancelled caller does not cancel the call shared with the
+    others.
+
+    Calls and coalesced callers are counted per flight, with the source
+    of the shared result: "in_flight" or "window".
+    """
+
+    def __init__(self, name: str, window: float = 0.0, metrics: MetricsRegistry = METRICS):
+        """
+        :param name: name of the flight, used as metric label
+        :param window: seconds a completed result keeps being shared, 0 to only share calls in flight
+        :param metrics: registry receiving the call and coalesced counters
+        """
+        self.name = name
+        self.window = window
+        self._metrics = metrics
+        self._in_flight: dict[Hashable, asyncio.Task] = {}
+        # key -> (expiry on the monotonic clock, result)
+        self._results: dict[Hashable, tuple[float, Any]] = {}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable], **labels: str) -> Any:
+        """
+        Return the result of a call, sharing it with identical concurrent calls
+
+        :param key: identity of the call, calls of equal keys are interchangeable
+        :param func: coroutine function making the call
+        :param labels: extra metric labels, e.g. the endpoint
+        :return: the result of the call
+        """
+        if self.window:
+            cached = self._results.get(key)
+            if cached is not None:
+                if cached[0] > time.monotonic():
+                    self._metrics.counter(
+                        SINGLE_FLIGHT_COALESCED, flight=self.name, source="window", **labels).inc()
+                    return cached[1]
+                del self._results[key]
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self._metrics.counter(SINGLE_FLIGHT_COALESCED, flight=self.name, source="in_flight", **labels).inc()
+        else:
+            self._metrics.counter(SINGLE_FLIGHT_CALLS, flight=self.name, **labels).inc()
+            task = self._in_flight[key] = asyncio.create_task(func())
+            task.add_done_callback(lambda done: self._complete(key, done))
+        return await asyncio.shield(task)
+
+    def _complete(self, key: Hashable, task: asyncio.Task):
+        self._in_flight.pop(key, None)
+        if not self.window or task.cancelled() or task.exception() is not None:
+            return
+        if len(self._results) >= _MAX_CACHED:
+            now = time.monotonic()
+            self._results = {k: cached for k, cached in self._results.items() if cached[0] > now}
+        self._results[key] = (time.monotonic() + self.window, task.result())
+
+
+def single_flight(name: str, window: float = 0.0, metrics: MetricsRegistry = METRICS) -> Callable:
+    """
+    Decorator generator sharing one run of an async method between concurrent identical calls
+
+    Calls are identical when they are made on the same instance with the
+    same arguments, which must be hashable. Place it above decorators
+    with side effects, e.g. `publish_result`, so a shared run only has
+    them once.
+
+    :param name: name of the flight, used as metric label
+    :param window: seconds a completed result keeps being shared, see `SingleFlight`
+    :param metrics: registry receiving the call and coalesced counters
+    :return: the wrapper coalescing the calls
+    """
+
+    def decorator(func):
+        flight = SingleFlight(name, window, metrics)
+
+        @wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            key = (id(self), args, tuple(sorted(kwargs.items())))
+            return await flight.do(key, lambda: func(self, *args, **kwargs))
+
+        wrapper.flight = flight
+        return wrapper
+
+    return decorator
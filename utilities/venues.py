@@ -0,0 +1,82 @@
+import importlib
+import pkgutil
+from typing import Iterable, Optional
+
+from models.enums import Blockchains, Exchanges
+
+# packages holding the exchange and adapter implementations
+_DEFAULT_PACKAGES = ("api", "adapters")
+
+
+class Venue:
+    """The exchange and adapter implementations of an exchange and blockchain pair"""
+
+    def __init__(self, exchange: Exchanges, blockchain: Blockchains):
+        self.exchange = exchange
+        self.blockchain = blockchain
+        self.exchange_cls: Optional[type] = None
+        self.adapter_cls: Optional[type] = None
+
+    @property
+    def name(self) -> str:
+        return f"{self.exchange.value}-{self.blockchain.value}"
+
+
+class VenueRegistry:
+    """
+    Registry of the DEXExchangeBase and RawDataAdapter implementations
+
+    Implementations register themselves with the `exchange` and `adapter`
+    class decorators, and `discover` imports every module of the
+    implementation packages so their registrations run. Runners then pick
+    venues by name instead of importing them one by one.
+    """
+
+    def __init__(self):
+        self._venues: dict[tuple[Exchanges, Blockchains], Venue] = {}
+
+    def _venue(self, exchange: Exchanges, blockchain: Blockchains) -> Venue:
+        key = (exchange, blockchain)
+        venue = self._venues.get(key)
+        if venue is None:
+            venue = self._venues[key] = Venue(exchange, blockchain)
+        return venue
+
+    def exchange(self, exchange: Exchanges, blockchain: Blockchains):
+        """Class decorator registering the DEXExchangeBase implementation of a venue"""
+        def decorator(cls):
+            self._venue(exchange, blockchain).exchange_cls = cls
+            return cls
+        return decorator
+
+    def adapter(self, exchange: Exchanges, blockchain: Blockchains):
+        """Class decorator registering the RawDataAdapter implementation of a venue"""
+        def decorator(cls):
+            self._venue(exchange, blockchain).adapter_cls = cls
+            return cls
+        return decorator
+
+    def discover(self, packages: Iterable[str] = _DEFAULT_PACKAGES):
+        """Import every module of the packages, running the registrations they hold"""
+        for package_name in packages:
+            package = importlib.import_module(package_name)
+            for module in pkgutil.walk_packages(package.__path__, f"{package_name}."):
+                importlib.import_module(module.name)
+
+    @property
+    def names(self) -> list[str]:
+        return [venue.name for venue in self._venues.values()]
+
+    def get(self, name: str) -> Venue:
+        """
+        Return a registered venue
+
+        :param name: "<exchange>-<blockchain>", e.g. "hyperliquid-cosmos"
+        """
+        for venue in self._venues.values():
+            if venue.name == name:
+                return venue
+        raise KeyError(f"Unknown venue {name}, registered venues are {self.names}")
+
+
+VENUES = VenueRegistry()